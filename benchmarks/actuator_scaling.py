@@ -0,0 +1,144 @@
+"""
+Steps per second of a FREE-actuated rod as a function of the number of
+actuators, for
+- shared: the rod geometry is computed once per step by ApplyActuations,
+- per-actuator: the rod geometry is recomputed by every actuation,
+- superposed: internal loads of all actuations are summed and transformed
+  into equivalent external loads once per step,
+- compiled: as superposed, with the loads of all actuations evaluated by
+  one compiled loop (see CompiledActuations).
+
+Usage: python benchmarks/actuator_scaling.py
+"""
+
+import time
+
+import elastica as ea
+import numpy as np
+
+from cobra.actuations import ApplyActuations
+from cobra.actuations.FREE import BaseFREE, PressureCoefficients
+
+
+class ApplyActuationsWithoutSharedGeometry(ApplyActuations):
+    def apply_forces(self, system: ea.CosseratRod, time: float = 0.0) -> None:
+        for actuation in self.actuations:
+            actuation.apply(system)
+
+
+class Simulator(
+    ea.BaseSystemCollection,
+    ea.Constraints,
+    ea.Damping,
+    ea.Forcing,
+):
+    pass
+
+
+def build_simulator(
+    n_actuators: int,
+    forcing: type,
+    n_elements: int,
+    time_step: float,
+    **forcing_kwargs,
+):
+    simulator = Simulator()
+    rod = ea.CosseratRod.straight_rod(
+        n_elements=n_elements,
+        start=np.zeros((3,)),
+        direction=np.array([0.0, 0.0, -1.0]),
+        normal=np.array([1.0, 0.0, 0.0]),
+        base_length=0.288,
+        base_radius=0.008 * np.ones(n_elements),
+        density=700,
+        youngs_modulus=3e6,
+        shear_modulus=3e6 / 1.5,
+    )
+    simulator.append(rod)
+    simulator.dampen(rod).using(
+        ea.AnalyticalLinearDamper, damping_constant=0.05, time_step=time_step
+    )
+    simulator.constrain(rod).using(
+        ea.OneEndFixedBC,
+        constrained_position_idx=(0,),
+        constrained_director_idx=(0,),
+    )
+    actuations = []
+    for n in range(n_actuators):
+        angle = 2 * np.pi * n / n_actuators
+        actuation = BaseFREE(
+            position=np.tile(
+                0.008 * np.array([np.cos(angle), np.sin(angle), 0.0]),
+                (n_elements, 1),
+            ).T.copy(),
+            pressure_coefficients=PressureCoefficients(
+                force=np.array([-0.08, 0.0]),
+                couple=np.array([0.0006, 0.0]),
+            ),
+        )
+        actuation.pressure = 10.0
+        actuations.append(actuation)
+    simulator.add_forcing_to(rod).using(
+        forcing, actuations=actuations, **forcing_kwargs
+    )
+    simulator.finalize()
+    return simulator
+
+
+def steps_per_second(
+    n_actuators: int,
+    forcing: type,
+    n_elements: int = 100,
+    time_step: float = 1.0e-5,
+    n_steps: int = 2000,
+    n_repeats: int = 3,
+    **forcing_kwargs,
+) -> float:
+    simulator = build_simulator(
+        n_actuators, forcing, n_elements, time_step, **forcing_kwargs
+    )
+    stepper = ea.PositionVerlet()
+    do_step, stages_and_updates = ea.extend_stepper_interface(
+        stepper, simulator
+    )
+    current_time = np.float64(0.0)
+    for _ in range(100):  # warm up
+        current_time = do_step(
+            stepper, stages_and_updates, simulator, current_time, time_step
+        )
+    best_elapsed = np.inf
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            current_time = do_step(
+                stepper, stages_and_updates, simulator, current_time, time_step
+            )
+        best_elapsed = min(best_elapsed, time.perf_counter() - start)
+    return n_steps / best_elapsed
+
+
+def main() -> None:
+    print(
+        f"{'elements':>9} {'actuators':>10} {'shared':>10}"
+        f" {'per-actuator':>13} {'superposed':>11} {'compiled':>9}"
+    )
+    for n_elements in [100, 1000]:
+        for n_actuators in [1, 2, 3, 6, 12, 24]:
+            shared = steps_per_second(n_actuators, ApplyActuations, n_elements)
+            unshared = steps_per_second(
+                n_actuators, ApplyActuationsWithoutSharedGeometry, n_elements
+            )
+            superposed = steps_per_second(
+                n_actuators, ApplyActuations, n_elements, superpose=True
+            )
+            compiled = steps_per_second(
+                n_actuators, ApplyActuations, n_elements, compiled=True
+            )
+            print(
+                f"{n_elements:>9} {n_actuators:>10} {shared:>10.0f}"
+                f" {unshared:>13.0f} {superposed:>11.0f} {compiled:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
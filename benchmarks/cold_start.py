@@ -0,0 +1,182 @@
+"""
+Cold-start time of a FREE-actuated rod simulation (BR2-sized: 100 elements,
+3 actuators) in fresh interpreters: import, build and first step, with
+- no cache: an empty numba cache, every kernel is compiled,
+- after warmup: a cache filled by cobra.warmup() in another process,
+- cached: the cache written by the previous runs,
+and the wall time until K worker processes started at once (as by a sweep)
+have all taken their first step, on an empty cache and after warmup.
+
+Every scenario uses its own numba cache directory (NUMBA_CACHE_DIR), so
+the cache of the installed package is left untouched.
+
+Usage: python benchmarks/cold_start.py [--workers K] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def child() -> None:
+    # Timings [s] of a fresh interpreter, printed as JSON
+    start = time.perf_counter()
+    import elastica as ea
+    import numpy as np
+
+    from cobra.actuations.FREE import ApplyFREEs, BaseFREE, PressureCoefficients
+
+    imported = time.perf_counter()
+
+    class Simulator(
+        ea.BaseSystemCollection,
+        ea.Constraints,
+        ea.Damping,
+        ea.Forcing,
+    ):
+        pass
+
+    n_elements = 100
+    time_step = 1.0e-5
+    simulator = Simulator()
+    rod = ea.CosseratRod.straight_rod(
+        n_elements=n_elements,
+        start=np.zeros((3,)),
+        direction=np.array([0.0, 0.0, -1.0]),
+        normal=np.array([1.0, 0.0, 0.0]),
+        base_length=0.288,
+        base_radius=0.008 * np.ones(n_elements),
+        density=700,
+        youngs_modulus=3e6,
+        shear_modulus=3e6 / 1.5,
+    )
+    simulator.append(rod)
+    simulator.dampen(rod).using(
+        ea.AnalyticalLinearDamper, damping_constant=0.05, time_step=time_step
+    )
+    simulator.constrain(rod).using(
+        ea.OneEndFixedBC,
+        constrained_position_idx=(0,),
+        constrained_director_idx=(0,),
+    )
+    simulator.add_forcing_to(rod).using(
+        ea.GravityForces, acc_gravity=np.array([0.0, 0.0, -9.80665])
+    )
+    actuations = []
+    for n in range(3):
+        angle = 2 * np.pi * n / 3
+        actuation = BaseFREE(
+            position=np.tile(
+                0.008 * np.array([np.cos(angle), np.sin(angle), 0.0]),
+                (n_elements, 1),
+            ).T,
+            pressure_coefficients=PressureCoefficients(
+                force=np.array([-0.08, 0.0]),
+                couple=np.array([0.0006, 0.0]),
+            ),
+        )
+        actuation.pressure = 10.0
+        actuations.append(actuation)
+    simulator.add_forcing_to(rod).using(ApplyFREEs, actuator_FREEs=actuations)
+    simulator.finalize()
+    stepper = ea.PositionVerlet()
+    do_step, stages_and_updates = ea.extend_stepper_interface(
+        stepper, simulator
+    )
+    built = time.perf_counter()
+    do_step(stepper, stages_and_updates, simulator, np.float64(0.0), time_step)
+    stepped = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "import": imported - start,
+                "build": built - imported,
+                "first_step": stepped - built,
+                "total": stepped - start,
+            }
+        )
+    )
+
+
+def launch(cache_dir: str, arguments: list[str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable] + arguments,
+        env={**os.environ, "NUMBA_CACHE_DIR": cache_dir},
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def run_children(cache_dir: str, n_children: int) -> tuple[float, list[dict]]:
+    # Wall time until all children (started at once) have finished, and
+    # their timings
+    start = time.perf_counter()
+    processes = [
+        launch(cache_dir, [__file__, "--child"]) for _ in range(n_children)
+    ]
+    outputs = [process.communicate()[0] for process in processes]
+    elapsed = time.perf_counter() - start
+    return elapsed, [json.loads(output.splitlines()[-1]) for output in outputs]
+
+
+def warmup(cache_dir: str) -> float:
+    start = time.perf_counter()
+    launch(cache_dir, ["-c", "import cobra; cobra.warmup()"]).communicate()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    rows = []
+
+    def report(scenario: str, elapsed: float, timings: list[dict]) -> None:
+        slowest = max(timings, key=lambda timing: timing["total"])
+        rows.append({"scenario": scenario, "wall_time": elapsed, **slowest})
+        print(
+            f"{scenario:<28}{elapsed:>9.2f}{slowest['import']:>9.2f}"
+            f"{slowest['build']:>9.2f}{slowest['first_step']:>12.2f}"
+        )
+
+    print(
+        f"{'scenario':<28}{'wall [s]':>9}{'import':>9}{'build':>9}"
+        f"{'first step':>12}"
+    )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        report("no cache", *run_children(cache_dir, 1))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        warmup_time = warmup(cache_dir)
+        rows.append({"scenario": "warmup", "wall_time": warmup_time})
+        print(f"{'cobra.warmup()':<28}{warmup_time:>9.2f}")
+        report("after warmup", *run_children(cache_dir, 1))
+        report("cached", *run_children(cache_dir, 1))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        report(
+            f"{args.workers} workers, no cache",
+            *run_children(cache_dir, args.workers),
+        )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        warmup(cache_dir)
+        report(
+            f"{args.workers} workers after warmup",
+            *run_children(cache_dir, args.workers),
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
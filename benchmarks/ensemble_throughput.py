@@ -0,0 +1,132 @@
+"""
+Aggregate rod-steps per second of N FREE-actuated rods (3 actuators each,
+as the BR2 arm) with their own pressures, for
+- separate: one simulator per rod, stepped one after the other (the
+  per-core throughput of one process per rod),
+- per-rod: all rods in one simulator, each rod with its own ApplyFREEs,
+- ensemble: all rods in one simulator, actuated by one FREEEnsemble.
+
+Usage: python benchmarks/ensemble_throughput.py
+"""
+
+import time
+
+import elastica as ea
+import numpy as np
+from suite import make_FREEs, make_rod
+
+from cobra.actuations.ensemble import ApplyFREEEnsemble, FREEEnsemble
+from cobra.actuations.FREE import ApplyFREEs
+
+
+class Simulator(
+    ea.BaseSystemCollection,
+    ea.Constraints,
+    ea.Damping,
+    ea.Forcing,
+):
+    pass
+
+
+def add_rod(
+    simulator: Simulator, n_elements: int, time_step: float
+) -> ea.CosseratRod:
+    rod = make_rod(n_elements)
+    simulator.append(rod)
+    simulator.dampen(rod).using(
+        ea.AnalyticalLinearDamper, damping_constant=0.05, time_step=time_step
+    )
+    simulator.constrain(rod).using(
+        ea.OneEndFixedBC,
+        constrained_position_idx=(0,),
+        constrained_director_idx=(0,),
+    )
+    return rod
+
+
+def build_simulator(
+    pressures: np.ndarray, ensemble: bool, n_elements: int, time_step: float
+) -> Simulator:
+    simulator = Simulator()
+    rods = [add_rod(simulator, n_elements, time_step) for _ in pressures]
+    if ensemble:
+        free_ensemble = FREEEnsemble(rods, make_FREEs(n_elements))
+        free_ensemble.pressures = pressures
+        for rod_index, rod in enumerate(rods):
+            simulator.add_forcing_to(rod).using(
+                ApplyFREEEnsemble, ensemble=free_ensemble, rod_index=rod_index
+            )
+    else:
+        for rod, rod_pressures in zip(rods, pressures):
+            actuations = make_FREEs(n_elements)
+            for actuation, pressure in zip(actuations, rod_pressures):
+                actuation.pressure = pressure
+            simulator.add_forcing_to(rod).using(
+                ApplyFREEs, actuator_FREEs=actuations, superpose=True
+            )
+    simulator.finalize()
+    return simulator
+
+
+def rod_steps_per_second(
+    simulators: list[Simulator],
+    n_rods: int,
+    time_step: float = 1.0e-5,
+    n_steps: int = 1000,
+    n_repeats: int = 3,
+) -> float:
+    stepper = ea.PositionVerlet()
+    steppers = [
+        ea.extend_stepper_interface(stepper, simulator)
+        for simulator in simulators
+    ]
+    times = [np.float64(0.0) for _ in simulators]
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            for i, (simulator, (do_step, stages_and_updates)) in enumerate(
+                zip(simulators, steppers)
+            ):
+                times[i] = do_step(
+                    stepper, stages_and_updates, simulator, times[i], time_step
+                )
+
+    run(100)  # warm up
+    best_elapsed = np.inf
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        run(n_steps)
+        best_elapsed = min(best_elapsed, time.perf_counter() - start)
+    return n_rods * n_steps / best_elapsed
+
+
+def main(n_elements: int = 100, time_step: float = 1.0e-5) -> None:
+    print(f"{'rods':>5} {'separate':>10} {'per-rod':>10} {'ensemble':>10}")
+    rng = np.random.default_rng(0)
+    for n_rods in [1, 4, 16, 64]:
+        pressures = rng.uniform(0.0, 30.0, (n_rods, 3))
+        separate = rod_steps_per_second(
+            [
+                build_simulator(
+                    rod_pressures[None], False, n_elements, time_step
+                )
+                for rod_pressures in pressures
+            ],
+            n_rods,
+        )
+        per_rod = rod_steps_per_second(
+            [build_simulator(pressures, False, n_elements, time_step)],
+            n_rods,
+        )
+        ensemble = rod_steps_per_second(
+            [build_simulator(pressures, True, n_elements, time_step)],
+            n_rods,
+        )
+        print(
+            f"{n_rods:>5} {separate:>10.0f} {per_rod:>10.0f}"
+            f" {ensemble:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
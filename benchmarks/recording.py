@@ -0,0 +1,74 @@
+"""
+Time and peak (Python heap) memory of recording rod frames and saving them,
+for
+- lists: a .copy() of every field appended to lists, saved with np.savez at
+  the end (the former RodCallBack),
+- memory: TrajectoryRecorder into preallocated arrays, saved with np.savez,
+- stream: TrajectoryRecorder streaming chunks to memory-mapped files on a
+  background thread.
+
+Usage: python benchmarks/recording.py
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+import elastica as ea
+import numpy as np
+from suite import make_rod
+
+from cobra.recorder import ROD_FIELDS, TrajectoryRecorder
+
+
+def record_lists(rod: ea.CosseratRod, n_frames: int, folder: str) -> None:
+    callback_params = defaultdict(list)
+    for frame in range(n_frames):
+        callback_params["time"].append(float(frame))
+        for name, attribute in ROD_FIELDS.items():
+            callback_params[name].append(getattr(rod, attribute).copy())
+    np.savez(os.path.join(folder, "lists.npz"), **callback_params)
+
+
+def record_memory(rod: ea.CosseratRod, n_frames: int, folder: str) -> None:
+    recorder = TrajectoryRecorder(n_frames)
+    for frame in range(n_frames):
+        recorder.record(rod, float(frame))
+    recorder.save(os.path.join(folder, "memory.npz"))
+
+
+def record_stream(rod: ea.CosseratRod, n_frames: int, folder: str) -> None:
+    recorder = TrajectoryRecorder(n_frames, path=os.path.join(folder, "stream"))
+    for frame in range(n_frames):
+        recorder.record(rod, float(frame))
+    recorder.close()
+
+
+def measure(record, rod: ea.CosseratRod, n_frames: int) -> tuple:
+    with tempfile.TemporaryDirectory() as folder:
+        tracemalloc.start()
+        start = time.perf_counter()
+        record(rod, n_frames, folder)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main(n_elements: int = 100) -> None:
+    rod = make_rod(n_elements)
+    print(f"{'frames':>7} {'method':>7} {'time [s]':>9} {'peak [MiB]':>11}")
+    for n_frames in [1000, 10000, 30000]:
+        for method, record in [
+            ("lists", record_lists),
+            ("memory", record_memory),
+            ("stream", record_stream),
+        ]:
+            elapsed, peak = measure(record, rod, n_frames)
+            print(f"{n_frames:>7} {method:>7} {elapsed:>9.3f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
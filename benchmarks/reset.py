@@ -0,0 +1,50 @@
+"""
+Time of resetting the BR2 environment, by rebuilding the simulator (reset)
+or by restoring the cached initial state in place (fast_reset), and the
+throughput of short episodes of a few steps with each reset.
+
+Usage: python benchmarks/reset.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "examples"))
+from set_br2_environment import BR2Environment  # noqa: E402
+
+
+def run_episodes(
+    env: BR2Environment, fast: bool, n_episodes: int, n_steps: int
+) -> float:
+    pressures = np.array([10.0, 5.0, 0.0])
+    start = time.perf_counter()
+    for _ in range(n_episodes):
+        if fast:
+            simulation_time = env.fast_reset()
+        else:
+            env.reset()
+            simulation_time = np.float64(0.0)
+        for _ in range(n_steps):
+            simulation_time = env.step(simulation_time, pressures)
+    return (time.perf_counter() - start) / n_episodes
+
+
+def main(n_episodes: int = 20) -> None:
+    env = BR2Environment(final_time=0.02, recording_fps=1000)
+    run_episodes(env, fast=False, n_episodes=1, n_steps=10)  # compile
+
+    print(f"{'steps':>6} {'reset [ms]':>11} {'fast [ms]':>10} {'speedup':>8}")
+    for n_steps in [0, 10, 100, 1000]:
+        slow = run_episodes(env, False, n_episodes, n_steps)
+        fast = run_episodes(env, True, n_episodes, n_steps)
+        print(
+            f"{n_steps:>6} {1e3 * slow:>11.3f} {1e3 * fast:>10.3f} "
+            f"{slow / fast:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Benchmark suite of the hot path: the cobra kernels, the FREE actuation and
+ApplyFREEs across numbers of elements, and end-to-end steps of the BR2
+environment. Every benchmark reports the best time per call over repeats
+(each repeat running the call enough times to last min_time).
+
+The results are stored as JSON with the commit and the versions they were
+measured with, by default in benchmarks/results/<commit>.json, and are
+compared against stored results with --compare: a benchmark slower by more
+than --threshold is reported as a regression, and the exit status is 1.
+Compare results measured on the same machine only.
+
+Usage: python benchmarks/suite.py [--elements 10 100 1000 10000]
+       [--only NAME ...] [--output FILE] [--compare FILE] [--threshold 1.25]
+"""
+
+from typing import Callable, Optional
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import elastica as ea
+import numba
+import numpy as np
+
+from cobra.actuations.actuation_tool import (
+    internal_load_to_equivalent_external_load,
+    lab_to_material,
+    material_to_lab,
+)
+from cobra.actuations.FREE import ApplyFREEs, BaseFREE, PressureCoefficients
+from cobra.rod_geometry_tool import (
+    compute_local_shear,
+    compute_local_tangent,
+    sigma_to_shear,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "examples"))
+from set_br2_environment import BR2Environment  # noqa: E402
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "results")
+
+
+def make_rod(n_elements: int) -> ea.CosseratRod:
+    # Rod with non-trivial strains and curvatures
+    rng = np.random.default_rng(0)
+    rod = ea.CosseratRod.straight_rod(
+        n_elements=n_elements,
+        start=np.zeros((3,)),
+        direction=np.array([0.0, 0.0, -1.0]),
+        normal=np.array([1.0, 0.0, 0.0]),
+        base_length=0.288,
+        base_radius=0.008,
+        density=700,
+        youngs_modulus=3e6,
+        shear_modulus=3e6 / 1.5,
+    )
+    rod.position_collection[:2, 1:] += (
+        0.01 * rod.rest_lengths[0] * rng.random((2, n_elements))
+    )
+    rod.compute_internal_forces_and_torques(0.0)
+    return rod
+
+
+def make_FREEs(n_elements: int) -> list[BaseFREE]:
+    # Bending and twisting actuators of the BR2 arm
+    actuations = []
+    for n in range(3):
+        angle = 2 * np.pi * n / 3
+        actuation = BaseFREE(
+            position=np.tile(
+                0.008 * np.array([np.cos(angle), np.sin(angle), 0.0]),
+                (n_elements, 1),
+            ).T,
+            pressure_coefficients=PressureCoefficients(
+                force=np.array([-0.08, 0.0]) if n == 0 else np.zeros(1),
+                couple=np.array([0.0006, 0.0]) if n > 0 else np.zeros(1),
+            ),
+        )
+        actuation.pressure = 10.0
+        actuations.append(actuation)
+    return actuations
+
+
+# Benchmarks: functions of the number of elements returning the call to time
+
+
+def bench_material_to_lab(n_elements: int) -> Callable[[], None]:
+    rod = make_rod(n_elements)
+    vectors = np.random.default_rng(0).random((3, n_elements))
+    return lambda: material_to_lab(rod.director_collection, vectors)
+
+
+def bench_lab_to_material(n_elements: int) -> Callable[[], None]:
+    rod = make_rod(n_elements)
+    vectors = np.random.default_rng(0).random((3, n_elements))
+    return lambda: lab_to_material(rod.director_collection, vectors)
+
+
+def bench_internal_load_to_equivalent_external_load(
+    n_elements: int,
+) -> Callable[[], None]:
+    rod = make_rod(n_elements)
+    rng = np.random.default_rng(0)
+    internal_force = rng.random((3, n_elements))
+    internal_couple = rng.random((3, n_elements - 1))
+    external_force = np.zeros((3, n_elements + 1))
+    external_couple = np.zeros((3, n_elements))
+    return lambda: internal_load_to_equivalent_external_load(
+        rod.director_collection,
+        rod.kappa,
+        rod.tangents,
+        rod.rest_lengths,
+        rod.rest_voronoi_lengths,
+        rod.dilatation,
+        rod.voronoi_dilatation,
+        internal_force,
+        internal_couple,
+        external_force,
+        external_couple,
+    )
+
+
+def bench_compute_local_shear(n_elements: int) -> Callable[[], None]:
+    rod = make_rod(n_elements)
+    position = make_FREEs(n_elements)[0].position
+    shear = sigma_to_shear(rod.sigma)
+    delta_s = rod.rest_voronoi_lengths * rod.voronoi_dilatation
+    return lambda: compute_local_shear(position, shear, rod.kappa, delta_s)
+
+
+def bench_compute_local_tangent(n_elements: int) -> Callable[[], None]:
+    rod = make_rod(n_elements)
+    local_shear = sigma_to_shear(rod.sigma)
+    return lambda: compute_local_tangent(local_shear)
+
+
+def bench_FREE_call(n_elements: int) -> Callable[[], None]:
+    rod = make_rod(n_elements)
+    actuation = make_FREEs(n_elements)[0]
+    return lambda: actuation(rod)
+
+
+def make_apply_forces(**options) -> Callable[[int], Callable[[], None]]:
+    def bench_apply_forces(n_elements: int) -> Callable[[], None]:
+        rod = make_rod(n_elements)
+        forcing = ApplyFREEs(make_FREEs(n_elements), **options)
+        return lambda: forcing.apply_forces(rod, 0.0)
+
+    return bench_apply_forces
+
+
+KERNEL_BENCHMARKS: dict[str, Callable[[int], Callable[[], None]]] = {
+    "material_to_lab": bench_material_to_lab,
+    "lab_to_material": bench_lab_to_material,
+    "internal_load_to_equivalent_external_load": (
+        bench_internal_load_to_equivalent_external_load
+    ),
+    "compute_local_shear": bench_compute_local_shear,
+    "compute_local_tangent": bench_compute_local_tangent,
+    "BaseFREE.__call__": bench_FREE_call,
+    "ApplyFREEs.apply_forces": make_apply_forces(),
+    "ApplyFREEs.apply_forces (superpose)": make_apply_forces(superpose=True),
+    "ApplyFREEs.apply_forces (compiled)": make_apply_forces(compiled=True),
+}
+
+
+def bench_BR2_step() -> Callable[[], None]:
+    # One step of the BR2 environment (100 elements, 3 FREEs)
+    env = BR2Environment(final_time=1.0)
+    pressures = np.array([10.0, 5.0, 0.0])
+    state = {"time": np.float64(0.0)}
+
+    def step() -> None:
+        state["time"] = env.step(state["time"], pressures)
+
+    return step
+
+
+def time_call(
+    call: Callable[[], None], min_time: float = 0.05, n_repeats: int = 5
+) -> float:
+    # Best time [s] per call over n_repeats, each lasting about min_time
+    call()  # compile
+    n_calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n_calls *= 2 if elapsed == 0.0 else max(2, int(min_time / elapsed))
+    best = elapsed / n_calls
+    for _ in range(n_repeats - 1):
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            call()
+        best = min(best, (time.perf_counter() - start) / n_calls)
+    return best
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(
+    elements: list[int], only: Optional[list[str]] = None
+) -> dict[str, dict[str, float]]:
+    # Time per call [s] of every benchmark, by number of elements ("-" for
+    # the end-to-end benchmarks)
+    results: dict[str, dict[str, float]] = {}
+    for name, bench in KERNEL_BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results[name] = {}
+        for n_elements in elements:
+            seconds = time_call(bench(n_elements))
+            results[name][str(n_elements)] = seconds
+            print(f"{name:<44}{n_elements:>7}{1e6 * seconds:>14.2f} us")
+    if not only or "BR2Environment.step" in only:
+        seconds = time_call(bench_BR2_step(), min_time=0.5)
+        results["BR2Environment.step"] = {"-": seconds}
+        print(
+            f"{'BR2Environment.step':<44}{'-':>7}{1e6 * seconds:>14.2f} us"
+            f"  ({1.0 / seconds:.0f} steps/s)"
+        )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    # Benchmarks slower than the baseline by more than threshold
+    regressions = []
+    print(f"\n{'benchmark':<44}{'elements':>9}{'ratio':>8}")
+    for name, timings in results.items():
+        for n_elements, seconds in timings.items():
+            reference = baseline.get(name, {}).get(n_elements)
+            if reference is None:
+                continue
+            ratio = seconds / reference
+            flag = ""
+            if ratio > threshold:
+                flag = "  regression"
+                regressions.append(f"{name} [{n_elements}]")
+            print(f"{name:<44}{n_elements:>9}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--elements", type=int, nargs="+", default=[10, 100, 1000, 10000]
+    )
+    parser.add_argument("--only", type=str, nargs="+", default=None)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--compare", type=str, default=None)
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    commit = git_commit()
+    record = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "pyelastica": metadata.version("pyelastica"),
+        "results": run_suite(args.elements, args.only),
+    }
+
+    output = args.output or os.path.join(RESULTS_FOLDER, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(record, file, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(
+            record["results"], baseline["results"], args.threshold
+        )
+        if regressions:
+            print(
+                f"{len(regressions)} regressions against "
+                f"{baseline['commit']}: " + ", ".join(regressions)
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Aggregate throughput of K FREE-actuated rods (3 actuators each, as the BR2
+arm) advanced concurrently by ThreadedEnvironmentRunner, from 1 thread to
+os.cpu_count() threads, for
+- kernels: the actuation kernels only (apply_FREE_load of the 3 actuators,
+  repeated in one compiled call, which releases the GIL),
+- steps: full time steps (PyElastica stepping, which holds the GIL, and
+  the actuation loads).
+
+The speedup is relative to one thread running the K rods one after the
+other.
+
+Usage: python benchmarks/thread_scaling.py [--rods K] [--elements N]
+       [--steps S] [--threads 1 2 4]
+"""
+
+import argparse
+import os
+import time
+
+import elastica as ea
+import numpy as np
+from numba import njit
+from suite import make_FREEs, make_rod
+
+from cobra.actuations.actuation import RodGeometry
+from cobra.actuations.FREE import ApplyFREEs, apply_FREE_load
+from cobra.sweep import ThreadedEnvironmentRunner
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def apply_repeatedly(n_repeats: int, arguments: tuple) -> None:
+    for _ in range(n_repeats):
+        apply_FREE_load(*arguments)
+
+
+class Simulator(
+    ea.BaseSystemCollection,
+    ea.Constraints,
+    ea.Damping,
+    ea.Forcing,
+):
+    pass
+
+
+class RodEnvironment:
+    # One FREE-actuated rod in its own simulator
+    def __init__(self, n_elements: int, time_step: float):
+        self.time_step = time_step
+        self.simulator = Simulator()
+        self.rod = make_rod(n_elements)
+        self.simulator.append(self.rod)
+        self.simulator.dampen(self.rod).using(
+            ea.AnalyticalLinearDamper,
+            damping_constant=0.05,
+            time_step=time_step,
+        )
+        self.simulator.constrain(self.rod).using(
+            ea.OneEndFixedBC,
+            constrained_position_idx=(0,),
+            constrained_director_idx=(0,),
+        )
+        self.actuations = make_FREEs(n_elements)
+        self.simulator.add_forcing_to(self.rod).using(
+            ApplyFREEs, actuator_FREEs=self.actuations
+        )
+        self.simulator.finalize()
+        self.stepper = ea.PositionVerlet()
+        self.do_step, self.stages_and_updates = ea.extend_stepper_interface(
+            self.stepper, self.simulator
+        )
+        self.time = np.float64(0.0)
+
+        geometry = RodGeometry(n_elements)
+        geometry.update(self.rod)
+        self.kernel_arguments = [
+            actuation._internal_load_arguments(self.rod, geometry)
+            + actuation._equivalent_load_arguments(self.rod, geometry)
+            + (self.rod.external_forces, self.rod.external_torques)
+            for actuation in self.actuations
+        ]
+
+    def step(self, n_steps: int) -> None:
+        for _ in range(n_steps):
+            self.time = self.do_step(
+                self.stepper,
+                self.stages_and_updates,
+                self.simulator,
+                self.time,
+                self.time_step,
+            )
+
+    def apply_kernels(self, n_steps: int) -> None:
+        for arguments in self.kernel_arguments:
+            apply_repeatedly(n_steps, arguments)
+
+
+def throughput(
+    environments: list[RodEnvironment],
+    n_threads: int,
+    run: str,
+    n_steps: int,
+    n_repeats: int = 3,
+) -> float:
+    # Rod-steps per second of the environments run on n_threads threads
+    def run_environment(environment: RodEnvironment, index: int) -> None:
+        getattr(environment, run)(n_steps)
+
+    with ThreadedEnvironmentRunner(environments, n_threads) as runner:
+        best_elapsed = np.inf
+        for _ in range(n_repeats):
+            start = time.perf_counter()
+            runner.run(run_environment)
+            best_elapsed = min(best_elapsed, time.perf_counter() - start)
+    return len(environments) * n_steps / best_elapsed
+
+
+def sequential_throughput(
+    environments: list[RodEnvironment],
+    run: str,
+    n_steps: int,
+    n_repeats: int = 3,
+) -> float:
+    best_elapsed = np.inf
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        for environment in environments:
+            getattr(environment, run)(n_steps)
+        best_elapsed = min(best_elapsed, time.perf_counter() - start)
+    return len(environments) * n_steps / best_elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rods", type=int, default=8)
+    parser.add_argument("--elements", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    environments = [
+        RodEnvironment(args.elements, 1.0e-5) for _ in range(args.rods)
+    ]
+    # Compile the kernels before running them concurrently
+    for environment in environments:
+        environment.step(10)
+        environment.apply_kernels(10)
+
+    n_cores = os.cpu_count() or 1
+    thread_counts = args.threads or sorted(
+        {1, n_cores} | {2**n for n in range(8) if 2**n < n_cores}
+    )
+    print(f"{args.rods} rods, {args.elements} elements, {n_cores} cores")
+    print(
+        f"{'threads':>8} {'kernels':>10} {'speedup':>8}"
+        f" {'steps':>10} {'speedup':>8}"
+    )
+    references = {
+        run: sequential_throughput(environments, run, args.steps)
+        for run in ("apply_kernels", "step")
+    }
+    for n_threads in thread_counts:
+        kernels, steps = (
+            throughput(environments, n_threads, run, args.steps)
+            for run in ("apply_kernels", "step")
+        )
+        print(
+            f"{n_threads:>8} {kernels:>10.0f}"
+            f" {kernels / references['apply_kernels']:>8.2f}"
+            f" {steps:>10.0f} {steps / references['step']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Accuracy versus speed of the decimation of the actuation loads of the BR2
+arm: the loads of the FREE actuators recomputed every k steps, or when the
+pressures or the strains of the rod have changed by more than a tolerance
+(see ApplyActuations), against the every-step reference on the pressure
+profiles of run_br2_simulation.py.
+
+Usage: python actuation_decimation_report.py [--final-time T]
+       [--profiles 0 1 2 3] [--output FILE]
+
+For every profile and setting, the table reports the simulated steps per
+second of wall-clock time, the fraction of steps evaluating the loads, the
+largest distance [mm] between the recorded rod and the reference rod and
+the largest difference of their directors (all nodes / elements, all
+recorded frames).
+"""
+
+import argparse
+import json
+import time as timer
+
+import numpy as np
+import set_br2_environment
+from run_br2_simulation import PRESSURE_SCHEDULES
+from set_br2_environment import BR2Environment
+
+from cobra.actuations.FREE import ApplyFREEs
+
+SETTINGS: list[tuple[str, dict]] = [
+    ("every step", {}),
+    ("k = 2", {"update_interval": 2}),
+    ("k = 5", {"update_interval": 5}),
+    ("k = 10", {"update_interval": 10}),
+    ("k = 20", {"update_interval": 20}),
+    ("k = 50", {"update_interval": 50}),
+    (
+        "k <= 100, 0.05 psi, 1e-4 strain",
+        {
+            "update_interval": 100,
+            "pressure_tolerance": 0.05,
+            "strain_tolerance": 1e-4,
+        },
+    ),
+    (
+        "k <= 100, 0.2 psi, 1e-3 strain",
+        {
+            "update_interval": 100,
+            "pressure_tolerance": 0.2,
+            "strain_tolerance": 1e-3,
+        },
+    ),
+]
+
+
+class RecordedApplyFREEs(ApplyFREEs):
+    # ApplyFREEs keeping its instances, whose number of evaluations is not
+    # reachable through the simulator
+    instances: list[ApplyFREEs] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+set_br2_environment.ApplyFREEs = RecordedApplyFREEs
+
+
+def run(
+    profile: int, final_time: float, actuation_options: dict
+) -> tuple[float, float, dict[str, np.ndarray]]:
+    # Steps per second, fraction of the steps evaluating the loads, and
+    # recorded frames
+    env = BR2Environment(
+        final_time=final_time, actuation_options=actuation_options
+    )
+    forcing = RecordedApplyFREEs.instances[-1]
+    start = timer.perf_counter()
+    env.run(np.float64(0.0), env.total_steps, PRESSURE_SCHEDULES[profile])
+    elapsed = timer.perf_counter() - start
+    return (
+        env.total_steps / elapsed,
+        forcing.n_evaluations / env.total_steps,
+        env.rod_recorder.as_dict(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--final-time", type=float, default=2.0)
+    parser.add_argument("--profiles", type=int, nargs="+", default=[0, 1, 2, 3])
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    # Compile the kernels before timing
+    for _, options in SETTINGS:
+        run(args.profiles[0], 0.001, options)
+
+    rows = []
+    print(
+        f"{'profile':>7}  {'setting':<34}{'steps/s':>9}{'evaluated':>11}"
+        f"{'error [mm]':>12}{'directors':>11}"
+    )
+    for profile in args.profiles:
+        reference: dict[str, np.ndarray] = {}
+        for name, options in SETTINGS:
+            steps_per_second, evaluated, frames = run(
+                profile, args.final_time, options
+            )
+            reference = reference or frames
+            error = np.linalg.norm(
+                frames["position"] - reference["position"], axis=1
+            ).max()
+            director_error = np.abs(
+                frames["director"] - reference["director"]
+            ).max()
+            rows.append(
+                {
+                    "profile": profile,
+                    "setting": name,
+                    "options": options,
+                    "steps_per_second": steps_per_second,
+                    "evaluated": evaluated,
+                    "error_mm": 1e3 * float(error),
+                    "director_error": float(director_error),
+                }
+            )
+            print(
+                f"{profile:>7}  {name:<34}{steps_per_second:>9.0f}"
+                f"{evaluated:>11.3f}{1e3 * error:>12.3f}"
+                f"{director_error:>11.2e}"
+            )
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
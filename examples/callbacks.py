@@ -4,6 +4,7 @@ Created on Jun 01, 2024
 """
 
 from dataclasses import dataclass
+from time import perf_counter_ns
 
 import elastica as ea
 import numpy as np
@@ -11,6 +12,8 @@ from numba import njit
 from packaging.version import Version
 
 from cobra.actuations.actuation_tool import material_to_lab
+from cobra.profiling import StageProfiler
+from cobra.recorder import TrajectoryRecorder
 
 BSR_AVAILABLE = True
 try:
@@ -23,14 +26,32 @@ except ImportError:
 
 
 class BasicCallBackBaseClass(ea.CallBackBaseClass):
-    def __init__(self, step_skip: int):
+    def __init__(self, step_skip: int, profiler: StageProfiler | None = None):
+        # The calls are timed as the "callbacks" stage of profiler if given
         super().__init__()
         self.every = step_skip
         self.stop = False
+        self.last_step = -1
+        self.profiler = profiler
 
     def make_callback(
         self, system: ea.CosseratRod, time: float, current_step: int
     ) -> None:
+        if self.profiler is None:
+            self.check_and_save(system, time, current_step)
+            return
+        start = perf_counter_ns()
+        self.check_and_save(system, time, current_step)
+        self.profiler.add("callbacks", start)
+
+    def check_and_save(
+        self, system: ea.CosseratRod, time: float, current_step: int
+    ) -> None:
+        # A simulation restored to an earlier state (e.g. by fast_reset) is
+        # recorded again, even if it had been stopped
+        if current_step <= self.last_step:
+            self.stop = False
+        self.last_step = current_step
         if self.stop or current_step % self.every != 0:
             return
         if (
@@ -48,29 +69,25 @@ class BasicCallBackBaseClass(ea.CallBackBaseClass):
 
 
 class RodCallBack(BasicCallBackBaseClass):
-    def __init__(self, step_skip: int, callback_params: dict):
-        super().__init__(step_skip=step_skip)
-        self.callback_params = callback_params
+    def __init__(
+        self,
+        step_skip: int,
+        recorder: TrajectoryRecorder,
+        profiler: StageProfiler | None = None,
+        record_initial: bool = True,
+    ):
+        # Without record_initial, the first call (the initial state of the
+        # simulation, at finalize) is not recorded, e.g. for a recorder
+        # carried over from a previous build of the simulation
+        super().__init__(step_skip=step_skip, profiler=profiler)
+        self.recorder = recorder
+        self.skip_initial = not record_initial
 
     def save_params(self, system: ea.CosseratRod, time: float) -> None:
-        self.callback_params["time"].append(time)
-        self.callback_params["radius"].append(system.radius.copy())
-        self.callback_params["dilatation"].append(system.dilatation.copy())
-        self.callback_params["voronoi_dilatation"].append(
-            system.voronoi_dilatation.copy()
-        )
-        self.callback_params["position"].append(
-            system.position_collection.copy()
-        )
-        self.callback_params["director"].append(
-            system.director_collection.copy()
-        )
-        self.callback_params["velocity"].append(
-            system.velocity_collection.copy()
-        )
-        self.callback_params["omega"].append(system.omega_collection.copy())
-        self.callback_params["sigma"].append(system.sigma.copy())
-        self.callback_params["kappa"].append(system.kappa.copy())
+        if self.skip_initial:
+            self.skip_initial = False
+            return
+        self.recorder.record(system, time)
 
 
 @dataclass
@@ -182,8 +199,9 @@ if BSR_AVAILABLE:
             step_skip: int,
             property: BR2Property,
             system: ea.CosseratRod,
+            profiler: StageProfiler | None = None,
         ):
-            super().__init__(step_skip=step_skip)
+            super().__init__(step_skip=step_skip, profiler=profiler)
             self.bsr_objs: BR2BsrObj = BR2BsrObj(
                 property=property,
                 default_centerline_position=system.position_collection,
@@ -5,8 +5,8 @@ Created on Jul 18, 2024
 
 import matplotlib.pyplot as plt
 import numpy as np
-from tqdm import tqdm
-from utils import pos_dir_to_input, sigma_to_shear
+
+from cobra.dataset import ArmDatasetBuilder, load_arm_dataset
 
 color = ["C" + str(i) for i in range(10)]
 
@@ -19,59 +19,30 @@ step_skip = 2
 
 ## data point setup
 n_data_pts = 3  # exlude the initial point at base
-idx_data_pts = np.array(
-    [int(100 / (n_data_pts)) * i for i in range(1, n_data_pts)] + [-1]
-)
-
-# print(idx_data_pts)
-
-input_data = []
-true_pos = []
-true_dir = []
-true_kappa = []
-true_shear = []
-
-for i in tqdm(range(1, n_cases)):
-    file_name = "BR2_simulation%02d" % (i)
-    data = np.load(folder_name + file_name + ".npz")
-    if i == 11:
-        t = data["time"]
-        position = data["position"]
-        orientation = data["director"]
-        kappa = data["kappa"]
-        sigma = data["sigma"]
-        n_elem = orientation.shape[-1]
-        L = np.linalg.norm(position[0, :, -1])
-        print("rest length:", L)
-        s = np.linspace(0, L, n_elem + 1)
-        s_mean = 0.5 * (s[1:] + s[:-1])
-        radius = data["radius"]
-        dl = np.linalg.norm(position[0, :, 1:] - position[0, :, :-1], axis=0)
-        nominal_shear = sigma_to_shear(sigma[0])
-
-    position = data["position"]
-    orientation = data["director"]
-    kappa = data["kappa"]
-    sigma = data["sigma"]
-    shear = sigma.copy()
-    shear[:, 2, :] += 1
-
-    input_pos = position[::step_skip, :, idx_data_pts]
-    input_dir = orientation[::step_skip, ..., idx_data_pts]
-    inputs = pos_dir_to_input(input_pos, input_dir)
 
-    input_data.append(inputs)
-    true_pos.append(position[::step_skip, ...])
-    true_dir.append(orientation[::step_skip, ...])
-    true_kappa.append(kappa[::step_skip, ...])
-    true_shear.append(shear[::step_skip, ...])
-
-input_data = np.vstack(input_data)
-true_pos = np.vstack(true_pos)
-true_dir = np.vstack(true_dir)
-true_kappa = np.vstack(true_kappa)
-true_shear = np.vstack(true_shear)
-# print(input_data.shape, true_pos.shape, true_dir.shape, true_kappa.shape, true_shear.shape)
+# Runs are streamed one at a time into memory-mapped arrays, see
+# ArmDatasetBuilder, and the model data is taken from BR2_simulation11
+arm_data_folder = folder_name + "BR2_arm_data"
+ArmDatasetBuilder(
+    filenames=[
+        folder_name + "BR2_simulation%02d.npz" % (i) for i in range(1, n_cases)
+    ],
+    output_folder=arm_data_folder,
+    step_skip=step_skip,
+    n_data_pts=n_data_pts,
+    reference_index=10,
+).build(verbose=True)
+
+data = load_arm_dataset(arm_data_folder)
+model_data = data["model"]
+input_data = data["input_data"]
+true_pos = data["true_pos"]
+true_kappa = data["true_kappa"]
+true_shear = data["true_shear"]
+L = model_data["L"]
+s = model_data["s"]
+s_mean = 0.5 * (s[1:] + s[:-1])
+print("rest length:", L)
 
 idx_list = np.random.randint(
     len(true_kappa), size=10
@@ -106,30 +77,4 @@ for ii in range(len(idx_list)):
         axes[0][j].plot(s[1:-1], true_kappa[i, j, :])
         axes[1][j].plot(s_mean, true_shear[i, j, :])
 
-# plt.show()
-# quit()
-
-model_data = {
-    "n_elem": n_elem,
-    "L": L,
-    "radius": radius,
-    "s": s,
-    "dl": dl,
-    "nominal_shear": nominal_shear,
-}
-
-data = {
-    "model": model_data,
-    # "n_data_pts": n_data_pts,
-    # "idx_data_pts": idx_data_pts,
-    # "input_data": input_data,
-    "true_pos": true_pos,
-    "true_dir": true_dir,
-    "true_kappa": true_kappa,
-    "true_shear": true_shear,
-}
-
-arm_data_name = "BR2_arm_data.npy"  # 'octopus_arm_data.npy' #
-np.save(folder_name + arm_data_name, data)
-
 plt.show()
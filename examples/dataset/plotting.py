@@ -1,22 +1,32 @@
+import os
+
 import matplotlib.animation as manimation
 import matplotlib.pyplot as plt
 import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
 from utils import forward_path, sigma_to_shear
 
+from cobra.dataset import open_trajectory
+
 color = ["C" + str(i) for i in range(10)]
 
 folder = "Data/"
 idx = 12
 file_name = "BR2_simulation%02d" % (idx)
-data = np.load(folder + file_name + ".npz")
+# A .npz file, or a trajectory store saved with --store (only the read
+# frames of each field are loaded)
+data = open_trajectory(
+    folder + file_name
+    if os.path.isdir(folder + file_name)
+    else folder + file_name + ".npz"
+)
 
 # print(data.files)
-t = data["time"]
-position = data["position"]
-orientation = data["director"]
-kappa = data["kappa"]
-sigma = data["sigma"]
+t = data["time"][:]
+position = data["position"][:]
+orientation = data["director"][:]
+kappa = data["kappa"][:]
+sigma = data["sigma"][:]
 n_elem = orientation.shape[-1]
 L = np.linalg.norm(position[0, :, -1])
 s = np.linspace(0, L, n_elem + 1)
@@ -8,6 +8,9 @@ from packaging.version import Version
 from set_br2_environment import BR2Environment
 from tqdm import tqdm
 
+from cobra.actuations.schedule import PressureSchedule
+from cobra.profiling import StageProfiler
+
 BSR_AVAILABLE = True
 try:
     import bsr
@@ -18,140 +21,70 @@ except ImportError:
     BSR_AVAILABLE = False
 
 
-def pressure_profile_0(time):
-    period = [2.2, 3.75, 3.75, 3.75]
-    if time < period[0]:
-        pressures = np.array([30 * time / period[0], 0.0, 0.0])
-    elif time < np.sum(period[:2]):
-        pressures = np.array([30.0, 30 * (time - period[0]) / period[1], 0.0])
-    elif time < np.sum(period[:3]):
-        pressures = np.array(
-            [
-                30.0 * (period[0] + period[1] + period[2] - time) / period[2],
-                30.0,
-                0.0,
-            ]
-        )
-    else:
-        pressures = np.array(
-            [0.0, 30.0 * (np.sum(period) - time) / period[3], 0.0]
-        )
-    return pressures
-
-
-def pressure_profile_1(time):
-    period = [3.0, 3.0, 2.0, 2.0]
-    if time < period[0]:
-        pressures = np.array(
-            [30 * time / period[0], 0.0, 30 * time / period[0]]
-        )
-    elif time < np.sum(period[:2]):
-        pressures = np.array(
-            [
-                30.0,
-                30 * (time - period[0] - period[1] / 2) / (period[1] / 2),
-                30 * (period[0] + period[1] / 2 - time) / (period[1] / 2),
-            ]
-        )
-    elif time < np.sum(period[:3]):
-        pressures = np.array(
-            [
-                30.0 * (period[0] + period[1] + period[2] - time) / period[2],
-                30.0,
-                0.0,
-            ]
-        )
-    else:
-        pressures = np.array(
-            [0.0, 30.0 * (np.sum(period) - time) / period[3], 0.0]
-        )
-    return pressures
-
-
-def pressure_profile_2(time):
-    period = [2.0, 3.0, 2.0, 3.0]
-    if time < period[0]:
-        pressures = np.array(
-            [30 * time / period[0], 10 * time / period[0], 0.0]
-        )
-    elif time < np.sum(period[:2]):
-        pressures = np.array(
-            [
-                30.0 * (period[0] + period[1] - time) / period[1],
-                10 * (period[0] + period[1] / 4 - time) / (period[1] / 4),
-                30 * (time - period[0] - period[1] / 4) / (period[1] / 4 * 3),
-            ]
-        )
-    elif time < np.sum(period[:3]):
-        pressures = np.array(
-            [
-                30.0 * (time - period[0] - period[1]) / period[2],
-                0.0,
-                30.0,
-            ]
-        )
-    else:
-        pressures = np.array(
-            [
-                30.0 * (np.sum(period) - time) / period[3],
-                0.0,
-                30.0 * (np.sum(period) - time) / period[3],
-            ]
-        )
-    return pressures
-
-
-def pressure_profile_3(time):
-    period = [2.0, 2.0, 3.0, 3.0]
-    if time < period[0]:
-        pressures = np.array(
-            [
-                0.0,
-                30.0 * time / period[0],
-                0.0,
-            ]
-        )
-    elif time < np.sum(period[:2]):
-        pressures = np.array(
-            [
-                15.0 * (time - period[0]) / period[1],
-                30.0,
-                0.0,
-            ]
-        )
-    elif time < np.sum(period[:3]):
-        pressures = np.array(
-            [
-                15.0,
-                30.0
-                * (period[0] + period[1] + period[2] / 3 * 2 - time)
-                / (period[2] / 3 * 2),
-                15.0
-                * (time - period[0] - period[1] - period[2] / 3 * 2)
-                / (period[2] / 3),
-            ]
-        )
-    else:
-        pressures = np.array(
-            [
-                15.0 * (np.sum(period) - time) / period[3],
-                0.0,
-                15.0 * (np.sum(period) - time) / period[3],
-            ]
-        )
-    return pressures
+# Pressure profiles of the BR2 arm (bending, CW and CCW twisting channels),
+# piecewise linear between the given times
+PRESSURE_SCHEDULES = [
+    PressureSchedule(
+        times=np.cumsum([0.0, 2.2, 3.75, 3.75, 3.75]),
+        pressures=[
+            [0.0, 0.0, 0.0],
+            [30.0, 0.0, 0.0],
+            [30.0, 30.0, 0.0],
+            [0.0, 30.0, 0.0],
+            [0.0, 0.0, 0.0],
+        ],
+    ),
+    PressureSchedule(
+        times=[0.0, 3.0, 4.5, 6.0, 8.0, 10.0],
+        pressures=[
+            [0.0, 0.0, 0.0],
+            [30.0, 0.0, 30.0],
+            [30.0, 0.0, 0.0],
+            [30.0, 30.0, 0.0],
+            [0.0, 30.0, 0.0],
+            [0.0, 0.0, 0.0],
+        ],
+    ),
+    PressureSchedule(
+        times=[0.0, 2.0, 2.75, 5.0, 7.0, 10.0],
+        pressures=[
+            [0.0, 0.0, 0.0],
+            [30.0, 10.0, 0.0],
+            [22.5, 0.0, 0.0],
+            [0.0, 0.0, 30.0],
+            [30.0, 0.0, 30.0],
+            [0.0, 0.0, 0.0],
+        ],
+    ),
+    PressureSchedule(
+        times=[0.0, 2.0, 4.0, 6.0, 7.0, 10.0],
+        pressures=[
+            [0.0, 0.0, 0.0],
+            [0.0, 30.0, 0.0],
+            [15.0, 30.0, 0.0],
+            [15.0, 0.0, 0.0],
+            [15.0, 0.0, 15.0],
+            [0.0, 0.0, 0.0],
+        ],
+    ),
+]
 
 
 def main(
     final_time: float = 10.0,
     time_step: float = 1.0e-5,
     recording_fps: int = 60,
+    profile: int = 3,
+    hold_steps: int = 1,
+    profile_stages: bool = False,
 ):
-    # Initialize the environment
+    # Initialize the environment, timing the stages of the steps with
+    # profile_stages
     env = BR2Environment(
         final_time=final_time,
         time_step=time_step,
         recording_fps=recording_fps,
+        profiler=StageProfiler() if profile_stages else None,
     )
 
     if BSR_AVAILABLE:
@@ -185,15 +118,14 @@ def main(
 
     # Start the simulation
     print("Running simulation ...")
+    # The pressures are updated every hold_steps steps
+    schedule = PRESSURE_SCHEDULES[profile]
     time = np.float64(0.0)
-    for step in tqdm(range(env.total_steps)):
-
-        pressures = pressure_profile_3(time)
-
-        time = env.step(
-            time=time,
-            pressures=pressures,
-        )
+    with tqdm(total=env.total_steps) as progress:
+        while env.step_index(time) < env.total_steps:
+            n_steps = min(env.step_skip, env.total_steps - env.step_index(time))
+            time = env.run(time, n_steps, schedule, hold_steps)
+            progress.update(n_steps)
     print("Simulation finished!")
 
     if BSR_AVAILABLE:
@@ -217,6 +149,8 @@ def main(
 
     # Save the simulation
     env.save("BR2_simulation")
+    if env.profiler is not None:
+        print(env.profiler.table(reference="step"))
 
 
 if __name__ == "__main__":
@@ -5,7 +5,9 @@ Created on Jun 01, 2024
 
 from typing import Self
 
+import os
 from abc import ABC, abstractmethod
+from time import perf_counter_ns
 
 import elastica as ea
 import numpy as np
@@ -13,7 +15,21 @@ from callbacks import BR2Property, RodCallBack
 from packaging.version import Version
 from tqdm import tqdm
 
+from cobra.actuations.ensemble import ApplyFREEEnsemble, FREEEnsemble
 from cobra.actuations.FREE import ApplyFREEs, BaseFREE, PressureCoefficients
+from cobra.actuations.schedule import PressureSchedule
+from cobra.checkpoint import (
+    read_checkpoint,
+    restore_rod_state,
+    rod_state,
+    with_prefix,
+    write_checkpoint,
+)
+from cobra.implicit import SemiImplicitEuler
+from cobra.profiling import StageProfiler
+from cobra.recorder import TrajectoryRecorder, n_recorded_frames
+from cobra.stability import aligned_time_step, stable_time_step
+from cobra.statics import StaticSolver
 
 BSR_AVAILABLE = True
 try:
@@ -74,24 +90,98 @@ class BaseSimulator(
 
 
 class BaseEnvironment(ABC):
+    # Damping constant of the rods, applied by the implicit stepper instead
+    # of the dampers of the simulation
+    damping_constant: float = 0.0
+
     def __init__(
         self,
         final_time: float,
-        time_step: float = 1.0e-5,
+        time_step: float | None = 1.0e-5,
         recording_fps: int = 30,
+        adaptive_time_step: bool = False,
+        adaptation_interval: float = 0.1,
+        implicit: bool = False,
+        profiler: StageProfiler | None = None,
     ) -> None:
-        self.StatefulStepper = ea.PositionVerlet()  # Integrator type
+        # With time_step None, the time step is selected at every reset: the
+        # largest stable step (see stable_time_step) which divides the
+        # recording interval 1 / recording_fps. With adaptive_time_step, it
+        # is also selected again every adaptation_interval of simulated
+        # time during a run, at a recorded frame.
+        # With implicit, the rods are integrated with SemiImplicitEuler
+        # instead of ea.PositionVerlet, which is stable with time steps one
+        # to two orders of magnitude larger, e.g. 1e-4 to 1e-3 s (the
+        # time step is not selected). It is first order accurate: on the
+        # BR2 arm over a 0.5 s pressure ramp, the tip is within 4 mm of the
+        # explicit reference with 1 / 9000 s and 11 mm with 1 / 900 s.
+        # With profiler, the calls and wall times of the steps, and of the
+        # actuations and callbacks within them, are accumulated into
+        # profiler (over rebuilds and resets, see StageProfiler.reset).
+        if implicit and (time_step is None or adaptive_time_step):
+            raise ValueError(
+                "The time step of the implicit stepper is not selected, "
+                "give a time step."
+            )
+        self.implicit = implicit
+        if not implicit:
+            self.StatefulStepper = ea.PositionVerlet()  # Integrator type
 
         self.final_time = final_time
-        self.time_step = time_step
-        self.total_steps = int(self.final_time / self.time_step)
         self.recording_fps = recording_fps
-        self.step_skip = int(1.0 / (self.recording_fps * self.time_step))
+        self.select_time_steps = time_step is None or adaptive_time_step
+        self.adaptive_time_step = adaptive_time_step
+        self.adaptation_interval = adaptation_interval
+        self.time_step = 1.0e-5 if time_step is None else time_step
+        self.profiler = profiler
+        # Recorders of the current build, and those of the previous build
+        # carried over to it, see make_recorder
+        self.recorders: list[TrajectoryRecorder] = []
+        self.reused_recorders: list[TrajectoryRecorder] = []
         self.reset()
 
     def reset(
         self,
+        final_time: float | None = None,
     ) -> None:
+        # Change the final time of the simulation if given
+        if final_time is not None:
+            self.final_time = final_time
+
+        self.build()
+        if self.select_time_steps:
+            # The stable time step only depends on the built rods
+            time_step = self.select_time_step()
+            if time_step != self.time_step:
+                self.time_step = time_step
+                self.build()
+
+        # Cache the initial state for fast_reset
+        self.initial_snapshot = self.snapshot(0.0)
+
+    def build(self, reuse_recorders: bool = False) -> None:
+        # Number of steps of the simulation and between recorded frames (a
+        # selected time step divides the recording interval exactly)
+        to_steps = round if self.select_time_steps else int
+        self.total_steps = to_steps(self.final_time / self.time_step)
+        self.step_skip = to_steps(1.0 / (self.recording_fps * self.time_step))
+        self.adaptation_steps = self.step_skip * max(
+            round(self.adaptation_interval * self.recording_fps), 1
+        )
+
+        # Close the recorders of the previous build (stopping their
+        # writers), setup makes new ones. With reuse_recorders, setup gets
+        # them back instead, with their frames and files, e.g. when only
+        # the time step changes (the initial state of the new simulation
+        # is then not recorded).
+        self.record_initial = not reuse_recorders
+        if reuse_recorders:
+            self.reused_recorders = self.recorders
+        else:
+            for recorder in self.recorders:
+                recorder.close()
+        self.recorders = []
+
         # Initialize the simulator
         self.simulator = BaseSimulator()
 
@@ -99,12 +189,31 @@ class BaseEnvironment(ABC):
 
         # Finalize the simulator and create time stepper
         self.simulator.finalize()
-        self.do_step, self.stages_and_updates = ea.extend_stepper_interface(
-            self.StatefulStepper, self.simulator
-        )
+        if self.implicit:
+            self.StatefulStepper = SemiImplicitEuler(
+                self.static_solvers(), self.damping_constant
+            )
+            self.do_step = SemiImplicitEuler.do_step
+            self.stages_and_updates = None
+        else:
+            (
+                self.do_step,
+                self.stages_and_updates,
+            ) = ea.extend_stepper_interface(
+                self.StatefulStepper, self.simulator
+            )
+
+    def fast_reset(self) -> float:
+        # Reset the simulation in place to its initial state (rods,
+        # pressures and recorded initial frame) without rebuilding the
+        # simulator, and return the initial time. The final time is
+        # unchanged, use reset to change it.
+        return self.restore(self.initial_snapshot)
 
     def step(self, time: float) -> float:
         # Run the simulation for one step
+        if self.profiler is not None:
+            start = perf_counter_ns()
         time = self.do_step(
             self.StatefulStepper,
             self.stages_and_updates,
@@ -112,10 +221,114 @@ class BaseEnvironment(ABC):
             time,
             self.time_step,
         )
+        if self.profiler is not None:
+            self.profiler.add("step", start)
+
+        if (
+            self.adaptive_time_step
+            and self.step_index(time) % self.adaptation_steps == 0
+        ):
+            self.adapt_time_step(time)
 
         # Return current simulation time
         return time
 
+    def static_solvers(self) -> list[StaticSolver]:
+        # Static solver of each rod, with the forcings whose stiffness
+        # matters for the stable time step and the implicit stepper (the
+        # loads of the simulation are not changed)
+        return [StaticSolver(rod, []) for rod in self.rods]
+
+    def stable_time_step(self) -> float:
+        # Largest stable time step of the rods about their current state,
+        # see cobra.stability
+        return min(stable_time_step(solver) for solver in self.static_solvers())
+
+    def select_time_step(self) -> float:
+        time_step, _ = aligned_time_step(
+            self.stable_time_step(), 1.0 / self.recording_fps
+        )
+        return time_step
+
+    def adapt_time_step(self, time: float) -> None:
+        # Select the time step at the current state, and switch to it if
+        # the current step is unstable or more than 10% below it. The
+        # dampers depend on the time step, hence the simulation is rebuilt
+        # and the state restored. The recorders are carried over as they
+        # are. The number of recorded frames is unchanged but total_steps
+        # changes, loop over the steps with
+        #     while env.step_index(time) < env.total_steps:
+        time_step = self.select_time_step()
+        if self.time_step <= time_step <= 1.1 * self.time_step:
+            return
+        arrays, metadata = self.checkpoint_state(recorders=False)
+        arrays = {name: array.copy() for name, array in arrays.items()}
+        self.time_step = time_step
+        self.build(reuse_recorders=True)
+        self.restore_state(arrays, metadata)
+
+    def step_index(self, time: float) -> int:
+        # Number of steps taken to reach time
+        return int(round(time / self.time_step))
+
+    def snapshot(self, time: float) -> tuple[dict[str, np.ndarray], dict]:
+        # Copy of the state of the simulation at time, see restore
+        arrays, metadata = self.checkpoint_state()
+        metadata.update(time=float(time), time_step=self.time_step)
+        return {name: array.copy() for name, array in arrays.items()}, metadata
+
+    def restore(self, snapshot: tuple[dict[str, np.ndarray], dict]) -> float:
+        # Restore a snapshot in place (the simulator is only rebuilt if the
+        # snapshot has another selected time step) and return its time
+        arrays, metadata = snapshot
+        if metadata["time_step"] != self.time_step and self.select_time_steps:
+            # Rebuild the simulation with the time step of the snapshot,
+            # whose recorded frames are restored below
+            self.time_step = metadata["time_step"]
+            self.build(reuse_recorders=True)
+        elif metadata["time_step"] != self.time_step:
+            # The damping coefficients depend on the time step
+            raise ValueError(
+                f"The snapshot time step {metadata['time_step']} differs "
+                f"from the time step {self.time_step} of the environment."
+            )
+        self.restore_state(arrays, metadata)
+        return np.float64(metadata["time"])
+
+    def save_checkpoint(self, filename: str, time: float) -> None:
+        # Snapshot of the simulation at time into one .npz file, see
+        # load_checkpoint
+        write_checkpoint(filename, *self.snapshot(time))
+
+    def load_checkpoint(self, filename: str) -> float:
+        # Restore a snapshot of save_checkpoint and return its time, to
+        # continue the simulation with
+        #     time = env.load_checkpoint(filename)
+        #     for _ in range(env.step_index(time), env.total_steps):
+        #         time = env.step(time, ...)
+        return self.restore(read_checkpoint(filename))
+
+    def checkpoint_state(
+        self, recorders: bool = True
+    ) -> tuple[dict[str, np.ndarray], dict]:
+        # Arrays and metadata of the mutable state, i.e. the arrays of the
+        # rods in self.rods, and the recorded frames of the subclasses if
+        # recorders (restore_state leaves the recorders as they are without
+        # them). The dampers have no state of their own, the Jacobians
+        # reused by the implicit stepper are recomputed after a restore.
+        arrays = {}
+        for index, rod in enumerate(self.rods):
+            arrays.update(rod_state(rod, prefix=f"rod{index}/"))
+        return arrays, {}
+
+    def restore_state(
+        self, arrays: dict[str, np.ndarray], metadata: dict
+    ) -> None:
+        for index, rod in enumerate(self.rods):
+            restore_rod_state(rod, arrays, prefix=f"rod{index}/")
+        if self.implicit:
+            self.StatefulStepper.invalidate()
+
     @abstractmethod
     def setup(
         self,
@@ -124,7 +337,26 @@ class BaseEnvironment(ABC):
 
 
 class BR2Environment(BaseEnvironment):
-    def __init__(self, *args, **kwargs) -> None:
+    damping_constant = 0.05  # damping constant of the BR2 arm
+
+    def __init__(
+        self,
+        *args,
+        recording_path: str | None = None,
+        recorder_options: dict | None = None,
+        actuation_options: dict | None = None,
+        **kwargs,
+    ) -> None:
+        # The recorded frames are streamed to files in recording_path if
+        # given, otherwise kept in memory until save. The recorded fields,
+        # their dtype, the recording decimation and the compression of the
+        # saved file are set by recorder_options, see TrajectoryRecorder.
+        # The decimation of the actuation loads is set by actuation_options,
+        # see ApplyActuations. With profiler (see BaseEnvironment), the
+        # stages of the steps are also saved by save.
+        self.recording_path = recording_path
+        self.recorder_options = recorder_options or {}
+        self.actuation_options = actuation_options or {}
         if BSR_AVAILABLE:
             bsr.clear_mesh_objects()
         super().__init__(*args, **kwargs)
@@ -137,6 +369,58 @@ class BR2Environment(BaseEnvironment):
     def setup_BR2(
         self,
     ) -> None:
+        # Setup rod recorder
+        self.rod_recorder = self.make_recorder(self.recording_path)
+
+        self.rod, br2_property, actuator_FREEs = self.add_BR2(self.rod_recorder)
+        self.rods = [self.rod]
+        (
+            self.bending_actuation,
+            self.rotation_CW_actuation,
+            self.rotation_CCW_actuation,
+        ) = actuator_FREEs
+        self.simulator.add_forcing_to(self.rod).using(
+            ApplyFREEs,
+            actuator_FREEs=actuator_FREEs,
+            profiler=self.profiler,
+            **self.actuation_options,
+        )
+
+        if BSR_AVAILABLE:
+            # Setup blender rod callback
+            self.simulator.collect_diagnostics(self.rod).using(
+                BlenderBR2CallBack,
+                step_skip=self.step_skip,
+                property=br2_property,
+                system=self.rod,
+                profiler=self.profiler,
+            )
+
+    def make_recorder(self, path: str | None) -> TrajectoryRecorder:
+        # Recorder of this build, closed by the next build, or the next
+        # recorder of the previous build if reused (see build)
+        if self.reused_recorders:
+            recorder = self.reused_recorders.pop(0)
+        else:
+            recorder = TrajectoryRecorder(
+                n_frames=n_recorded_frames(
+                    self.total_steps,
+                    self.step_skip,
+                    self.recorder_options.get("decimation", 1),
+                ),
+                path=path,
+                **self.recorder_options,
+            )
+        self.recorders.append(recorder)
+        return recorder
+
+    def add_BR2(
+        self, rod_recorder: TrajectoryRecorder
+    ) -> tuple[ea.CosseratRod, BR2Property, list[BaseFREE]]:
+        # Add a BR2 arm (rod, damping, callback, boundary condition and
+        # gravity) to the simulator, and return it with its FREE actuators,
+        # whose forcing is left to the caller.
+
         # BR2 arm parameters
         bending_actuation_direction: Axis = Axis([-1.0, 0.0, 0.0])
 
@@ -153,7 +437,6 @@ class BR2Environment(BaseEnvironment):
         density = 700  # density of the BR2 arm
         youngs_modulus = 3 * 1e6  # Young's modulus of the BR2 arm
         poisson_ratio = 0.5  # Poisson's ratio of the BR2 arm
-        damping_constant = 0.05  # damping constant of the BR2 arm
 
         # Adjust for the hollow rod
         FREE_radius_ratio = np.sqrt(3) / (2 + np.sqrt(3))
@@ -168,7 +451,7 @@ class BR2Environment(BaseEnvironment):
         )
 
         # Setup a rod
-        self.rod = ea.CosseratRod.straight_rod(
+        rod = ea.CosseratRod.straight_rod(
             n_elements=n_elements,
             start=np.zeros((3,)),
             direction=direction.to_numpy(),
@@ -181,36 +464,38 @@ class BR2Environment(BaseEnvironment):
         )
 
         # Adjust for the inextensibility and unshearability
-        # self.rod.shear_matrix = 100 * self.rod.shear_matrix
+        # rod.shear_matrix = 100 * rod.shear_matrix
 
-        self.simulator.append(self.rod)
+        self.simulator.append(rod)
 
-        # Setup viscous damping
-        self.simulator.dampen(self.rod).using(
-            ea.AnalyticalLinearDamper,
-            damping_constant=damping_constant,
-            time_step=self.time_step,
-        )
+        # Setup viscous damping (in the implicit stepper if implicit)
+        if not self.implicit:
+            self.simulator.dampen(rod).using(
+                ea.AnalyticalLinearDamper,
+                damping_constant=self.damping_constant,
+                time_step=self.time_step,
+            )
 
         # Setup rod callback
-        self.rod_callback_params = ea.defaultdict(list)
-        self.simulator.collect_diagnostics(self.rod).using(
+        self.simulator.collect_diagnostics(rod).using(
             RodCallBack,
             step_skip=self.step_skip,
-            callback_params=self.rod_callback_params,
+            recorder=rod_recorder,
+            profiler=self.profiler,
+            record_initial=self.record_initial,
         )
 
         # Setup boundary conditions
-        self.simulator.constrain(self.rod).using(
+        self.simulator.constrain(rod).using(
             ea.OneEndFixedBC,
             constrained_position_idx=(0,),
             constrained_director_idx=(0,),
         )
 
         # Setup gravity force
-        acc_gravity = np.array([0.0, 0.0, -9.80665])
-        self.simulator.add_forcing_to(self.rod).using(
-            ea.GravityForces, acc_gravity=acc_gravity
+        self.acc_gravity = np.array([0.0, 0.0, -9.80665])
+        self.simulator.add_forcing_to(rod).using(
+            ea.GravityForces, acc_gravity=self.acc_gravity
         )
 
         # Setup the BR2 arm presure actuation model
@@ -258,52 +543,120 @@ class BR2Environment(BaseEnvironment):
         rotation_CW_actuation_couple_coefficients = np.array([0.0006, 0.0])
         rotation_CCW_actuation_couple_coefficients = np.array([-0.0006, 0.0])
 
-        self.bending_actuation = BaseFREE(
+        bending_actuation = BaseFREE(
             position=br2_property.bending_actuation_position,
             pressure_coefficients=PressureCoefficients(
                 force=bending_actuation_force_coefficients,
                 couple=np.array([0.0, 0.0, 0.0]),
             ),
         )
-        self.rotation_CW_actuation = BaseFREE(
+        rotation_CW_actuation = BaseFREE(
             position=br2_property.rotation_CW_actuation_position,
             pressure_coefficients=PressureCoefficients(
                 force=np.array([0.0, 0.0, 0.0]),
                 couple=rotation_CW_actuation_couple_coefficients,
             ),
         )
-        self.rotation_CCW_actuation = BaseFREE(
+        rotation_CCW_actuation = BaseFREE(
             position=br2_property.rotation_CCW_actuation_position,
             pressure_coefficients=PressureCoefficients(
                 force=np.array([0.0, 0.0, 0.0]),
                 couple=rotation_CCW_actuation_couple_coefficients,
             ),
         )
-        self.simulator.add_forcing_to(self.rod).using(
-            ApplyFREEs,
-            actuator_FREEs=[
-                self.bending_actuation,
-                self.rotation_CW_actuation,
-                self.rotation_CCW_actuation,
-            ],
+        return (
+            rod,
+            br2_property,
+            [bending_actuation, rotation_CW_actuation, rotation_CCW_actuation],
         )
 
-        if BSR_AVAILABLE:
-            # Setup blender rod callback
-            self.simulator.collect_diagnostics(self.rod).using(
-                BlenderBR2CallBack,
-                step_skip=self.step_skip,
-                property=br2_property,
-                system=self.rod,
-            )
-
     def step(self, time: float, pressures: np.ndarray = np.zeros(3)) -> float:
+        self.set_pressures(pressures)
+        return super().step(time)
+
+    def run(
+        self,
+        time: float,
+        n_steps: int,
+        schedule: PressureSchedule,
+        hold_steps: int = 1,
+    ) -> float:
+        # Run the simulation for n_steps steps with the pressures of
+        # schedule, evaluated by its compiled kernel and applied every
+        # hold_steps steps (the control is decimated, the pressures being
+        # held in between). The pressures are updated at the multiples of
+        # hold_steps of the step index, so consecutive runs line up, e.g.
+        #     for _ in range(n_frames):
+        #         time = env.run(time, env.step_skip, schedule)
+        pressures = np.zeros(schedule.n_channels)
+        for _ in range(n_steps):
+            if self.step_index(time) % hold_steps == 0:
+                schedule.evaluate(time, pressures)
+                self.set_pressures(pressures)
+            time = BaseEnvironment.step(self, time)
+        return time
+
+    def set_pressures(self, pressures: np.ndarray) -> None:
         # Apply pressures to the BR2 arm
         self.bending_actuation.pressure = pressures[0]
         self.rotation_CW_actuation.pressure = pressures[1]
         self.rotation_CCW_actuation.pressure = pressures[2]
 
-        return super().step(time)
+    def static_solvers(self) -> list[StaticSolver]:
+        return [self.static_solver()]
+
+    def static_solver(self, **kwargs) -> StaticSolver:
+        # Quasi-static equilibria of the arm under the pressures set by
+        # set_pressures and gravity, solved in place of the rod state, see
+        # StaticSolver for the options
+        return StaticSolver(
+            self.rod,
+            [
+                ApplyFREEs(
+                    actuator_FREEs=[
+                        self.bending_actuation,
+                        self.rotation_CW_actuation,
+                        self.rotation_CCW_actuation,
+                    ]
+                ),
+                ea.GravityForces(acc_gravity=self.acc_gravity),
+            ],
+            **kwargs,
+        )
+
+    def checkpoint_state(
+        self, recorders: bool = True
+    ) -> tuple[dict[str, np.ndarray], dict]:
+        arrays, metadata = super().checkpoint_state(recorders)
+        arrays["pressures"] = np.array(
+            [
+                self.bending_actuation.pressure,
+                self.rotation_CW_actuation.pressure,
+                self.rotation_CCW_actuation.pressure,
+            ]
+        )
+        if not recorders:
+            return arrays, metadata
+        recorder_arrays, metadata["recorder"] = self.rod_recorder.state()
+        for name, array in recorder_arrays.items():
+            arrays["recorder/" + name] = array
+        return arrays, metadata
+
+    def restore_state(
+        self, arrays: dict[str, np.ndarray], metadata: dict
+    ) -> None:
+        super().restore_state(arrays, metadata)
+        (
+            self.bending_actuation.pressure,
+            self.rotation_CW_actuation.pressure,
+            self.rotation_CCW_actuation.pressure,
+        ) = arrays["pressures"]
+        if "recorder" in metadata:
+            self.rod_recorder.set_state(
+                self.rod,
+                with_prefix(arrays, "recorder/"),
+                metadata["recorder"],
+            )
 
     def save(self, filename: str) -> None:
         while filename.endswith(".npz") or filename.endswith(".blend"):
@@ -312,8 +665,10 @@ class BR2Environment(BaseEnvironment):
             if filename.endswith(".blend"):
                 filename = filename[:-6]
 
-        # Save as .npz file
-        np.savez(filename + ".npz", **self.rod_callback_params)
+        # Save as .npz file, or as a trajectory store folder
+        self.rod_recorder.save(
+            filename if self.rod_recorder.store else filename + ".npz"
+        )
 
         if BSR_AVAILABLE:
             # Set the final keyframe number
@@ -322,6 +677,121 @@ class BR2Environment(BaseEnvironment):
             # Save as .blend file
             bsr.save(filename + ".blend")
 
+        if self.profiler is not None:
+            # Save the stages of the steps as _profile.json file, the
+            # PyElastica internals (stepping, damping, boundary conditions,
+            # gravity) being the rest of the steps
+            self.profiler.add_remainder(
+                "PyElastica", "step", ["actuations", "callbacks"]
+            )
+            self.profiler.save(filename + "_profile.json")
+
+
+class BR2EnsembleEnvironment(BR2Environment):
+    """
+    Ensemble of independent BR2 arms advanced in lockstep, each arm with its
+    own pressures. The FREE actuation of all arms is computed by one
+    compiled call per step, see FREEEnsemble.
+    """
+
+    def __init__(
+        self,
+        n_arms: int,
+        *args,
+        recording_path: str | None = None,
+        recorder_options: dict | None = None,
+        **kwargs,
+    ) -> None:
+        self.n_arms = n_arms
+        self.recording_path = recording_path
+        self.recorder_options = recorder_options or {}
+        BaseEnvironment.__init__(self, *args, **kwargs)
+
+    def setup(
+        self,
+    ) -> None:
+        self.rods = []
+        self.rod_recorders = []
+        for arm in range(self.n_arms):
+            rod_recorder = self.make_recorder(
+                None
+                if self.recording_path is None
+                else os.path.join(self.recording_path, f"arm{arm:03d}")
+            )
+            rod, _, actuator_FREEs = self.add_BR2(rod_recorder)
+            self.rods.append(rod)
+            self.rod_recorders.append(rod_recorder)
+
+        # The actuators of the last arm serve as the templates of all arms
+        self.ensemble = FREEEnsemble(self.rods, actuator_FREEs)
+        for rod_index, rod in enumerate(self.rods):
+            self.simulator.add_forcing_to(rod).using(
+                ApplyFREEEnsemble,
+                ensemble=self.ensemble,
+                rod_index=rod_index,
+            )
+
+    def static_solvers(self) -> list[StaticSolver]:
+        # Without the stiffness of the actuation of the ensemble
+        return BaseEnvironment.static_solvers(self)
+
+    def step(
+        self, time: float, pressures: np.ndarray = np.zeros((1, 3))
+    ) -> float:
+        self.set_pressures(pressures)
+        return BaseEnvironment.step(self, time)
+
+    def set_pressures(self, pressures: np.ndarray) -> None:
+        # Apply pressures, a (n_arms, 3) array (or a (3,) array shared by
+        # all arms, or the (3 n_arms,) channels of a PressureSchedule), to
+        # the BR2 arms
+        self.ensemble.pressures = np.reshape(pressures, (-1, 3))
+
+    def checkpoint_state(
+        self, recorders: bool = True
+    ) -> tuple[dict[str, np.ndarray], dict]:
+        arrays, metadata = BaseEnvironment.checkpoint_state(self, recorders)
+        arrays["pressures"] = self.ensemble.pressures.copy()
+        if not recorders:
+            return arrays, metadata
+        metadata["recorders"] = []
+        for arm, rod_recorder in enumerate(self.rod_recorders):
+            recorder_arrays, counters = rod_recorder.state()
+            for name, array in recorder_arrays.items():
+                arrays[f"recorder{arm}/" + name] = array
+            metadata["recorders"].append(counters)
+        return arrays, metadata
+
+    def restore_state(
+        self, arrays: dict[str, np.ndarray], metadata: dict
+    ) -> None:
+        BaseEnvironment.restore_state(self, arrays, metadata)
+        self.ensemble.pressures = arrays["pressures"]
+        if "recorders" not in metadata:
+            return
+        for arm, rod_recorder in enumerate(self.rod_recorders):
+            rod_recorder.set_state(
+                self.rods[arm],
+                with_prefix(arrays, f"recorder{arm}/"),
+                metadata["recorders"][arm],
+            )
+
+    def save(self, filename: str) -> None:
+        if filename.endswith(".npz"):
+            filename = filename[:-4]
+
+        # Save as .npz file, with the arms stacked along the first axis
+        arm_data = [
+            rod_recorder.as_dict() for rod_recorder in self.rod_recorders
+        ]
+        np.savez(
+            filename + ".npz",
+            **{
+                key: np.stack([data[key] for data in arm_data])
+                for key in arm_data[0]
+            },
+        )
+
 
 def main(
     final_time: float = 5.0,
@@ -0,0 +1,97 @@
+"""
+Static map of the BR2 arm: the rest shape of the arm at every pressure of a
+bend / twist grid, solved by the quasi-static equilibrium solver instead of
+simulating each pressure until the arm settles.
+
+Usage: python static_br2_map.py [--output FILE] [--step PSI]
+       [--twist-channel {1,2}]
+
+The grid is traversed in boustrophedon order, each equilibrium being solved
+from the previous one (continuation), and saved as a .npz file with the
+pressures, positions, directors, curvatures and strains of the grid.
+"""
+
+import argparse
+import time as timer
+
+import numpy as np
+from set_br2_environment import BR2Environment
+
+from cobra.statics import snake_order
+
+# Pressure channels of the BR2 arm
+BEND, TWIST_CW, TWIST_CCW = 0, 1, 2
+
+
+def static_map(
+    env: BR2Environment,
+    bends: np.ndarray,
+    twists: np.ndarray,
+    twist_channel: int,
+) -> dict[str, np.ndarray]:
+    solver = env.static_solver()
+    shape = (len(bends), len(twists))
+    results: dict[str, np.ndarray] = {
+        "pressures": np.zeros((*shape, 3)),
+        "converged": np.zeros(shape, dtype=bool),
+        "n_iterations": np.zeros(shape, dtype=int),
+    }
+
+    # Equilibrium of the unpressurized arm sagging under gravity
+    env.set_pressures(np.zeros(3))
+    solver.solve()
+
+    loads = []
+    for bend_index, twist_index in snake_order(shape):
+        pressures = np.zeros(3)
+        pressures[BEND] = bends[bend_index]
+        pressures[twist_channel] = twists[twist_index]
+        loads.append(pressures)
+    solutions = solver.solve_path(
+        env.set_pressures, loads, start_load=np.zeros(3)
+    )
+
+    for (bend_index, twist_index), load, (result, state) in zip(
+        snake_order(shape), loads, solutions
+    ):
+        index = (bend_index, twist_index)
+        results["pressures"][index] = load
+        results["converged"][index] = result.converged
+        results["n_iterations"][index] = result.n_iterations
+        for name, array in state.items():
+            if name not in results:
+                results[name] = np.zeros((*shape, *array.shape))
+            results[name][index] = array
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=str, default="static_map.npz")
+    parser.add_argument(
+        "--step", type=float, default=5.0, help="pressure grid step [psi]"
+    )
+    parser.add_argument(
+        "--twist-channel", type=int, default=TWIST_CCW, choices=[1, 2]
+    )
+    args = parser.parse_args()
+
+    bends = np.arange(0, 30 + args.step, args.step)
+    twists = np.arange(0, 25 + args.step, args.step)
+    env = BR2Environment(final_time=0.0)
+
+    start = timer.perf_counter()
+    results = static_map(env, bends, twists, args.twist_channel)
+    elapsed = timer.perf_counter() - start
+    np.savez(args.output, bends=bends, twists=twists, **results)
+
+    print(
+        f"{results['converged'].sum()}/{results['converged'].size} "
+        f"equilibria converged in {elapsed:.1f} s "
+        f"({elapsed / results['converged'].size:.2f} s per pressure), "
+        f"saved to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
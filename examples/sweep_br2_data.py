@@ -0,0 +1,338 @@
+"""
+Parameter sweep of BR2 simulations on a pool of worker processes, replacing
+one run of collect_br2_data.py / collect_br2_data2.py per case.
+
+Usage: python sweep_br2_data.py [--workers N] [--output FOLDER] [--restart]
+       [--full] [--decimation K] [--store] [--share-prefix] [--early-stop]
+       [--stable-time-step] [--threads]
+
+An interrupted sweep is resumed by running the same command again.
+
+With --share-prefix, the grid of every first ramp level with every second
+ramp level of collect_br2_data2.py is run in one process, simulating the
+first phase shared by the cases with the same first ramp only once.
+"""
+
+import argparse
+import functools
+import os
+import time as timer
+
+import numpy as np
+from set_br2_environment import BR2Environment
+
+from cobra.recorder import DATASET_FIELDS
+from cobra.steady_state import SteadyStateDetector
+from cobra.sweep import PrefixSharingScheduler, SweepRunner, parameter_grid
+
+# Pressure channels of the BR2 arm
+BEND, TWIST_CW, TWIST_CCW = 0, 1, 2
+
+
+def ramp(time: float, rate: float, start_time: float = 0.0) -> float:
+    # Pressure ramping up from start_time at rate, clamped at rate
+    return min(max(rate * (time - start_time), 0.0), rate)
+
+
+def pressure_profile(parameters: dict, time: float) -> np.ndarray:
+    bend = parameters["bend"]
+    twist = parameters["twist"]
+    twist_channel = parameters["twist_channel"]
+    middle_step_time = parameters.get("middle_step_time", 2.0)
+    pressures = np.zeros(3)
+    if parameters["profile"] == "ramp":
+        # collect_br2_data.py
+        pressures[BEND] = ramp(time, bend)
+        pressures[twist_channel] = ramp(time, twist)
+    elif parameters["profile"] == "twist_then_bend":
+        # first half of collect_br2_data2.py
+        pressures[twist_channel] = ramp(time, twist)
+        pressures[BEND] = ramp(time, bend, middle_step_time)
+    elif parameters["profile"] == "bend_then_twist":
+        # second half of collect_br2_data2.py
+        pressures[BEND] = ramp(time, bend)
+        pressures[twist_channel] = ramp(time, twist, middle_step_time)
+    else:
+        raise ValueError(f"Unknown pressure profile {parameters['profile']}.")
+    return pressures
+
+
+def make_environment(
+    recorder_options: dict | None = None,
+    time_step: float | None = 1.0e-5,
+) -> BR2Environment:
+    # With time_step None, the largest stable time step dividing the
+    # recording interval is used
+    return BR2Environment(
+        final_time=0.0,
+        time_step=time_step,
+        recording_fps=30,
+        recorder_options=recorder_options,
+    )
+
+
+def warmup(env: BR2Environment) -> None:
+    # Compile (or load from the numba cache) the kernels of a step
+    env.reset(final_time=1.0e-3)
+    time = np.float64(0.0)
+    for _ in range(env.total_steps):
+        time = env.step(time=time, pressures=np.array([10.0, 5.0, 0.0]))
+
+
+def hold_start_time(parameters: dict) -> float:
+    # Time from which the pressures of a case are held constant, the ramps
+    # reaching their level after 1 s
+    if parameters["profile"] == "ramp":
+        return 1.0
+    return parameters.get("middle_step_time", 2.0) + 1.0
+
+
+def run_case(
+    env: BR2Environment,
+    parameters: dict,
+    filename: str,
+    early_stop: bool = False,
+) -> dict:
+    # The environment is only rebuilt when the final time changes
+    if parameters["final_time"] == env.final_time:
+        env.fast_reset()
+    else:
+        env.reset(final_time=parameters["final_time"])
+
+    # With early_stop, the case ends once the arm has settled during the
+    # final pressure hold
+    detector = SteadyStateDetector() if early_stop else None
+    hold_start = hold_start_time(parameters)
+    time = np.float64(0.0)
+    n_steps = 0
+    for _ in range(env.total_steps):
+        time = env.step(time=time, pressures=pressure_profile(parameters, time))
+        n_steps += 1
+        if (
+            detector is not None
+            and time >= hold_start
+            and detector.update(env.rod, time)
+        ):
+            break
+    env.save(filename)
+
+    settling_time = None
+    if detector is not None and detector.settling_time is not None:
+        settling_time = float(detector.settling_time - hold_start)
+    return {"n_steps": n_steps, "settling_time": settling_time}
+
+
+def bend_twist_cases() -> tuple[list[dict], list[str]]:
+    # The bend / twist grids of collect_br2_data.py and collect_br2_data2.py,
+    # with the names they are saved under by these scripts (the second grid
+    # from BR2_simulation24, see examples/dataset/create_arm_data_set.py)
+    bend_max = 30
+    twist_max = 25
+    factor = 5
+    bends = np.arange(0, bend_max + factor, factor)
+    twists = np.arange(0, twist_max + factor, factor)
+    ramp_cases = parameter_grid(
+        profile=["ramp"],
+        bend=[bend_max],
+        twist=twists,
+        twist_channel=[TWIST_CCW],
+        final_time=[3.0],
+    ) + parameter_grid(
+        profile=["ramp"],
+        bend=bends[:-1],
+        twist=[twist_max],
+        twist_channel=[TWIST_CCW],
+        final_time=[3.0],
+    )
+    two_phase_cases = parameter_grid(
+        profile=["twist_then_bend"],
+        bend=[bend_max],
+        twist=twists[1:],
+        twist_channel=[TWIST_CW],
+        final_time=[4.0],
+    ) + parameter_grid(
+        profile=["bend_then_twist"],
+        bend=bends[1:],
+        twist=[twist_max],
+        twist_channel=[TWIST_CW],
+        final_time=[4.0],
+    )
+    names = [f"BR2_simulation{index:02d}" for index in range(len(ramp_cases))]
+    names += [
+        f"BR2_simulation{index + 24:02d}"
+        for index in range(len(two_phase_cases))
+    ]
+    return ramp_cases + two_phase_cases, names
+
+
+def two_phase_grid_cases() -> list[dict]:
+    # Every first ramp level of collect_br2_data2.py with every second ramp
+    # level, hence each first phase is shared by several cases
+    bends = np.arange(0, 30 + 5, 5)
+    twists = np.arange(0, 25 + 5, 5)
+    return parameter_grid(
+        profile=["twist_then_bend"],
+        twist=twists[1:],
+        bend=bends,
+        twist_channel=[TWIST_CW],
+        final_time=[4.0],
+    ) + parameter_grid(
+        profile=["bend_then_twist"],
+        bend=bends[1:],
+        twist=twists,
+        twist_channel=[TWIST_CW],
+        final_time=[4.0],
+    )
+
+
+def case_phases(parameters: dict) -> list[tuple]:
+    # Phases (parameters, start time, end time) of the pressure history of
+    # a case. Before middle_step_time, only the first ramp of a two-phase
+    # profile is active, so the cases with the same first ramp share their
+    # first phase.
+    final_time = parameters["final_time"]
+    history = {
+        name: value
+        for name, value in parameters.items()
+        if name != "final_time"
+    }
+    if parameters["profile"] == "ramp":
+        return [(tuple(sorted(history.items())), 0.0, final_time)]
+    middle_step_time = parameters.get("middle_step_time", 2.0)
+    second_ramp = (
+        "bend" if parameters["profile"] == "twist_then_bend" else "twist"
+    )
+    first_phase = {**history, second_ramp: 0.0}
+    return [
+        (tuple(sorted(first_phase.items())), 0.0, middle_step_time),
+        (tuple(sorted(history.items())), middle_step_time, final_time),
+    ]
+
+
+def run_phase(env: BR2Environment, phase: tuple, time: float) -> float:
+    parameters, _, end_time = phase
+    parameters = dict(parameters)
+    for _ in range(env.step_index(time), env.step_index(end_time)):
+        time = env.step(time=time, pressures=pressure_profile(parameters, time))
+    return time
+
+
+def run_shared_prefix(
+    cases: list[dict],
+    names: list[str],
+    output_folder: str,
+    recorder_options: dict,
+    resume: bool,
+    time_step: float | None = 1.0e-5,
+) -> None:
+    os.makedirs(output_folder, exist_ok=True)
+    pending = [
+        index
+        for index, name in enumerate(names)
+        if not resume
+        or not (
+            os.path.exists(os.path.join(output_folder, name + ".npz"))
+            or os.path.isdir(os.path.join(output_folder, name))
+        )
+    ]
+    env = make_environment(recorder_options, time_step)
+    env.reset(final_time=max(case["final_time"] for case in cases))
+
+    def finish_case(env: BR2Environment, index: int, time: float) -> None:
+        env.save(os.path.join(output_folder, names[pending[index]]))
+        print(f"{names[pending[index]]} finished")
+
+    start = timer.perf_counter()
+    scheduler = PrefixSharingScheduler(env, run_phase, finish_case)
+    times = scheduler.run([case_phases(cases[index]) for index in pending])
+    print(
+        f"{len(pending)} cases in {timer.perf_counter() - start:.2f} s, "
+        f"simulated {times['simulated_time']:.1f} s instead of "
+        f"{times['case_time']:.1f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", type=str, default="dataset/Data")
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore finished cases"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="record all fields in float64 instead of the dataset fields "
+        "in float32 (compressed)",
+    )
+    parser.add_argument(
+        "--decimation", type=int, default=1, help="recording decimation"
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="save every case as a trajectory store (random access to "
+        "frames) instead of a .npz file",
+    )
+    parser.add_argument(
+        "--early-stop",
+        action="store_true",
+        help="end each case once the arm has settled, see "
+        "SteadyStateDetector (the settling time is logged)",
+    )
+    parser.add_argument(
+        "--share-prefix",
+        action="store_true",
+        help="run the two-phase grid, sharing the first phases",
+    )
+    parser.add_argument(
+        "--stable-time-step",
+        action="store_true",
+        help="use the largest stable time step dividing the recording "
+        "interval instead of 1e-5 s",
+    )
+    parser.add_argument(
+        "--threads",
+        action="store_true",
+        help="run the cases on threads of one process instead of worker "
+        "processes (only the actuation kernels run in parallel)",
+    )
+    args = parser.parse_args()
+    time_step = None if args.stable_time_step else 1.0e-5
+
+    recorder_options = dict(decimation=args.decimation, store=args.store)
+    if not args.full:
+        recorder_options.update(
+            fields=DATASET_FIELDS, dtype=np.float32, compress=True
+        )
+
+    if args.share_prefix:
+        cases = two_phase_grid_cases()
+        run_shared_prefix(
+            cases,
+            [f"BR2_two_phase{index:03d}" for index in range(len(cases))],
+            args.output,
+            recorder_options,
+            resume=not args.restart,
+            time_step=time_step,
+        )
+        return
+
+    cases, names = bend_twist_cases()
+    runner = SweepRunner(
+        functools.partial(make_environment, recorder_options, time_step),
+        functools.partial(run_case, early_stop=args.early_stop),
+        output_folder=args.output,
+        n_workers=args.workers,
+        warmup=warmup,
+        executor="thread" if args.threads else "process",
+    )
+    runner.run(
+        cases,
+        names=names,
+        resume=not args.restart,
+    )
+
+
+if __name__ == "__main__":
+    main()
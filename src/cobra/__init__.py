@@ -1,3 +1,5 @@
+from typing import Any
+
 import sys
 from importlib import metadata as importlib_metadata
 
@@ -10,3 +12,13 @@ def get_version() -> str:
 
 
 version: str = get_version()
+
+
+def __getattr__(name: str) -> Any:
+    # cobra.warmup is imported on demand, so that importing cobra does not
+    # import numba and PyElastica
+    if name == "warmup":
+        from cobra.compilation import warmup
+
+        return warmup
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
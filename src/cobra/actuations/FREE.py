@@ -1,38 +1,262 @@
-from typing import Iterable, Protocol
+from typing import Iterable, Optional, Protocol
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from time import perf_counter_ns
 
 import elastica as ea
 import numpy as np
 from numba import njit
 
-from cobra.actuations import ApplyActuations, ContinuousActuation
-from cobra.actuations.actuation_tool import force_induced_couple
-from cobra.math_tool import average2D, pointwise_multiplication
+from cobra.actuations import ApplyActuations, ContinuousActuation, RodGeometry
+from cobra.actuations.actuation_tool import apply_load, equivalent_external_load
+from cobra.actuations.pressure_map import PressureMap, as_pressure_map
+from cobra.profiling import StageProfiler
 from cobra.rod_geometry_tool import (
-    compute_local_shear,
-    compute_local_tangent,
-    sigma_to_shear,
+    compute_local_position_invariants,
+    update_local_tangent,
 )
 
 
-@dataclass
+@dataclass(frozen=True)
 class PressureCoefficients:
     """
     Dataclass containing pressure coefficients for force and couple.
+    Each of them is either an array of polynomial coefficients (as for
+    np.polyval) or a PressureMap. The pressure maps are built once, hence
+    the dataclass is frozen: assign new PressureCoefficients to the
+    actuation instead of modifying force or couple.
     """
 
-    force: np.ndarray
-    couple: np.ndarray
+    force: np.ndarray | PressureMap
+    couple: np.ndarray | PressureMap
+    force_map: PressureMap = field(init=False, repr=False, compare=False)
+    couple_map: PressureMap = field(init=False, repr=False, compare=False)
+    n_elements: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "force_map", as_pressure_map(self.force))
+        object.__setattr__(self, "couple_map", as_pressure_map(self.couple))
 
     def set_n_elements(self, n_elements: int) -> None:
-        self.ones = np.ones(n_elements)
+        object.__setattr__(self, "n_elements", n_elements)
+        self.force_map.set_n_elements(n_elements)
+        self.couple_map.set_n_elements(n_elements)
 
     def get_force_value(self, pressure: float) -> np.ndarray:
-        return np.polyval(self.force, pressure) * self.ones
+        value = np.zeros(self.n_elements)
+        self.force_map.evaluate(pressure, value)
+        return value
 
     def get_couple_value(self, pressure: float) -> np.ndarray:
-        return np.polyval(self.couple, pressure) * self.ones
+        value = np.zeros(self.n_elements)
+        self.couple_map.evaluate(pressure, value)
+        return value
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def compute_internal_load(
+    position: np.ndarray,
+    tangent: np.ndarray,
+    internal_force_value: np.ndarray,
+    internal_couple_value: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+) -> None:
+    # The element couple (local couple along the tangent plus the couple
+    # induced by the force at the FREE position) of the previous element
+    # is kept in scalars and averaged onto the voronoi domain on the fly.
+    blocksize = tangent.shape[1]
+    previous_couple_0 = 0.0
+    previous_couple_1 = 0.0
+    previous_couple_2 = 0.0
+    for i in range(blocksize):
+        force_0 = internal_force_value[i] * tangent[0, i]
+        force_1 = internal_force_value[i] * tangent[1, i]
+        force_2 = internal_force_value[i] * tangent[2, i]
+        internal_force[0, i] = force_0
+        internal_force[1, i] = force_1
+        internal_force[2, i] = force_2
+        couple_0 = position[1, i] * force_2 - position[2, i] * force_1
+        couple_1 = position[2, i] * force_0 - position[0, i] * force_2
+        couple_2 = (
+            position[0, i] * force_1
+            - position[1, i] * force_0
+            + internal_couple_value[i] * tangent[2, i]
+        )
+        if i > 0:
+            internal_couple[0, i - 1] = 0.5 * (previous_couple_0 + couple_0)
+            internal_couple[1, i - 1] = 0.5 * (previous_couple_1 + couple_1)
+            internal_couple[2, i - 1] = 0.5 * (previous_couple_2 + couple_2)
+        previous_couple_0 = couple_0
+        previous_couple_1 = couple_1
+        previous_couple_2 = couple_2
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def compute_FREE_internal_load(
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+    position: np.ndarray,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    shear: np.ndarray,
+    tangent: np.ndarray,
+    internal_force_value: np.ndarray,
+    internal_couple_value: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+) -> None:
+    # Rod state (with the shared rod geometry, see RodGeometry), invariant
+    # actuator geometry (see compute_local_position_invariants) and load
+    # values (see PressureMap) to material frame internal loads. Every
+    # intermediate result is written into the preallocated buffers of the
+    # actuator, hence no array is allocated.
+    update_local_tangent(
+        average_position,
+        position_gradient,
+        shear,
+        kappa,
+        voronoi_dilatation,
+        tangent,
+    )
+    compute_internal_load(
+        position,
+        tangent,
+        internal_force_value,
+        internal_couple_value,
+        internal_force,
+        internal_couple,
+    )
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def add_FREE_internal_load(
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+    position: np.ndarray,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    shear: np.ndarray,
+    tangent: np.ndarray,
+    internal_force_value: np.ndarray,
+    internal_couple_value: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+    total_internal_force: np.ndarray,
+    total_internal_couple: np.ndarray,
+) -> None:
+    # Same as compute_FREE_internal_load, followed by adding the internal
+    # loads onto the superposed internal loads of all actuations.
+    compute_FREE_internal_load(
+        average_position,
+        position_gradient,
+        position,
+        kappa,
+        voronoi_dilatation,
+        shear,
+        tangent,
+        internal_force_value,
+        internal_couple_value,
+        internal_force,
+        internal_couple,
+    )
+    apply_load(total_internal_force, internal_force)
+    apply_load(total_internal_couple, internal_couple)
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def compute_FREE_load(
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+    position: np.ndarray,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    shear: np.ndarray,
+    tangent: np.ndarray,
+    internal_force_value: np.ndarray,
+    internal_couple_value: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+    director_collection: np.ndarray,
+    rest_lengths: np.ndarray,
+    rest_voronoi_lengths: np.ndarray,
+    material_tangent: np.ndarray,
+    equivalent_external_force: np.ndarray,
+    equivalent_external_couple: np.ndarray,
+) -> None:
+    # Fused FREE actuation: rod state and load values to equivalent
+    # external loads.
+    compute_FREE_internal_load(
+        average_position,
+        position_gradient,
+        position,
+        kappa,
+        voronoi_dilatation,
+        shear,
+        tangent,
+        internal_force_value,
+        internal_couple_value,
+        internal_force,
+        internal_couple,
+    )
+    equivalent_external_load(
+        director_collection,
+        kappa,
+        material_tangent,
+        rest_lengths,
+        rest_voronoi_lengths,
+        internal_force,
+        internal_couple,
+        equivalent_external_force,
+        equivalent_external_couple,
+    )
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def apply_FREE_load(
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+    position: np.ndarray,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    shear: np.ndarray,
+    tangent: np.ndarray,
+    internal_force_value: np.ndarray,
+    internal_couple_value: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+    director_collection: np.ndarray,
+    rest_lengths: np.ndarray,
+    rest_voronoi_lengths: np.ndarray,
+    material_tangent: np.ndarray,
+    equivalent_external_force: np.ndarray,
+    equivalent_external_couple: np.ndarray,
+    external_forces: np.ndarray,
+    external_torques: np.ndarray,
+) -> None:
+    # Same as compute_FREE_load, followed by adding the equivalent
+    # external loads onto the rod, all within one compiled call.
+    compute_FREE_load(
+        average_position,
+        position_gradient,
+        position,
+        kappa,
+        voronoi_dilatation,
+        shear,
+        tangent,
+        internal_force_value,
+        internal_couple_value,
+        internal_force,
+        internal_couple,
+        director_collection,
+        rest_lengths,
+        rest_voronoi_lengths,
+        material_tangent,
+        equivalent_external_force,
+        equivalent_external_couple,
+    )
+    apply_load(external_forces, equivalent_external_force)
+    apply_load(external_torques, equivalent_external_couple)
 
 
 class RequiredMaxPressure(Protocol):
@@ -69,9 +293,16 @@ class BaseFREE(ContinuousActuation):
     ----------
     position : np.ndarray
         2D (3, n_element) array array containing data with 'float' type.
-        Array containing material frame position vectors.
+        Array containing material frame position vectors, stored as a
+        read-only copy: reassign position to change it. The terms that only
+        depend on the position and the rod rest properties are precomputed,
+        and computed again when the position or the rod rest properties are
+        reassigned (call invalidate_invariants after modifying the rest
+        properties in place).
     pressure_coefficients : PressureCoefficients
-        Dataclass containing pressure coefficients for force and couple.
+        Dataclass containing pressure coefficients (or pressure maps) for
+        force and couple. The maps are evaluated again when the pressure
+        changes, or when pressure_coefficients is reassigned.
     pressure_maximum : float, optional
         Maximum pressure value with unit [psi], by default 30.0.
     """
@@ -85,68 +316,201 @@ class BaseFREE(ContinuousActuation):
         pressure_maximum: float = 30.0,
     ):
         super().__init__(n_elements=position.shape[1])
+        self.average_position = np.zeros((3, self.n_elements - 1))
+        self.position_gradient = np.zeros((3, self.n_elements - 1))
         self.position = position
-        self.pressure_coefficients = pressure_coefficients
-        self.pressure_coefficients.set_n_elements(self.n_elements)
         self.pressure_maximum = pressure_maximum
         self.tangent = np.zeros((3, self.n_elements))
-        self.internal_force_value = self.pressure_coefficients.get_force_value(
-            self.pressure
+        self.internal_force_value = np.zeros(self.n_elements)
+        self.internal_couple_value = np.zeros(self.n_elements)
+        self.evaluated_pressure = np.nan
+        self.zero_load_value = True
+        self.pressure_coefficients = pressure_coefficients
+
+    compute_internal_load = staticmethod(compute_internal_load)
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.__position
+
+    @position.setter
+    def position(self, position: np.ndarray) -> None:
+        if position.shape != (3, self.n_elements):
+            raise ValueError(
+                f"FREE position should be a (3, {self.n_elements}) array, "
+                f"got {position.shape}."
+            )
+        # Read-only, an in-place change would not update the invariants
+        position = np.array(position, dtype=np.float64, order="C")
+        position.flags.writeable = False
+        self.__position = position
+        self.invalidate_invariants()
+
+    def update_invariants(self, system: ea.CosseratRod) -> None:
+        compute_local_position_invariants(
+            self.position,
+            system.rest_voronoi_lengths,
+            self.average_position,
+            self.position_gradient,
+        )
+
+    @property
+    def pressure_coefficients(self) -> PressureCoefficients:
+        return self.__pressure_coefficients
+
+    @pressure_coefficients.setter
+    def pressure_coefficients(
+        self, pressure_coefficients: PressureCoefficients
+    ) -> None:
+        pressure_coefficients.set_n_elements(self.n_elements)
+        self.__pressure_coefficients = pressure_coefficients
+        self.update_load_value(force_update=True)
+
+    def update_load_value(self, force_update: bool = False) -> None:
+        # The pressure maps are only evaluated when the pressure has changed
+        # since the last evaluation.
+        pressure = self.pressure
+        if not force_update and pressure == self.evaluated_pressure:
+            return
+        self.pressure_coefficients.force_map.evaluate(
+            pressure, self.internal_force_value
         )
-        self.internal_couple_value = (
-            self.pressure_coefficients.get_couple_value(self.pressure)
+        self.pressure_coefficients.couple_map.evaluate(
+            pressure, self.internal_couple_value
+        )
+        self.evaluated_pressure = pressure
+        self.zero_load_value = not (
+            self.internal_force_value.any() or self.internal_couple_value.any()
         )
 
-    def __call__(self, system: ea.CosseratRod) -> None:
-        self.tangent[:, :] = compute_local_tangent(
-            compute_local_shear(
-                self.position,
-                sigma_to_shear(system.sigma),
-                system.kappa,
-                pointwise_multiplication(
-                    system.rest_voronoi_lengths, system.voronoi_dilatation
-                ),
-            )
+    def is_inactive(self) -> bool:
+        self.update_load_value()
+        return self.zero_load_value
+
+    def __call__(
+        self,
+        system: ea.CosseratRod,
+        geometry: Optional[RodGeometry] = None,
+    ) -> None:
+        geometry = self.get_geometry(system, geometry)
+        compute_FREE_load(
+            *self._internal_load_arguments(system, geometry),
+            *self._equivalent_load_arguments(system, geometry),
         )
-        self.internal_force_value[:] = (
-            self.pressure_coefficients.get_force_value(self.pressure)
+
+    def apply(
+        self,
+        system: ea.CosseratRod,
+        geometry: Optional[RodGeometry] = None,
+        profiler: Optional[StageProfiler] = None,
+    ) -> None:
+        geometry = self.get_geometry(system, geometry)
+        if profiler is not None:
+            self._profiled_internal_load(system, geometry, profiler)
+            start = perf_counter_ns()
+            super().__call__(system, geometry)
+            apply_load(system.external_forces, self.equivalent_external_force)
+            apply_load(system.external_torques, self.equivalent_external_couple)
+            profiler.add("equivalent external loads", start)
+            return
+        # The argument tuples have no fixed length for mypy
+        apply_FREE_load(  # type: ignore[call-arg]
+            *self._internal_load_arguments(system, geometry),
+            *self._equivalent_load_arguments(system, geometry),
+            system.external_forces,
+            system.external_torques,
         )
-        self.internal_couple_value[:] = (
-            self.pressure_coefficients.get_couple_value(self.pressure)
+
+    def add_internal_load(
+        self,
+        system: ea.CosseratRod,
+        geometry: RodGeometry,
+        internal_force: np.ndarray,
+        internal_couple: np.ndarray,
+        profiler: Optional[StageProfiler] = None,
+    ) -> None:
+        if profiler is not None:
+            self._profiled_internal_load(system, geometry, profiler)
+            apply_load(internal_force, self.internal_force)
+            apply_load(internal_couple, self.internal_couple)
+            return
+        # The argument tuple has no fixed length for mypy
+        add_FREE_internal_load(  # type: ignore[call-arg]
+            *self._internal_load_arguments(system, geometry),
+            internal_force,
+            internal_couple,
         )
-        self.compute_internal_load(
+
+    def _profiled_internal_load(
+        self,
+        system: ea.CosseratRod,
+        geometry: RodGeometry,
+        profiler: StageProfiler,
+    ) -> None:
+        # The internal loads of the fused kernels, stage by stage: the
+        # invariants, the pressure maps, then the tangents and the internal
+        # loads (_internal_load_arguments finds the first two up to date)
+        start = perf_counter_ns()
+        self.check_invariants(system)
+        profiler.add("invariants", start)
+        start = perf_counter_ns()
+        self.update_load_value()
+        profiler.add("pressure maps", start)
+        start = perf_counter_ns()
+        compute_FREE_internal_load(
+            *self._internal_load_arguments(system, geometry)
+        )
+        profiler.add("tangents and internal loads", start)
+
+    def _internal_load_arguments(
+        self, system: ea.CosseratRod, geometry: RodGeometry
+    ) -> tuple:
+        self.check_invariants(system)
+        self.update_load_value()
+        return (
+            self.average_position,
+            self.position_gradient,
             self.position,
+            system.kappa,
+            system.voronoi_dilatation,
+            geometry.shear,
             self.tangent,
             self.internal_force_value,
             self.internal_couple_value,
             self.internal_force,
             self.internal_couple,
         )
-        super().__call__(system)
 
-    @staticmethod
-    @njit(cache=True)  # type: ignore
-    def compute_internal_load(
-        position: np.ndarray,
-        tangent: np.ndarray,
-        internal_force_value: np.ndarray,
-        internal_couple_value: np.ndarray,
-        internal_force: np.ndarray,
-        internal_couple: np.ndarray,
-    ) -> None:
-        blocksize = tangent.shape[1]
-        temp_internal_couple = np.zeros((3, blocksize))
-        for i in range(blocksize):
-            internal_force[:, i] = internal_force_value[i] * tangent[:, i]
-            temp_internal_couple[2, i] = (
-                internal_couple_value[i] * tangent[2, i]
-            )
-        temp_internal_couple[:, :] += force_induced_couple(
-            position, internal_force
+    def _equivalent_load_arguments(
+        self, system: ea.CosseratRod, geometry: RodGeometry
+    ) -> tuple:
+        return (
+            system.director_collection,
+            system.rest_lengths,
+            system.rest_voronoi_lengths,
+            geometry.material_tangent,
+            self.equivalent_external_force,
+            self.equivalent_external_couple,
         )
-        internal_couple[:, :] = average2D(temp_internal_couple)
 
 
 class ApplyFREEs(ApplyActuations):
-    def __init__(self, actuator_FREEs: Iterable[BaseFREE]):
-        super().__init__(actuator_FREEs)
+    def __init__(
+        self,
+        actuator_FREEs: Iterable[BaseFREE],
+        superpose: bool = False,
+        update_interval: int = 1,
+        pressure_tolerance: Optional[float] = None,
+        strain_tolerance: Optional[float] = None,
+        compiled: bool = False,
+        profiler: Optional[StageProfiler] = None,
+    ):
+        super().__init__(
+            actuator_FREEs,
+            superpose=superpose,
+            update_interval=update_interval,
+            pressure_tolerance=pressure_tolerance,
+            strain_tolerance=strain_tolerance,
+            compiled=compiled,
+            profiler=profiler,
+        )
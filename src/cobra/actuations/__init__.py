@@ -1,2 +1,6 @@
 from .actuation import *
+from .compiled import *
+from .ensemble import *
 from .FREE import *
+from .pressure_map import *
+from .schedule import *
@@ -1,12 +1,44 @@
-from typing import Iterable
+from typing import Any, Iterable, Optional
+
+from time import perf_counter_ns
 
 import elastica as ea
 import numpy as np
 
-from cobra.actuations.actuation_tool import (
-    apply_load,
-    internal_load_to_equivalent_external_load,
-)
+from cobra.actuations.actuation_tool import apply_load, equivalent_external_load
+from cobra.math_tool import max_abs_difference
+from cobra.profiling import StageProfiler
+from cobra.rod_geometry_tool import update_rod_geometry
+
+
+class RodGeometry:
+    """
+    Rod-level quantities that are shared by all actuations on the same rod.
+    They only depend on the rod state, hence are computed once per step and
+    consumed by every actuation.
+
+    Parameters
+    ----------
+    n_elements : int
+        Number of elements of the rod.
+    """
+
+    def __init__(self, n_elements: int):
+        n_dim = 3
+        self.n_elements = n_elements
+
+        self.shear = np.zeros((n_dim, n_elements))  # material frame
+        self.material_tangent = np.zeros((n_dim, n_elements))  # material frame
+
+    def update(self, system: ea.CosseratRod) -> None:
+        update_rod_geometry(
+            system.director_collection,
+            system.sigma,
+            system.tangents,
+            system.dilatation,
+            self.shear,
+            self.material_tangent,
+        )
 
 
 class ContinuousActuation:
@@ -32,6 +64,13 @@ class ContinuousActuation:
             (n_dim, n_elements)
         )  # material frame
 
+        # Used when the actuation is called without a shared rod geometry
+        self.geometry = RodGeometry(n_elements)
+
+        # Rod rest properties the invariants have been computed with
+        self.invariant_rest_lengths: Optional[np.ndarray] = None
+        self.invariant_rest_voronoi_lengths: Optional[np.ndarray] = None
+
     def reset(
         self,
     ) -> None:
@@ -41,39 +80,322 @@ class ContinuousActuation:
         self.equivalent_external_force[:, :] *= 0
         self.equivalent_external_couple[:, :] *= 0
 
-    def __call__(self, system: ea.CosseratRod) -> None:
+    def update_invariants(self, system: ea.CosseratRod) -> None:
+        # Precompute the terms that only depend on the actuation parameters
+        # and the rod rest properties, so that only the state dependent work
+        # is left for every step. Nothing to precompute in the base class.
+        pass
+
+    def invalidate_invariants(self) -> None:
+        # Force the invariants to be computed again at the next evaluation,
+        # e.g. after modifying actuation parameters or rod rest properties
+        # in place.
+        self.invariant_rest_lengths = None
+        self.invariant_rest_voronoi_lengths = None
+
+    def check_invariants(self, system: ea.CosseratRod) -> None:
+        # Update the invariants if they have been invalidated or the rod
+        # rest properties have been reassigned.
+        if (
+            self.invariant_rest_lengths is not system.rest_lengths
+            or self.invariant_rest_voronoi_lengths
+            is not system.rest_voronoi_lengths
+        ):
+            self.update_invariants(system)
+            self.invariant_rest_lengths = system.rest_lengths
+            self.invariant_rest_voronoi_lengths = system.rest_voronoi_lengths
+
+    def is_inactive(self) -> bool:
+        # Whether the actuation is known to generate no load, in which case
+        # it can be skipped when the loads of all actuations are superposed.
+        return False
+
+    def get_geometry(
+        self, system: ea.CosseratRod, geometry: Optional[RodGeometry]
+    ) -> RodGeometry:
+        # Return the shared rod geometry if given, otherwise update and
+        # return the geometry owned by this actuation.
+        if geometry is None:
+            geometry = self.geometry
+            geometry.update(system)
+        return geometry
+
+    def __call__(
+        self,
+        system: ea.CosseratRod,
+        geometry: Optional[RodGeometry] = None,
+    ) -> None:
         # Calculate equivalent external forces / couples from internal forces / couples.
-        internal_load_to_equivalent_external_load(
+        geometry = self.get_geometry(system, geometry)
+        equivalent_external_load(
             system.director_collection,
             system.kappa,
-            system.tangents,
+            geometry.material_tangent,
             system.rest_lengths,
             system.rest_voronoi_lengths,
-            system.dilatation,
-            system.voronoi_dilatation,
             self.internal_force,
             self.internal_couple,
             self.equivalent_external_force,
             self.equivalent_external_couple,
         )
 
+    def apply(
+        self,
+        system: ea.CosseratRod,
+        geometry: Optional[RodGeometry] = None,
+        profiler: Optional[StageProfiler] = None,
+    ) -> None:
+        # Calculate the actuation and add the equivalent external forces /
+        # couples onto the rod, timing the stages into profiler if given
+        # (see ApplyActuations).
+        if profiler is not None:
+            start = perf_counter_ns()
+        self.reset()
+        self(system, geometry)
+        apply_load(system.external_forces, self.equivalent_external_force)
+        apply_load(system.external_torques, self.equivalent_external_couple)
+        if profiler is not None:
+            profiler.add("equivalent external loads", start)
+
+    def add_internal_load(
+        self,
+        system: ea.CosseratRod,
+        geometry: RodGeometry,
+        internal_force: np.ndarray,
+        internal_couple: np.ndarray,
+        profiler: Optional[StageProfiler] = None,
+    ) -> None:
+        # Add the internal forces / couples of the actuation onto the given
+        # (superposed) internal forces / couples, timing the stages into
+        # profiler if given.
+        apply_load(internal_force, self.internal_force)
+        apply_load(internal_couple, self.internal_couple)
+
 
 class ApplyActuations(ea.NoForces):
     """
     This class is used to apply actuations, including forces and couples, to the rod.
+    The rod geometry shared by the actuations is computed once per call of
+    apply_forces.
+
+    Parameters
+    ----------
+    actuations : Iterable[ContinuousActuation]
+        Actuations applied to the rod.
+    superpose : bool, optional
+        If True, the internal forces / couples of all actuations are summed
+        and transformed into equivalent external forces / couples once,
+        instead of once per actuation, by default False. The transformation
+        is linear in the internal loads, so the resulting loads on the rod
+        are the same, but the equivalent external forces / couples of each
+        actuation are not updated. Inactive actuations are skipped.
+    update_interval : int, optional
+        Largest number of calls of apply_forces (steps) between two
+        evaluations of the actuation loads, by default 1 (every call). In
+        between, the equivalent external forces / couples of the last
+        evaluation are applied again, which is an approximation as the rod
+        moves (the cached couples stay in the material frame, the forces
+        in the lab frame).
+    pressure_tolerance : float, optional
+        If given, the loads are also evaluated before update_interval calls
+        when the pressure of an actuation has changed by more than
+        pressure_tolerance [psi] since the last evaluation, by default None.
+    strain_tolerance : float, optional
+        If given, the loads are also evaluated before update_interval calls
+        when a strain of the rod (sigma or kappa) has changed by more than
+        strain_tolerance since the last evaluation, by default None.
+    compiled : bool, optional
+        If True, the actuations are evaluated by one compiled loop per
+        step, see CompiledActuations, by default False. The internal loads
+        are superposed as with superpose.
+    profiler : StageProfiler, optional
+        If given, the calls and wall times of the stages of the actuation
+        are accumulated into profiler, by default None: the rod geometry,
+        the invariants, the pressure maps, the tangents and internal loads
+        and the equivalent external loads of the actuations (passed to the
+        actuations by each call, other forcings of the same actuations are
+        not timed), and the whole of apply_forces ("actuations"). The loads
+        are the same, the fused kernels of the actuations being split into
+        their stages. With compiled, the actuations are timed as one stage.
     """
 
-    def __init__(self, actuations: Iterable[ContinuousActuation]):
+    def __init__(
+        self,
+        actuations: Iterable[ContinuousActuation],
+        superpose: bool = False,
+        update_interval: int = 1,
+        pressure_tolerance: Optional[float] = None,
+        strain_tolerance: Optional[float] = None,
+        compiled: bool = False,
+        profiler: Optional[StageProfiler] = None,
+    ):
         super().__init__()
-        self.actuations = actuations
+        self.actuations = list(actuations)
+        self.superpose = superpose
+        self.geometry: Optional[RodGeometry] = None
+        self.superposition: Optional[ContinuousActuation] = None
+        self.compiled = compiled
+        self.compiled_actuations: Any = None
+        self.profiler = profiler
+
+        if update_interval < 1:
+            raise ValueError("The update interval should be at least 1.")
+        self.update_interval = update_interval
+        self.pressure_tolerance = pressure_tolerance
+        self.strain_tolerance = strain_tolerance
+        # Loads and state of the last evaluation, with update_interval > 1
+        self.cache: Optional[ContinuousActuation] = None
+        self.evaluated_time = np.nan
+        self.evaluated_pressures = np.zeros(len(self.actuations))
+        self.evaluated_sigma: Optional[np.ndarray] = None
+        self.evaluated_kappa: Optional[np.ndarray] = None
+        self.n_calls_since_evaluation = 0
+        self.n_evaluations = 0
 
     def apply_forces(self, system: ea.CosseratRod, time: float = 0.0) -> None:
-        for actuation in self.actuations:
-            actuation.reset()
-            actuation(system)
+        if self.profiler is not None:
+            start = perf_counter_ns()
+            self.apply_loads(system, time)
+            self.profiler.add("actuations", start)
+            return
+        self.apply_loads(system, time)
+
+    def apply_loads(self, system: ea.CosseratRod, time: float) -> None:
+        cache = self.cache
+        if cache is not None and self.is_cache_valid(system, time):
+            # Apply the loads of the last evaluation again
+            self.n_calls_since_evaluation += 1
+            apply_load(system.external_forces, cache.equivalent_external_force)
             apply_load(
-                system.external_forces, actuation.equivalent_external_force
+                system.external_torques, cache.equivalent_external_couple
             )
-            apply_load(
-                system.external_torques, actuation.equivalent_external_couple
+            return
+
+        self.evaluate(system)
+        self.n_evaluations += 1
+        if self.update_interval > 1:
+            self.update_cache(system, time)
+
+    def evaluate(self, system: ea.CosseratRod) -> None:
+        # Evaluate the loads of the actuations and add them onto the rod
+        if self.compiled:
+            if self.compiled_actuations is None:
+                # Imported here, the compiled loop depends on the actuation
+                # types defined on top of this module
+                from cobra.actuations.compiled import CompiledActuations
+
+                self.compiled_actuations = CompiledActuations(
+                    self.actuations, system.n_elems
+                )
+            if self.profiler is not None:
+                start = perf_counter_ns()
+            self.compiled_actuations.apply(system)
+            if self.profiler is not None:
+                self.profiler.add("compiled actuations", start)
+            self.superposition = self.compiled_actuations.superposition
+            return
+
+        if self.profiler is not None:
+            start = perf_counter_ns()
+        if self.geometry is None:
+            self.geometry = RodGeometry(system.n_elems)
+        self.geometry.update(system)
+        if self.profiler is not None:
+            self.profiler.add("rod geometry", start)
+
+        if not self.superpose:
+            for actuation in self.actuations:
+                actuation.apply(system, self.geometry, self.profiler)
+            return
+
+        if self.superposition is None:
+            self.superposition = ContinuousActuation(system.n_elems)
+        self.superposition.reset()
+        for actuation in self.actuations:
+            if actuation.is_inactive():
+                continue
+            actuation.add_internal_load(
+                system,
+                self.geometry,
+                self.superposition.internal_force,
+                self.superposition.internal_couple,
+                self.profiler,
             )
+        if self.profiler is not None:
+            start = perf_counter_ns()
+        self.superposition(system, self.geometry)
+        apply_load(
+            system.external_forces,
+            self.superposition.equivalent_external_force,
+        )
+        apply_load(
+            system.external_torques,
+            self.superposition.equivalent_external_couple,
+        )
+        if self.profiler is not None:
+            self.profiler.add("equivalent external loads", start)
+
+    def pressures(self) -> np.ndarray:
+        # Pressures of the actuations (zero for actuations without pressure)
+        return np.array(
+            [
+                getattr(actuation, "pressure", 0.0)
+                for actuation in self.actuations
+            ]
+        )
+
+    def is_cache_valid(self, system: ea.CosseratRod, time: float) -> bool:
+        # Whether the cached loads of the last evaluation can be applied
+        # again: not too many calls ago, at an earlier time (not before a
+        # restore of an earlier state) and within the tolerances
+        if (
+            self.n_calls_since_evaluation + 1 >= self.update_interval
+            or not time >= self.evaluated_time
+        ):
+            return False
+        if self.pressure_tolerance is not None:
+            for actuation, pressure in zip(
+                self.actuations, self.evaluated_pressures
+            ):
+                if (
+                    abs(getattr(actuation, "pressure", 0.0) - pressure)
+                    > self.pressure_tolerance
+                ):
+                    return False
+        if self.strain_tolerance is not None:
+            # Stored by update_cache along with the cached loads
+            assert self.evaluated_sigma is not None
+            assert self.evaluated_kappa is not None
+            if (
+                max_abs_difference(system.sigma, self.evaluated_sigma)
+                > self.strain_tolerance
+                or max_abs_difference(system.kappa, self.evaluated_kappa)
+                > self.strain_tolerance
+            ):
+                return False
+        return True
+
+    def update_cache(self, system: ea.CosseratRod, time: float) -> None:
+        # Store the loads just evaluated, and the state they depend on
+        if self.superpose or self.compiled:
+            self.cache = self.superposition
+        else:
+            if self.cache is None:
+                self.cache = ContinuousActuation(system.n_elems)
+            self.cache.reset()
+            for actuation in self.actuations:
+                apply_load(
+                    self.cache.equivalent_external_force,
+                    actuation.equivalent_external_force,
+                )
+                apply_load(
+                    self.cache.equivalent_external_couple,
+                    actuation.equivalent_external_couple,
+                )
+        self.evaluated_time = time
+        self.n_calls_since_evaluation = 0
+        if self.pressure_tolerance is not None:
+            self.evaluated_pressures = self.pressures()
+        if self.strain_tolerance is not None:
+            self.evaluated_sigma = system.sigma.copy()
+            self.evaluated_kappa = system.kappa.copy()
@@ -1,5 +1,4 @@
 import numpy as np
-from elastica._calculus import difference_kernel, quadrature_kernel
 from elastica._linalg import _batch_cross, _batch_matvec
 from numba import njit
 
@@ -8,7 +7,7 @@ from numba import njit
 # link to numba issue: https://github.com/numba/numba/issues/7424
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def lab_to_material(
     directors: np.ndarray, lab_vectors: np.ndarray
 ) -> np.ndarray:
@@ -16,7 +15,7 @@ def lab_to_material(
     return material_vectors
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def material_to_lab(
     directors: np.ndarray, material_vectors: np.ndarray
 ) -> np.ndarray:
@@ -29,7 +28,7 @@ def material_to_lab(
     return lab_vectors
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def internal_load_to_equivalent_external_load(
     director_collection: np.ndarray,
     kappa: np.ndarray,
@@ -43,23 +42,139 @@ def internal_load_to_equivalent_external_load(
     external_force: np.ndarray,
     external_couple: np.ndarray,
 ) -> None:
-    external_force[:, :] = difference_kernel(
-        material_to_lab(director_collection, internal_force)
+    equivalent_external_load(
+        director_collection,
+        kappa,
+        lab_to_material(director_collection, tangents * dilatation),
+        rest_lengths,
+        rest_voronoi_lengths,
+        internal_force,
+        internal_couple,
+        external_force,
+        external_couple,
     )
-    external_couple[:, :] = (
-        difference_kernel(internal_couple)
-        + quadrature_kernel(
-            _batch_cross(kappa, internal_couple) * rest_voronoi_lengths
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def equivalent_external_load(
+    director_collection: np.ndarray,
+    kappa: np.ndarray,
+    material_tangent: np.ndarray,
+    rest_lengths: np.ndarray,
+    rest_voronoi_lengths: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+    external_force: np.ndarray,
+    external_couple: np.ndarray,
+) -> None:
+    # Loop form of
+    # external_force = difference_kernel(
+    #     material_to_lab(director_collection, internal_force)
+    # )
+    # external_couple = (
+    #     difference_kernel(internal_couple)
+    #     + quadrature_kernel(
+    #         _batch_cross(kappa, internal_couple) * rest_voronoi_lengths
+    #     )
+    #     + _batch_cross(material_tangent, internal_force) * rest_lengths
+    # )
+    # which does not allocate any temporary arrays. The material_tangent is
+    # lab_to_material(director_collection, tangents * dilatation), see
+    # update_rod_geometry.
+    blocksize = internal_force.shape[1]
+
+    previous_lab_force_0 = 0.0
+    previous_lab_force_1 = 0.0
+    previous_lab_force_2 = 0.0
+    for k in range(blocksize):
+        lab_force_0 = 0.0
+        lab_force_1 = 0.0
+        lab_force_2 = 0.0
+        for j in range(3):
+            lab_force_0 += director_collection[j, 0, k] * internal_force[j, k]
+            lab_force_1 += director_collection[j, 1, k] * internal_force[j, k]
+            lab_force_2 += director_collection[j, 2, k] * internal_force[j, k]
+        external_force[0, k] = lab_force_0 - previous_lab_force_0
+        external_force[1, k] = lab_force_1 - previous_lab_force_1
+        external_force[2, k] = lab_force_2 - previous_lab_force_2
+        previous_lab_force_0 = lab_force_0
+        previous_lab_force_1 = lab_force_1
+        previous_lab_force_2 = lab_force_2
+    external_force[0, blocksize] = -previous_lab_force_0
+    external_force[1, blocksize] = -previous_lab_force_1
+    external_force[2, blocksize] = -previous_lab_force_2
+
+    previous_couple_0 = 0.0
+    previous_couple_1 = 0.0
+    previous_couple_2 = 0.0
+    previous_kappa_couple_0 = 0.0
+    previous_kappa_couple_1 = 0.0
+    previous_kappa_couple_2 = 0.0
+    for k in range(blocksize):
+        couple_0 = 0.0
+        couple_1 = 0.0
+        couple_2 = 0.0
+        kappa_couple_0 = 0.0
+        kappa_couple_1 = 0.0
+        kappa_couple_2 = 0.0
+        if k < blocksize - 1:
+            couple_0 = internal_couple[0, k]
+            couple_1 = internal_couple[1, k]
+            couple_2 = internal_couple[2, k]
+            kappa_couple_0 = (
+                kappa[1, k] * couple_2 - kappa[2, k] * couple_1
+            ) * rest_voronoi_lengths[k]
+            kappa_couple_1 = (
+                kappa[2, k] * couple_0 - kappa[0, k] * couple_2
+            ) * rest_voronoi_lengths[k]
+            kappa_couple_2 = (
+                kappa[0, k] * couple_1 - kappa[1, k] * couple_0
+            ) * rest_voronoi_lengths[k]
+
+        tangent_0 = material_tangent[0, k]
+        tangent_1 = material_tangent[1, k]
+        tangent_2 = material_tangent[2, k]
+
+        external_couple[0, k] = (
+            couple_0
+            - previous_couple_0
+            + 0.5 * (kappa_couple_0 + previous_kappa_couple_0)
+            + (
+                tangent_1 * internal_force[2, k]
+                - tangent_2 * internal_force[1, k]
+            )
+            * rest_lengths[k]
         )
-        + _batch_cross(
-            lab_to_material(director_collection, tangents * dilatation),
-            internal_force,
+        external_couple[1, k] = (
+            couple_1
+            - previous_couple_1
+            + 0.5 * (kappa_couple_1 + previous_kappa_couple_1)
+            + (
+                tangent_2 * internal_force[0, k]
+                - tangent_0 * internal_force[2, k]
+            )
+            * rest_lengths[k]
         )
-        * rest_lengths
-    )
+        external_couple[2, k] = (
+            couple_2
+            - previous_couple_2
+            + 0.5 * (kappa_couple_2 + previous_kappa_couple_2)
+            + (
+                tangent_0 * internal_force[1, k]
+                - tangent_1 * internal_force[0, k]
+            )
+            * rest_lengths[k]
+        )
+
+        previous_couple_0 = couple_0
+        previous_couple_1 = couple_1
+        previous_couple_2 = couple_2
+        previous_kappa_couple_0 = kappa_couple_0
+        previous_kappa_couple_1 = kappa_couple_1
+        previous_kappa_couple_2 = kappa_couple_2
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def force_induced_couple(
     distance: np.ndarray,
     force: np.ndarray,
@@ -68,9 +183,12 @@ def force_induced_couple(
     return couple
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def apply_load(
     system_load: np.ndarray,
     external_load: np.ndarray,
 ) -> None:
-    system_load[:, :] += external_load
+    # Explicit loops, since in-place array operators allocate a temporary
+    for i in range(system_load.shape[0]):
+        for k in range(system_load.shape[1]):
+            system_load[i, k] += external_load[i, k]
@@ -0,0 +1,314 @@
+from typing import Iterable, Optional
+
+import elastica as ea
+import numpy as np
+from numba import njit
+from numba.typed import List
+
+from cobra.actuations.actuation import ContinuousActuation, RodGeometry
+from cobra.actuations.actuation_tool import apply_load, equivalent_external_load
+from cobra.actuations.FREE import BaseFREE, add_FREE_internal_load
+from cobra.rod_geometry_tool import update_rod_geometry
+
+# Kinds of the actuations evaluated by the compiled loop: the internal loads
+# of a ContinuousActuation are given (set in place by the user), the ones of
+# a BaseFREE are computed from the rod state and its pressure
+PYTHON_KIND = -1
+STATIC_KIND = 0
+FREE_KIND = 1
+
+COMPILED_KINDS: dict[type, int] = {
+    ContinuousActuation: STATIC_KIND,
+    BaseFREE: FREE_KIND,
+}
+
+
+def register_compiled_kind(actuation_type: type, kind: int) -> None:
+    # Evaluate the actuations of actuation_type (exactly, not its
+    # subclasses, which may compute their loads otherwise) with the kernel
+    # of kind in the compiled loop, e.g. a subclass of BaseFREE which only
+    # changes its parameters. A new kind of actuation needs its branch in
+    # add_compiled_internal_loads and its arrays in CompiledActuations.
+    COMPILED_KINDS[actuation_type] = kind
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def add_compiled_internal_loads(
+    kinds: np.ndarray,
+    active: np.ndarray,
+    average_positions: List,
+    position_gradients: List,
+    positions: List,
+    tangents: List,
+    internal_force_values: List,
+    internal_couple_values: List,
+    internal_forces: List,
+    internal_couples: List,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    shear: np.ndarray,
+    total_internal_force: np.ndarray,
+    total_internal_couple: np.ndarray,
+) -> None:
+    # Add the internal loads of the active actuations onto the superposed
+    # internal loads, dispatching on the kind of each actuation. The arrays
+    # of the actuations are gathered in typed lists (the arrays a kind does
+    # not use are placeholders).
+    for a in range(kinds.shape[0]):
+        if not active[a]:
+            continue
+        i = np.int64(a)  # typed lists are indexed by signed integers
+        if kinds[a] == FREE_KIND:
+            add_FREE_internal_load(
+                average_positions[i],
+                position_gradients[i],
+                positions[i],
+                kappa,
+                voronoi_dilatation,
+                shear,
+                tangents[i],
+                internal_force_values[i],
+                internal_couple_values[i],
+                internal_forces[i],
+                internal_couples[i],
+                total_internal_force,
+                total_internal_couple,
+            )
+        elif kinds[a] == STATIC_KIND:
+            apply_load(total_internal_force, internal_forces[i])
+            apply_load(total_internal_couple, internal_couples[i])
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def apply_compiled_actuation_load(
+    kinds: np.ndarray,
+    active: np.ndarray,
+    average_positions: List,
+    position_gradients: List,
+    positions: List,
+    tangents: List,
+    internal_force_values: List,
+    internal_couple_values: List,
+    internal_forces: List,
+    internal_couples: List,
+    director_collection: np.ndarray,
+    sigma: np.ndarray,
+    rod_tangents: np.ndarray,
+    dilatation: np.ndarray,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    rest_lengths: np.ndarray,
+    rest_voronoi_lengths: np.ndarray,
+    shear: np.ndarray,
+    material_tangent: np.ndarray,
+    total_internal_force: np.ndarray,
+    total_internal_couple: np.ndarray,
+    equivalent_external_force: np.ndarray,
+    equivalent_external_couple: np.ndarray,
+    external_forces: np.ndarray,
+    external_torques: np.ndarray,
+) -> None:
+    # Rod geometry, superposed internal loads of all actuations, equivalent
+    # external loads and their addition onto the rod, in one compiled call
+    update_rod_geometry(
+        director_collection,
+        sigma,
+        rod_tangents,
+        dilatation,
+        shear,
+        material_tangent,
+    )
+    total_internal_force[:, :] = 0.0
+    total_internal_couple[:, :] = 0.0
+    add_compiled_internal_loads(
+        kinds,
+        active,
+        average_positions,
+        position_gradients,
+        positions,
+        tangents,
+        internal_force_values,
+        internal_couple_values,
+        internal_forces,
+        internal_couples,
+        kappa,
+        voronoi_dilatation,
+        shear,
+        total_internal_force,
+        total_internal_couple,
+    )
+    equivalent_external_load(
+        director_collection,
+        kappa,
+        material_tangent,
+        rest_lengths,
+        rest_voronoi_lengths,
+        total_internal_force,
+        total_internal_couple,
+        equivalent_external_force,
+        equivalent_external_couple,
+    )
+    apply_load(external_forces, equivalent_external_force)
+    apply_load(external_torques, equivalent_external_couple)
+
+
+class CompiledActuations:
+    """
+    Actuations of a rod evaluated by one compiled loop per step, instead of
+    one compiled call per actuation, see ApplyActuations with compiled. The
+    internal loads of all actuations are superposed (as with superpose), so
+    the equivalent external loads of each actuation are not updated.
+
+    The kind of each actuation is looked up in COMPILED_KINDS by its type,
+    and the arrays of the actuations are gathered (not copied, unless not
+    contiguous) in typed lists consumed by the loop. Actuations of
+    unregistered types are evaluated in Python, by their add_internal_load.
+    Per step, Python only checks the invariants and the load values of each
+    actuation, which are computed again when they have been invalidated or
+    the pressure has changed.
+
+    Parameters
+    ----------
+    actuations : Iterable[ContinuousActuation]
+        Actuations of the rod.
+    n_elements : int
+        Number of elements of the rod.
+    """
+
+    def __init__(
+        self, actuations: Iterable[ContinuousActuation], n_elements: int
+    ):
+        self.actuations = list(actuations)
+        self.kinds = np.array(
+            [
+                COMPILED_KINDS.get(type(actuation), PYTHON_KIND)
+                for actuation in self.actuations
+            ],
+            dtype=np.int64,
+        )
+        self.python_actuations = [
+            actuation
+            for actuation, kind in zip(self.actuations, self.kinds)
+            if kind == PYTHON_KIND
+        ]
+        self.active = np.zeros(len(self.actuations), dtype=np.bool_)
+        self.geometry = RodGeometry(n_elements)
+        # Superposed internal loads and their equivalent external loads
+        self.superposition = ContinuousActuation(n_elements)
+        self.actuator_arrays: Optional[tuple] = None
+        self.gathered_positions: list[Optional[np.ndarray]] = []
+
+    def gather_actuator_arrays(self) -> None:
+        # Typed lists of the arrays of the actuations, with placeholders of
+        # the same shape for the arrays a kind does not use
+        n_elements = self.superposition.n_elements
+        placeholder = np.zeros(n_elements)
+        arrays: tuple = tuple(List() for _ in range(8))
+        for actuation, kind in zip(self.actuations, self.kinds):
+            if kind == FREE_KIND:
+                assert isinstance(actuation, BaseFREE)
+                fields = (
+                    actuation.average_position,
+                    actuation.position_gradient,
+                    actuation.position,
+                    actuation.tangent,
+                    actuation.internal_force_value,
+                    actuation.internal_couple_value,
+                )
+            else:
+                fields = (
+                    actuation.internal_couple,
+                    actuation.internal_couple,
+                    actuation.internal_force,
+                    actuation.internal_force,
+                    placeholder,
+                    placeholder,
+                )
+            for array_list, array in zip(
+                arrays,
+                fields + (actuation.internal_force, actuation.internal_couple),
+            ):
+                array_list.append(array)
+        self.actuator_arrays = arrays
+        self.gathered_positions = [
+            getattr(actuation, "position", None)
+            for actuation in self.actuations
+        ]
+
+    def prepare(self, system: ea.CosseratRod) -> None:
+        # Invariants and load values of the actuations, and whether they are
+        # active. The arrays are gathered again after an invalidation or a
+        # reassigned position (the invalidation may have been consumed by
+        # another forcing of the same actuations).
+        for index, actuation in enumerate(self.actuations):
+            if actuation.invariant_rest_lengths is None or (
+                self.actuator_arrays is not None
+                and getattr(actuation, "position", None)
+                is not self.gathered_positions[index]
+            ):
+                self.actuator_arrays = None
+            actuation.check_invariants(system)
+            self.active[index] = not actuation.is_inactive()
+        if self.actuator_arrays is None:
+            self.gather_actuator_arrays()
+
+    def apply(self, system: ea.CosseratRod) -> None:
+        # Add the loads of all actuations onto the rod
+        self.prepare(system)
+        assert self.actuator_arrays is not None
+        superposition = self.superposition
+        if not self.python_actuations:
+            # The gathered arrays are a tuple of no fixed length for mypy
+            apply_compiled_actuation_load(  # type: ignore[call-arg]
+                self.kinds,
+                self.active,
+                *self.actuator_arrays,
+                system.director_collection,
+                system.sigma,
+                system.tangents,
+                system.dilatation,
+                system.kappa,
+                system.voronoi_dilatation,
+                system.rest_lengths,
+                system.rest_voronoi_lengths,
+                self.geometry.shear,
+                self.geometry.material_tangent,
+                superposition.internal_force,
+                superposition.internal_couple,
+                superposition.equivalent_external_force,
+                superposition.equivalent_external_couple,
+                system.external_forces,
+                system.external_torques,
+            )
+            return
+
+        # The actuations evaluated in Python are added between the compiled
+        # internal loads and the equivalent external loads
+        self.geometry.update(system)
+        superposition.reset()
+        add_compiled_internal_loads(  # type: ignore[call-arg]
+            self.kinds,
+            self.active,
+            *self.actuator_arrays,
+            system.kappa,
+            system.voronoi_dilatation,
+            self.geometry.shear,
+            superposition.internal_force,
+            superposition.internal_couple,
+        )
+        for actuation in self.python_actuations:
+            if actuation.is_inactive():
+                continue
+            actuation.add_internal_load(
+                system,
+                self.geometry,
+                superposition.internal_force,
+                superposition.internal_couple,
+            )
+        superposition(system, self.geometry)
+        apply_load(
+            system.external_forces, superposition.equivalent_external_force
+        )
+        apply_load(
+            system.external_torques, superposition.equivalent_external_couple
+        )
@@ -0,0 +1,346 @@
+from typing import Iterable, Optional
+
+import elastica as ea
+import numpy as np
+from numba import njit, prange
+from numba.typed import List
+
+from cobra.actuations.actuation_tool import apply_load, equivalent_external_load
+from cobra.actuations.FREE import BaseFREE, add_FREE_internal_load
+from cobra.rod_geometry_tool import (
+    compute_local_position_invariants,
+    update_rod_geometry,
+)
+
+
+@njit(cache=True, nogil=True, parallel=True)  # type: ignore
+def apply_ensemble_FREE_load(
+    n_rods: int,
+    active: np.ndarray,
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+    position: np.ndarray,
+    internal_force_value: np.ndarray,
+    internal_couple_value: np.ndarray,
+    director_collections: List,
+    sigmas: List,
+    tangents: List,
+    dilatations: List,
+    kappas: List,
+    voronoi_dilatations: List,
+    rest_lengths: List,
+    rest_voronoi_lengths: List,
+    shear: np.ndarray,
+    material_tangent: np.ndarray,
+    tangent: np.ndarray,
+    internal_force: np.ndarray,
+    internal_couple: np.ndarray,
+    total_internal_force: np.ndarray,
+    total_internal_couple: np.ndarray,
+    equivalent_external_force: np.ndarray,
+    equivalent_external_couple: np.ndarray,
+) -> None:
+    # Superposed FREE actuation of every rod of the ensemble, the rods are
+    # independent of each other hence computed in parallel. For each rod
+    # the rod geometry is updated, the internal loads of the active
+    # actuators are summed and transformed into equivalent external loads
+    # once. Each rod adds its own loads in its forcing.
+    n_actuators = active.shape[1]
+    for rod_index in prange(n_rods):
+        r = np.int64(rod_index)  # typed lists are indexed by signed integers
+        update_rod_geometry(
+            director_collections[r],
+            sigmas[r],
+            tangents[r],
+            dilatations[r],
+            shear[r],
+            material_tangent[r],
+        )
+        total_internal_force[r, :, :] = 0.0
+        total_internal_couple[r, :, :] = 0.0
+        for a in range(n_actuators):
+            if not active[r, a]:
+                continue
+            add_FREE_internal_load(
+                average_position[r, a],
+                position_gradient[r, a],
+                position[a],
+                kappas[r],
+                voronoi_dilatations[r],
+                shear[r],
+                tangent[r, a],
+                internal_force_value[a, r],
+                internal_couple_value[a, r],
+                internal_force[r, a],
+                internal_couple[r, a],
+                total_internal_force[r],
+                total_internal_couple[r],
+            )
+        equivalent_external_load(
+            director_collections[r],
+            kappas[r],
+            material_tangent[r],
+            rest_lengths[r],
+            rest_voronoi_lengths[r],
+            total_internal_force[r],
+            total_internal_couple[r],
+            equivalent_external_force[r],
+            equivalent_external_couple[r],
+        )
+
+
+class FREEEnsemble:
+    """
+    FREE actuation of an ensemble of independent rods carrying the same
+    actuators, each rod with its own pressures. The loads of all rods are
+    computed on stacked arrays by one compiled (parallel) call per step,
+    instead of one small call per actuator and rod.
+
+    Parameters
+    ----------
+    rods : Iterable[ea.CosseratRod]
+        Rods of the ensemble, with the same number of elements.
+    actuator_FREEs : Iterable[BaseFREE]
+        Actuators carried by every rod, their position, pressure
+        coefficients and pressure maximum are shared by the rods. Their
+        own pressures are not used.
+
+    Notes
+    -----
+    The loads of all rods are evaluated at once, by the first forcing
+    of a step, i.e. the first rod asking again for loads it has already
+    consumed. The rod arrays are gathered at the first evaluation, i.e.
+    after the simulator is finalized. Call invalidate after reassigning rod
+    arrays or rest properties, or after modifying actuator positions.
+    """
+
+    def __init__(
+        self,
+        rods: Iterable[ea.CosseratRod],
+        actuator_FREEs: Iterable[BaseFREE],
+    ):
+        self.rods = list(rods)
+        self.actuator_FREEs = list(actuator_FREEs)
+        self.n_rods = len(self.rods)
+        self.n_actuators = len(self.actuator_FREEs)
+        self.n_elements = self.actuator_FREEs[0].n_elements
+        for rod in self.rods:
+            if rod.n_elems != self.n_elements:
+                raise ValueError(
+                    f"Rods of the ensemble should have {self.n_elements} "
+                    f"elements, got {rod.n_elems}."
+                )
+        for actuator in self.actuator_FREEs:
+            if actuator.n_elements != self.n_elements:
+                raise ValueError(
+                    f"Actuators of the ensemble should have "
+                    f"{self.n_elements} elements, got {actuator.n_elements}."
+                )
+
+        n_dim = 3
+        n_rods, n_actuators, n_elements = (
+            self.n_rods,
+            self.n_actuators,
+            self.n_elements,
+        )
+        self.pressure_maximum = np.array(
+            [actuator.pressure_maximum for actuator in self.actuator_FREEs]
+        )
+        self.__pressures = np.zeros((n_rods, n_actuators))
+        self.evaluated_pressures = np.full((n_rods, n_actuators), np.nan)
+        self.active = np.zeros((n_rods, n_actuators), dtype=np.bool_)
+
+        self.position = np.zeros((n_actuators, n_dim, n_elements))
+        self.average_position = np.zeros(
+            (n_rods, n_actuators, n_dim, n_elements - 1)
+        )
+        self.position_gradient = np.zeros(
+            (n_rods, n_actuators, n_dim, n_elements - 1)
+        )
+        self.internal_force_value = np.zeros((n_actuators, n_rods, n_elements))
+        self.internal_couple_value = np.zeros((n_actuators, n_rods, n_elements))
+
+        self.shear = np.zeros((n_rods, n_dim, n_elements))
+        self.material_tangent = np.zeros((n_rods, n_dim, n_elements))
+        self.tangent = np.zeros((n_rods, n_actuators, n_dim, n_elements))
+        self.internal_force = np.zeros(
+            (n_rods, n_actuators, n_dim, n_elements)
+        )  # material frame
+        self.internal_couple = np.zeros(
+            (n_rods, n_actuators, n_dim, n_elements - 1)
+        )  # material frame
+        self.total_internal_force = np.zeros(
+            (n_rods, n_dim, n_elements)
+        )  # material frame
+        self.total_internal_couple = np.zeros(
+            (n_rods, n_dim, n_elements - 1)
+        )  # material frame
+        self.equivalent_external_force = np.zeros(
+            (n_rods, n_dim, n_elements + 1)
+        )  # lab frame
+        self.equivalent_external_couple = np.zeros(
+            (n_rods, n_dim, n_elements)
+        )  # material frame
+
+        self.rod_arrays: Optional[tuple] = None
+        self.consumed = np.ones(n_rods, dtype=np.bool_)
+
+    @property
+    def pressures(self) -> np.ndarray:
+        return self.__pressures
+
+    @pressures.setter
+    def pressures(self, pressures: np.ndarray) -> None:
+        # Pressures of every actuator (columns) of every rod (rows), clamped
+        # to [0, pressure_maximum] of the actuator as for the Pressure
+        # descriptor.
+        np.clip(pressures, 0.0, self.pressure_maximum, out=self.__pressures)
+
+    def set_pressures(self, rod_index: int, pressures: np.ndarray) -> None:
+        self.__pressures[rod_index] = np.clip(
+            pressures, 0.0, self.pressure_maximum
+        )
+
+    def invalidate(self) -> None:
+        self.rod_arrays = None
+
+    def update_invariants(self) -> None:
+        # Same precomputation as BaseFREE.update_invariants, for every
+        # actuator on every rod.
+        for a, actuator in enumerate(self.actuator_FREEs):
+            self.position[a] = actuator.position
+            for r, rod in enumerate(self.rods):
+                compute_local_position_invariants(
+                    self.position[a],
+                    rod.rest_voronoi_lengths,
+                    self.average_position[r, a],
+                    self.position_gradient[r, a],
+                )
+
+    def gather_rod_arrays(self) -> None:
+        # Typed lists of the rod arrays (views into the memory block of the
+        # simulator, hence shared with the rods) consumed by the kernel.
+        names = (
+            "director_collection",
+            "sigma",
+            "tangents",
+            "dilatation",
+            "kappa",
+            "voronoi_dilatation",
+            "rest_lengths",
+            "rest_voronoi_lengths",
+        )
+        rod_arrays = []
+        for name in names:
+            arrays = List()
+            for rod in self.rods:
+                arrays.append(getattr(rod, name))
+            rod_arrays.append(arrays)
+        self.rod_arrays = tuple(rod_arrays)
+        self.update_invariants()
+
+    def update_load_value(self) -> None:
+        # The pressure maps of an actuator are only evaluated (for all rods
+        # at once) when a pressure of the actuator has changed.
+        for a, actuator in enumerate(self.actuator_FREEs):
+            pressures = self.__pressures[:, a]
+            if np.array_equal(pressures, self.evaluated_pressures[:, a]):
+                continue
+            pressure_coefficients = actuator.pressure_coefficients
+            pressure_coefficients.force_map.evaluate_batch(
+                pressures, self.internal_force_value[a]
+            )
+            pressure_coefficients.couple_map.evaluate_batch(
+                pressures, self.internal_couple_value[a]
+            )
+            self.evaluated_pressures[:, a] = pressures
+            self.active[:, a] = self.internal_force_value[a].any(
+                axis=1
+            ) | self.internal_couple_value[a].any(axis=1)
+
+    def apply(self, system: ea.CosseratRod, rod_index: int) -> None:
+        # Add the actuation loads of the rod onto its external forces /
+        # torques. A rod asking twice starts a new step: the loads of every
+        # rod are evaluated again from the current state.
+        if self.consumed[rod_index]:
+            self.evaluate()
+            self.consumed[:] = False
+        self.consumed[rod_index] = True
+        apply_load(
+            system.external_forces, self.equivalent_external_force[rod_index]
+        )
+        apply_load(
+            system.external_torques, self.equivalent_external_couple[rod_index]
+        )
+
+    def evaluate(self) -> None:
+        # Equivalent external loads of every rod of the ensemble.
+        if self.rod_arrays is None:
+            self.gather_rod_arrays()
+        assert self.rod_arrays is not None
+        self.update_load_value()
+        (
+            director_collections,
+            sigmas,
+            tangents,
+            dilatations,
+            kappas,
+            voronoi_dilatations,
+            rest_lengths,
+            rest_voronoi_lengths,
+        ) = self.rod_arrays
+        apply_ensemble_FREE_load(
+            self.n_rods,
+            self.active,
+            self.average_position,
+            self.position_gradient,
+            self.position,
+            self.internal_force_value,
+            self.internal_couple_value,
+            director_collections,
+            sigmas,
+            tangents,
+            dilatations,
+            kappas,
+            voronoi_dilatations,
+            rest_lengths,
+            rest_voronoi_lengths,
+            self.shear,
+            self.material_tangent,
+            self.tangent,
+            self.internal_force,
+            self.internal_couple,
+            self.total_internal_force,
+            self.total_internal_couple,
+            self.equivalent_external_force,
+            self.equivalent_external_couple,
+        )
+
+
+class ApplyFREEEnsemble(ea.NoForces):
+    """
+    This class is used to apply the actuation of a FREEEnsemble. It is added
+    to every rod of the ensemble, the loads of all rods are computed at once
+    by the first forcing of a step and each forcing adds the loads of its
+    own rod.
+
+    Parameters
+    ----------
+    ensemble : FREEEnsemble
+        Ensemble shared by the rods.
+    rod_index : int
+        Index of the rod in the ensemble.
+    """
+
+    def __init__(self, ensemble: FREEEnsemble, rod_index: int):
+        super().__init__()
+        if not 0 <= rod_index < ensemble.n_rods:
+            raise ValueError(
+                f"Rod index should be in [0, {ensemble.n_rods}), "
+                f"got {rod_index}."
+            )
+        self.ensemble = ensemble
+        self.rod_index = rod_index
+
+    def apply_forces(self, system: ea.CosseratRod, time: float = 0.0) -> None:
+        self.ensemble.apply(system, self.rod_index)
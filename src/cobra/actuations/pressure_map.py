@@ -0,0 +1,267 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+from numba import njit
+
+from cobra.math_tool import polynomial_value
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_polynomial(
+    coefficients: np.ndarray,
+    pressure: float,
+    value: np.ndarray,
+) -> None:
+    value[:] = polynomial_value(coefficients, pressure)
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_elementwise_polynomial(
+    coefficients: np.ndarray,
+    pressure: float,
+    value: np.ndarray,
+) -> None:
+    blocksize = value.shape[0]
+    for i in range(blocksize):
+        value[i] = 0.0
+    for n in range(coefficients.shape[0]):
+        for i in range(blocksize):
+            value[i] = value[i] * pressure + coefficients[n, i]
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def table_interval(pressures: np.ndarray, pressure: float) -> tuple:
+    # Index of the lower point of the table interval containing the pressure
+    # and the linear interpolation weight of the upper point. Pressures out
+    # of the table range are clamped to the end points.
+    n_points = pressures.shape[0]
+    if pressure <= pressures[0]:
+        return 0, 0.0
+    if pressure >= pressures[n_points - 1]:
+        return n_points - 2, 1.0
+    index = np.searchsorted(pressures, pressure, side="right") - 1
+    weight = (pressure - pressures[index]) / (
+        pressures[index + 1] - pressures[index]
+    )
+    return index, weight
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_table(
+    pressures: np.ndarray,
+    values: np.ndarray,
+    pressure: float,
+    value: np.ndarray,
+) -> None:
+    index, weight = table_interval(pressures, pressure)
+    value[:] = (1.0 - weight) * values[index] + weight * values[index + 1]
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_elementwise_table(
+    pressures: np.ndarray,
+    values: np.ndarray,
+    pressure: float,
+    value: np.ndarray,
+) -> None:
+    index, weight = table_interval(pressures, pressure)
+    for i in range(value.shape[0]):
+        value[i] = (1.0 - weight) * values[index, i] + weight * values[
+            index + 1, i
+        ]
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_polynomial_batch(
+    coefficients: np.ndarray,
+    pressures: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    for n in range(pressures.shape[0]):
+        evaluate_polynomial(coefficients, pressures[n], values[n])
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_elementwise_polynomial_batch(
+    coefficients: np.ndarray,
+    pressures: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    for n in range(pressures.shape[0]):
+        evaluate_elementwise_polynomial(coefficients, pressures[n], values[n])
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_table_batch(
+    table_pressures: np.ndarray,
+    table_values: np.ndarray,
+    pressures: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    for n in range(pressures.shape[0]):
+        evaluate_table(table_pressures, table_values, pressures[n], values[n])
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_elementwise_table_batch(
+    table_pressures: np.ndarray,
+    table_values: np.ndarray,
+    pressures: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    for n in range(pressures.shape[0]):
+        evaluate_elementwise_table(
+            table_pressures, table_values, pressures[n], values[n]
+        )
+
+
+class PressureMap(ABC):
+    """
+    Base class for maps from the pressure of an actuator to the magnitude of
+    the force / couple it generates along the rod. The map is evaluated by a
+    compiled kernel that writes the values in place.
+    """
+
+    def set_n_elements(self, n_elements: int) -> None:
+        self.n_elements = n_elements
+
+    @abstractmethod
+    def evaluate(self, pressure: float, value: np.ndarray) -> None:
+        pass
+
+    def evaluate_batch(self, pressures: np.ndarray, values: np.ndarray) -> None:
+        # Evaluate the map at several pressures, e.g. for the same actuator
+        # on an ensemble of rods. values is a (n_pressures, n_elements)
+        # array. Subclasses override this with a single compiled call.
+        for pressure, value in zip(pressures, values):
+            self.evaluate(pressure, value)
+
+
+class PolynomialMap(PressureMap):
+    """
+    Polynomial of the pressure, uniform along the rod.
+
+    Parameters
+    ----------
+    coefficients : np.ndarray
+        1D (n_coefficients,) array containing data with 'float' type.
+        Polynomial coefficients from the highest degree to the constant term,
+        same convention as np.polyval.
+    """
+
+    def __init__(self, coefficients: np.ndarray):
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        if self.coefficients.ndim != 1:
+            raise ValueError(
+                "Polynomial coefficients should be a 1D array, use "
+                "ElementwisePolynomialMap for coefficients along the rod."
+            )
+
+    def evaluate(self, pressure: float, value: np.ndarray) -> None:
+        evaluate_polynomial(self.coefficients, pressure, value)
+
+    def evaluate_batch(self, pressures: np.ndarray, values: np.ndarray) -> None:
+        evaluate_polynomial_batch(self.coefficients, pressures, values)
+
+
+class ElementwisePolynomialMap(PressureMap):
+    """
+    Polynomial of the pressure whose coefficients vary along the rod.
+
+    Parameters
+    ----------
+    coefficients : np.ndarray
+        2D (n_coefficients, n_elements) array containing data with 'float'
+        type. Polynomial coefficients of each element from the highest
+        degree to the constant term.
+    """
+
+    def __init__(self, coefficients: np.ndarray):
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        if self.coefficients.ndim != 2:
+            raise ValueError(
+                "Elementwise polynomial coefficients should be a 2D "
+                "(n_coefficients, n_elements) array."
+            )
+
+    def set_n_elements(self, n_elements: int) -> None:
+        if self.coefficients.shape[1] != n_elements:
+            raise ValueError(
+                f"Coefficients are given for {self.coefficients.shape[1]} "
+                f"elements, but the actuation has {n_elements} elements."
+            )
+        super().set_n_elements(n_elements)
+
+    def evaluate(self, pressure: float, value: np.ndarray) -> None:
+        evaluate_elementwise_polynomial(self.coefficients, pressure, value)
+
+    def evaluate_batch(self, pressures: np.ndarray, values: np.ndarray) -> None:
+        evaluate_elementwise_polynomial_batch(
+            self.coefficients, pressures, values
+        )
+
+
+class TabulatedMap(PressureMap):
+    """
+    Lookup table of (bench measured) values at increasing pressures, linearly
+    interpolated in between. Pressures out of the table range take the
+    value of the nearest end point.
+
+    Parameters
+    ----------
+    pressures : np.ndarray
+        1D (n_points,) array containing data with 'float' type.
+        Strictly increasing pressures of the table.
+    values : np.ndarray
+        1D (n_points,) array, uniform along the rod, or 2D
+        (n_points, n_elements) array, varying along the rod, containing
+        data with 'float' type. Values at the pressures of the table.
+    """
+
+    def __init__(self, pressures: np.ndarray, values: np.ndarray):
+        self.pressures = np.asarray(pressures, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.pressures.ndim != 1 or self.pressures.shape[0] < 2:
+            raise ValueError(
+                "Table pressures should be a 1D array with at least 2 points."
+            )
+        if not np.all(np.diff(self.pressures) > 0):
+            raise ValueError("Table pressures should be strictly increasing.")
+        if self.values.ndim not in (1, 2) or (
+            self.values.shape[0] != self.pressures.shape[0]
+        ):
+            raise ValueError(
+                "Table values should be a (n_points,) or "
+                "(n_points, n_elements) array matching the table pressures."
+            )
+
+    def set_n_elements(self, n_elements: int) -> None:
+        if self.values.ndim == 2 and self.values.shape[1] != n_elements:
+            raise ValueError(
+                f"Table values are given for {self.values.shape[1]} "
+                f"elements, but the actuation has {n_elements} elements."
+            )
+        super().set_n_elements(n_elements)
+
+    def evaluate(self, pressure: float, value: np.ndarray) -> None:
+        if self.values.ndim == 1:
+            evaluate_table(self.pressures, self.values, pressure, value)
+        else:
+            evaluate_elementwise_table(
+                self.pressures, self.values, pressure, value
+            )
+
+    def evaluate_batch(self, pressures: np.ndarray, values: np.ndarray) -> None:
+        if self.values.ndim == 1:
+            evaluate_table_batch(self.pressures, self.values, pressures, values)
+        else:
+            evaluate_elementwise_table_batch(
+                self.pressures, self.values, pressures, values
+            )
+
+
+def as_pressure_map(pressure_map: np.ndarray | PressureMap) -> PressureMap:
+    # Polynomial coefficients are converted to a PolynomialMap
+    if isinstance(pressure_map, PressureMap):
+        return pressure_map
+    return PolynomialMap(pressure_map)
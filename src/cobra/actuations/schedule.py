@@ -0,0 +1,153 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_schedule(
+    times: np.ndarray,
+    coefficients: np.ndarray,
+    time: float,
+    value: np.ndarray,
+) -> None:
+    # Piecewise polynomial of the time, with the coefficients of each
+    # interval from the highest degree to the constant term in the time
+    # since the start of the interval. Times out of the schedule range are
+    # clamped to the end points.
+    n_points = times.shape[0]
+    if time <= times[0]:
+        index, offset = 0, 0.0
+    elif time >= times[n_points - 1]:
+        index = n_points - 2
+        offset = times[n_points - 1] - times[n_points - 2]
+    else:
+        index = int(np.searchsorted(times, time, side="right")) - 1
+        offset = time - times[index]
+    for channel in range(value.shape[0]):
+        result = 0.0
+        for n in range(coefficients.shape[1]):
+            result = result * offset + coefficients[index, n, channel]
+        value[channel] = result
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def evaluate_schedule_batch(
+    times: np.ndarray,
+    coefficients: np.ndarray,
+    sample_times: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    for n in range(sample_times.shape[0]):
+        evaluate_schedule(times, coefficients, sample_times[n], values[n])
+
+
+def natural_spline_coefficients(
+    times: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    # Cubic coefficients of each interval of the natural cubic spline
+    # through the points, see evaluate_schedule
+    steps = np.diff(times)
+    slopes = np.diff(values, axis=0) / steps[:, None]
+    # Second derivatives at the points, zero at the end points
+    n_points = times.shape[0]
+    second_derivatives = np.zeros_like(values)
+    if n_points > 2:
+        system = (
+            np.diag(2.0 * (steps[:-1] + steps[1:]))
+            + np.diag(steps[1:-1], 1)
+            + np.diag(steps[1:-1], -1)
+        )
+        second_derivatives[1:-1] = np.linalg.solve(
+            system, 6.0 * np.diff(slopes, axis=0)
+        )
+    coefficients = np.empty((n_points - 1, 4, values.shape[1]))
+    coefficients[:, 0] = np.diff(second_derivatives, axis=0) / (
+        6.0 * steps[:, None]
+    )
+    coefficients[:, 1] = 0.5 * second_derivatives[:-1]
+    coefficients[:, 2] = (
+        slopes
+        - steps[:, None]
+        * (2.0 * second_derivatives[:-1] + second_derivatives[1:])
+        / 6.0
+    )
+    coefficients[:, 3] = values[:-1]
+    return coefficients
+
+
+class PressureSchedule:
+    """
+    Pressures of the actuators as a function of time, interpolating the
+    pressures given at increasing times, piecewise linearly or by a natural
+    cubic spline. The schedule is compiled to the polynomial coefficients of
+    each interval and evaluated by a compiled kernel, so it can be evaluated
+    in a stepping loop without Python callbacks (see BR2Environment.run).
+    Before the first time and after the last one, the pressures are held at
+    their end values.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        1D (n_points,) array containing data with 'float' type. Strictly
+        increasing times [s] of the pressures, at least two.
+    pressures : np.ndarray
+        2D (n_points, n_channels) array containing data with 'float' type.
+        Pressures [psi] of each channel (actuator) at the times.
+    kind : str, optional
+        Interpolation, "linear" or "spline", by default "linear".
+    """
+
+    def __init__(
+        self, times: np.ndarray, pressures: np.ndarray, kind: str = "linear"
+    ):
+        self.times = np.asarray(times, dtype=np.float64)
+        pressures = np.asarray(pressures, dtype=np.float64)
+        if self.times.ndim != 1 or self.times.shape[0] < 2:
+            raise ValueError(
+                "A schedule needs a 1D array of two times or more."
+            )
+        if np.any(np.diff(self.times) <= 0.0):
+            raise ValueError("The times of a schedule should be increasing.")
+        if pressures.ndim != 2 or pressures.shape[0] != self.times.shape[0]:
+            raise ValueError(
+                "The pressures of a schedule should be a 2D (n_points, "
+                "n_channels) array, with one row per time."
+            )
+        self.kind = kind
+        if kind == "linear":
+            self.coefficients = np.stack(
+                [
+                    np.diff(pressures, axis=0) / np.diff(self.times)[:, None],
+                    pressures[:-1],
+                ],
+                axis=1,
+            )
+        elif kind == "spline":
+            self.coefficients = natural_spline_coefficients(
+                self.times, pressures
+            )
+        else:
+            raise ValueError(
+                f"Unknown schedule interpolation {kind}, use 'linear' or "
+                "'spline'."
+            )
+        self.n_channels = pressures.shape[1]
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1])
+
+    def evaluate(self, time: float, value: np.ndarray) -> None:
+        # Pressures at time, written in place into a (n_channels,) array
+        evaluate_schedule(self.times, self.coefficients, time, value)
+
+    def sample(self, times: np.ndarray) -> np.ndarray:
+        # Pressures at several times, as a (n_times, n_channels) array
+        times = np.asarray(times, dtype=np.float64)
+        values = np.empty((times.shape[0], self.n_channels))
+        evaluate_schedule_batch(self.times, self.coefficients, times, values)
+        return values
+
+    def __call__(self, time: float) -> np.ndarray:
+        value = np.empty(self.n_channels)
+        self.evaluate(time, value)
+        return value
@@ -0,0 +1,79 @@
+from typing import Any, Mapping
+
+import json
+import os
+
+import elastica as ea
+import numpy as np
+
+# Key of the JSON encoded scalar state in a checkpoint file
+METADATA_KEY = "__metadata__"
+
+
+def rod_state(rod: ea.CosseratRod, prefix: str = "") -> dict[str, np.ndarray]:
+    """
+    Every array of a rod (kinematics, internal loads, rest configuration and
+    material properties), keyed by prefix + attribute name. Once the
+    simulator is finalized, these arrays are views into its memory block,
+    hence restoring them in place restores the state stepped by the
+    simulator.
+    """
+    return {
+        prefix + name: value
+        for name, value in vars(rod).items()
+        if isinstance(value, np.ndarray)
+    }
+
+
+def restore_rod_state(
+    rod: ea.CosseratRod, arrays: Mapping[str, np.ndarray], prefix: str = ""
+) -> None:
+    # Copy the arrays of rod_state back into the arrays of the rod, in place
+    for name, value in rod_state(rod).items():
+        saved = arrays[prefix + name]
+        if saved.shape != value.shape:
+            raise ValueError(
+                f"Checkpoint array {prefix + name} of shape {saved.shape} "
+                f"does not match the rod array of shape {value.shape}."
+            )
+        value[...] = saved
+
+
+def with_prefix(
+    arrays: Mapping[str, np.ndarray], prefix: str
+) -> dict[str, np.ndarray]:
+    # The arrays whose key starts with prefix, keyed without it
+    return {
+        name[len(prefix) :]: value
+        for name, value in arrays.items()
+        if name.startswith(prefix)
+    }
+
+
+def write_checkpoint(
+    filename: str, arrays: Mapping[str, np.ndarray], metadata: dict
+) -> None:
+    """
+    Write arrays and metadata (JSON serializable scalars) into one .npz
+    file. The file is replaced atomically, hence an interrupted write leaves
+    the previous checkpoint intact.
+    """
+    if not filename.endswith(".npz"):
+        filename += ".npz"
+    temporary_filename = filename[:-4] + ".tmp.npz"
+    contents: dict[str, Any] = {
+        **arrays,
+        METADATA_KEY: np.array(json.dumps(metadata)),
+    }
+    np.savez(temporary_filename, **contents)
+    os.replace(temporary_filename, filename)
+
+
+def read_checkpoint(filename: str) -> tuple[dict[str, np.ndarray], dict]:
+    # Arrays and metadata written by write_checkpoint
+    if not filename.endswith(".npz"):
+        filename += ".npz"
+    with np.load(filename) as data:
+        arrays = {name: data[name] for name in data.files}
+    metadata = json.loads(str(arrays.pop(METADATA_KEY)))
+    return arrays, metadata
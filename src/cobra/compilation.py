@@ -0,0 +1,214 @@
+from typing import Callable, Iterable
+
+import time
+
+import elastica as ea
+import numpy as np
+
+from cobra.actuations.ensemble import ApplyFREEEnsemble, FREEEnsemble
+from cobra.actuations.FREE import ApplyFREEs, BaseFREE, PressureCoefficients
+from cobra.actuations.pressure_map import (
+    ElementwisePolynomialMap,
+    PolynomialMap,
+    TabulatedMap,
+)
+from cobra.actuations.schedule import PressureSchedule
+from cobra.implicit import SemiImplicitEuler
+from cobra.stability import stable_time_step
+from cobra.statics import StaticSolver
+
+# Options of ApplyFREEs whose kernels are compiled by warmup
+ACTUATION_OPTIONS: list[dict] = [
+    {},
+    {"superpose": True},
+    {"compiled": True},
+    {"update_interval": 2, "pressure_tolerance": 0.1, "strain_tolerance": 0.1},
+]
+
+
+class _Simulator(
+    ea.BaseSystemCollection,
+    ea.Constraints,
+    ea.Damping,
+    ea.Forcing,
+):
+    pass
+
+
+def _make_rod(n_elements: int) -> ea.CosseratRod:
+    return ea.CosseratRod.straight_rod(
+        n_elements=n_elements,
+        start=np.zeros((3,)),
+        direction=np.array([0.0, 0.0, -1.0]),
+        normal=np.array([1.0, 0.0, 0.0]),
+        base_length=0.2,
+        base_radius=0.01,
+        density=700,
+        youngs_modulus=3e6,
+        shear_modulus=3e6 / 1.5,
+    )
+
+
+def _make_FREEs(n_elements: int) -> list[BaseFREE]:
+    # Two actuators (BaseFREE stores the positions C ordered and read-only,
+    # whatever the order of the given arrays)
+    actuations = [
+        BaseFREE(
+            position=np.tile(
+                0.01 * np.array([np.cos(angle), np.sin(angle), 0.0]),
+                (n_elements, 1),
+            ).T,
+            pressure_coefficients=PressureCoefficients(
+                force=np.array([-0.01, 0.0]),
+                couple=np.array([1e-5, 0.0]),
+            ),
+        )
+        for angle in (0.0, 2.0 * np.pi / 3.0)
+    ]
+    for actuation in actuations:
+        actuation.pressure = 1.0
+    return actuations
+
+
+def _build_simulator(
+    n_rods: int, n_elements: int, time_step: float, ensemble: bool = False
+) -> tuple[_Simulator, list[ea.CosseratRod]]:
+    # Clamped rods under gravity and FREE actuation, the rod arrays being
+    # views in one memory block (contiguous for a single rod only)
+    simulator = _Simulator()
+    rods = [_make_rod(n_elements) for _ in range(n_rods)]
+    for rod in rods:
+        simulator.append(rod)
+        simulator.dampen(rod).using(
+            ea.AnalyticalLinearDamper,
+            damping_constant=0.05,
+            time_step=time_step,
+        )
+        simulator.constrain(rod).using(
+            ea.OneEndFixedBC,
+            constrained_position_idx=(0,),
+            constrained_director_idx=(0,),
+        )
+        simulator.add_forcing_to(rod).using(
+            ea.GravityForces, acc_gravity=np.array([0.0, 0.0, -9.80665])
+        )
+    if ensemble:
+        free_ensemble = FREEEnsemble(rods, _make_FREEs(n_elements))
+        free_ensemble.pressures = np.ones((n_rods, 2))
+        for index, rod in enumerate(rods):
+            simulator.add_forcing_to(rod).using(
+                ApplyFREEEnsemble, ensemble=free_ensemble, rod_index=index
+            )
+    else:
+        for rod in rods:
+            simulator.add_forcing_to(rod).using(
+                ApplyFREEs, actuator_FREEs=_make_FREEs(n_elements)
+            )
+    simulator.finalize()
+    return simulator, rods
+
+
+def _run(
+    simulator: _Simulator, rods: list[ea.CosseratRod], time_step: float
+) -> None:
+    # A few steps of the simulation, then the actuation options applied
+    # onto the rods
+    stepper = ea.PositionVerlet()
+    current_time = np.float64(0.0)
+    for _ in range(3):
+        current_time = stepper.step(
+            simulator, current_time, np.float64(time_step)
+        )
+    for rod in rods:
+        for options in ACTUATION_OPTIONS:
+            forcing = ApplyFREEs(_make_FREEs(rod.n_elems), **options)
+            for step in range(2):
+                forcing.apply_forces(rod, float(step))
+
+
+def _warmup_simulation(n_elements: int) -> None:
+    time_step = 1e-5
+    _run(*_build_simulator(1, n_elements, time_step), time_step)
+
+
+def _warmup_ensembles(n_elements: int) -> None:
+    # Rods sharing a memory block (non-contiguous arrays), with their own
+    # forcings and with a FREEEnsemble
+    time_step = 1e-5
+    _run(*_build_simulator(2, n_elements, time_step), time_step)
+    _run(*_build_simulator(2, n_elements, time_step, ensemble=True), time_step)
+
+
+def _warmup_pressure_maps(n_elements: int) -> None:
+    pressures = np.array([0.0, 10.0, 20.0])
+    maps = [
+        PolynomialMap(np.array([0.1, 0.0])),
+        ElementwisePolynomialMap(np.ones((2, n_elements))),
+        TabulatedMap(pressures, np.array([0.0, 1.0, 3.0])),
+        TabulatedMap(pressures, np.ones((3, n_elements))),
+    ]
+    for pressure_map in maps:
+        pressure_map.set_n_elements(n_elements)
+        pressure_map.evaluate(5.0, np.zeros(n_elements))
+        pressure_map.evaluate_batch(pressures, np.zeros((3, n_elements)))
+    for kind in ("linear", "spline"):
+        schedule = PressureSchedule(
+            np.array([0.0, 1.0, 2.0]), np.ones((3, 3)), kind=kind
+        )
+        schedule(0.5)
+        schedule.sample(np.array([0.5, 1.5]))
+
+
+def _warmup_statics(n_elements: int) -> None:
+    # Static solver, stability estimate and implicit stepper
+    time_step = 1e-4
+    simulator = _Simulator()
+    rod = _make_rod(n_elements)
+    simulator.append(rod)
+    simulator.constrain(rod).using(
+        ea.OneEndFixedBC,
+        constrained_position_idx=(0,),
+        constrained_director_idx=(0,),
+    )
+    actuations = _make_FREEs(n_elements)
+    simulator.add_forcing_to(rod).using(ApplyFREEs, actuator_FREEs=actuations)
+    simulator.finalize()
+    solver = StaticSolver(rod, [ApplyFREEs(actuations)], max_iterations=2)
+    solver.solve()
+    stable_time_step(solver)
+    stepper = SemiImplicitEuler([solver], damping_constant=0.05)
+    stepper.do_step(None, simulator, np.float64(0.0), np.float64(time_step))
+
+
+WARMUP_STAGES: dict[str, Callable[[int], None]] = {
+    "simulation": _warmup_simulation,
+    "ensembles": _warmup_ensembles,
+    "pressure maps": _warmup_pressure_maps,
+    "statics": _warmup_statics,
+}
+
+
+def warmup(
+    stages: Iterable[str] = tuple(WARMUP_STAGES), n_elements: int = 10
+) -> dict[str, float]:
+    """
+    Compile the kernels of cobra and of the PyElastica simulation of
+    FREE-actuated rods, or load them from the numba cache, by running small
+    simulations, and return the wall time [s] of each stage.
+
+    The kernels are compiled lazily for the types of their arguments (the
+    rod arrays are contiguous for a rod alone in its simulator, and not for
+    several rods), so warmup runs the configurations of the stages, see
+    WARMUP_STAGES. The compiled kernels are written to the numba cache
+    (cache=True): calling warmup once before starting a pool of worker
+    processes lets the workers load the kernels instead of each compiling
+    them, see SweepRunner.
+    """
+    times = {}
+    for stage in stages:
+        if stage not in WARMUP_STAGES:
+            raise ValueError(f"Unknown warmup stage {stage}.")
+        start = time.perf_counter()
+        WARMUP_STAGES[stage](n_elements)
+        times[stage] = time.perf_counter() - start
+    return times
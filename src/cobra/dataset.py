@@ -0,0 +1,300 @@
+from typing import Any, Iterable, Iterator, Literal, Mapping, Optional, Sequence
+
+import json
+import os
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from cobra.recorder import load_trajectory
+from cobra.trajectory_store import TrajectoryReader, is_trajectory_store
+
+MANIFEST_FILENAME = "manifest.json"
+MODEL_FILENAME = "model.npz"
+
+
+def open_trajectory(filename: str) -> Mapping[str, np.ndarray]:
+    """
+    Recorded trajectory of a run, either a .npz file saved by the
+    environment (each field is read when accessed), a folder streamed by
+    TrajectoryRecorder (each field is memory-mapped) or a trajectory store
+    (only the indexed frames are read).
+    """
+    if is_trajectory_store(filename):
+        return TrajectoryReader(filename)
+    if os.path.isdir(filename):
+        return load_trajectory(filename)
+    trajectory: Mapping[str, np.ndarray] = np.load(filename)
+    return trajectory
+
+
+def data_point_indices(n_elements: int, n_data_pts: int) -> np.ndarray:
+    # Nodes of the data points along the rod, excluding the base node and
+    # ending with the tip node.
+    return np.array(
+        [int(n_elements / n_data_pts) * i for i in range(1, n_data_pts)] + [-1]
+    )
+
+
+def pos_dir_to_input(
+    pos: np.ndarray, dir: np.ndarray, inputs: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Stack positions (n_frames, 3, n_pts) and directors
+    (n_frames, 3, 3, n_pts) of the data points into the model inputs
+    (n_frames, 12, n_pts), written into inputs if given.
+    """
+    if inputs is None:
+        inputs = np.empty((pos.shape[0], 12, pos.shape[-1]), dtype=pos.dtype)
+    inputs[:, :3] = pos
+    inputs[:, 3:] = dir.reshape(len(dir), -1, dir.shape[-1])
+    return inputs
+
+
+def sigma_to_shear(
+    sigma: np.ndarray, shear: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Shear strains (n_frames, 3, n_elements) from the strains sigma of the
+    rod, written into shear if given.
+    """
+    if shear is None:
+        shear = np.empty_like(sigma)
+    shear[...] = sigma
+    shear[:, 2, :] += 1
+    return shear
+
+
+class ArmDatasetBuilder:
+    """
+    Build the training set of the arm model from recorded runs, one run and
+    one chunk of frames at a time, into memory-mapped .npy files of known
+    final shape. The peak memory is bounded by the fields of one run,
+    independently of the number of runs.
+
+    The output folder contains
+    - input_data.npy: positions and directors of the data points, see
+      pos_dir_to_input,
+    - true_pos.npy, true_dir.npy, true_kappa.npy, true_shear.npy: positions,
+      directors, curvatures and shear strains of the rod,
+    - model.npz: radius, s, dl and nominal_shear of the rod,
+    - manifest.json: shapes of the arrays, frames of each run and scalar
+      model data, see load_arm_dataset.
+
+    Parameters
+    ----------
+    filenames : Sequence[str]
+        Recorded runs, see open_trajectory.
+    output_folder : str
+        Folder of the dataset.
+    step_skip : int, optional
+        Only one out of step_skip recorded frames is used, by default 2.
+    n_data_pts : int, optional
+        Number of data points along the rod (excluding the base), by
+        default 3.
+    reference_index : int, optional
+        Index of the run whose initial frame provides the model data, by
+        default 0.
+    dtype : np.dtype, optional
+        Data type of the dataset arrays, by default float64.
+    chunk_size : int, optional
+        Number of frames processed at once, by default 1024.
+    """
+
+    def __init__(
+        self,
+        filenames: Sequence[str],
+        output_folder: str,
+        step_skip: int = 2,
+        n_data_pts: int = 3,
+        reference_index: int = 0,
+        dtype: DTypeLike = np.float64,
+        chunk_size: int = 1024,
+    ):
+        self.filenames = list(filenames)
+        self.output_folder = output_folder
+        self.step_skip = step_skip
+        self.n_data_pts = n_data_pts
+        self.reference_index = reference_index
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+
+    def count_frames(self) -> list[int]:
+        # Number of frames used from every run, only the time is read
+        n_frames = []
+        for filename in self.filenames:
+            n_recorded = open_trajectory(filename)["time"].shape[0]
+            n_frames.append(-(-n_recorded // self.step_skip))
+        return n_frames
+
+    def model_data(self, trajectory: Mapping[str, np.ndarray]) -> dict:
+        # Model data from the initial frame of the reference run
+        position = np.asarray(trajectory["position"][0], dtype=np.float64)
+        n_elem = trajectory["director"].shape[-1]
+        L = float(np.linalg.norm(position[:, -1]))
+        return {
+            "n_elem": n_elem,
+            "L": L,
+            "radius": np.asarray(trajectory["radius"]),
+            "s": np.linspace(0, L, n_elem + 1),
+            "dl": np.linalg.norm(position[:, 1:] - position[:, :-1], axis=0),
+            "nominal_shear": sigma_to_shear(
+                np.asarray(trajectory["sigma"][:1], dtype=np.float64)
+            )[0],
+        }
+
+    def build(self, verbose: bool = False) -> dict:
+        os.makedirs(self.output_folder, exist_ok=True)
+        n_frames = self.count_frames()
+        n_samples = sum(n_frames)
+
+        reference = open_trajectory(self.filenames[self.reference_index])
+        model = self.model_data(reference)
+        n_elem = model["n_elem"]
+        idx_data_pts = data_point_indices(n_elem, self.n_data_pts)
+        shapes = {
+            "input_data": (n_samples, 12, len(idx_data_pts)),
+            "true_pos": (n_samples, 3, n_elem + 1),
+            "true_dir": (n_samples, 3, 3, n_elem),
+            "true_kappa": (n_samples, 3, n_elem - 1),
+            "true_shear": (n_samples, 3, n_elem),
+        }
+        outputs = {
+            name: np.lib.format.open_memmap(
+                os.path.join(self.output_folder, name + ".npy"),
+                mode="w+",
+                dtype=self.dtype,
+                shape=shape,
+            )
+            for name, shape in shapes.items()
+        }
+
+        runs = []
+        start = 0
+        for filename, n_run_frames in zip(self.filenames, n_frames):
+            if verbose:
+                print(f"Adding {filename} ({n_run_frames} frames)")
+            self.add_run(
+                open_trajectory(filename), outputs, start, idx_data_pts
+            )
+            runs.append(
+                {
+                    "filename": os.path.basename(filename),
+                    "start": start,
+                    "stop": start + n_run_frames,
+                }
+            )
+            start += n_run_frames
+        for output in outputs.values():
+            output.flush()
+
+        model_arrays: dict[str, Any] = {
+            name: value
+            for name, value in model.items()
+            if isinstance(value, np.ndarray)
+        }
+        np.savez(
+            os.path.join(self.output_folder, MODEL_FILENAME), **model_arrays
+        )
+        manifest = {
+            "n_samples": n_samples,
+            "step_skip": self.step_skip,
+            "idx_data_pts": idx_data_pts.tolist(),
+            "model": {
+                "n_elem": n_elem,
+                "L": model["L"],
+                "arrays": MODEL_FILENAME,
+            },
+            "arrays": {
+                name: {
+                    "filename": name + ".npy",
+                    "shape": list(shape),
+                    "dtype": self.dtype.str,
+                }
+                for name, shape in shapes.items()
+            },
+            "runs": runs,
+        }
+        with open(
+            os.path.join(self.output_folder, MANIFEST_FILENAME), "w"
+        ) as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def chunk_slices(self, n_frames: int, start: int) -> Iterator[tuple]:
+        # Slices of the recorded frames and of the dataset samples of every
+        # chunk of a run
+        skip = self.step_skip
+        for begin in range(0, n_frames, self.chunk_size):
+            end = min(begin + self.chunk_size, n_frames)
+            yield (
+                slice(begin * skip, end * skip, skip),
+                slice(start + begin, start + end),
+            )
+
+    def add_run(
+        self,
+        trajectory: Mapping[str, np.ndarray],
+        outputs: Mapping[str, np.ndarray],
+        start: int,
+        idx_data_pts: np.ndarray,
+    ) -> None:
+        # Write the frames of a run into the outputs from start on, one
+        # chunk of frames at a time. Each field is read once (entirely for
+        # a .npz file, lazily for memory-mapped files) and released before
+        # the next one.
+        position = trajectory["position"]
+        director = trajectory["director"]
+        n_frames = -(-position.shape[0] // self.step_skip)
+        for frames, samples in self.chunk_slices(n_frames, start):
+            outputs["true_pos"][samples] = position[frames]
+            outputs["true_dir"][samples] = director[frames]
+            pos_dir_to_input(
+                position[frames][..., idx_data_pts],
+                director[frames][..., idx_data_pts],
+                outputs["input_data"][samples],
+            )
+        del position, director
+
+        kappa = trajectory["kappa"]
+        for frames, samples in self.chunk_slices(n_frames, start):
+            outputs["true_kappa"][samples] = kappa[frames]
+        del kappa
+
+        sigma = trajectory["sigma"]
+        for frames, samples in self.chunk_slices(n_frames, start):
+            sigma_to_shear(sigma[frames], outputs["true_shear"][samples])
+
+
+def load_arm_dataset(
+    folder: str, mmap_mode: Optional[Literal["r", "r+", "c"]] = "r"
+) -> dict:
+    """
+    Dataset built by ArmDatasetBuilder, with the same keys as the former
+    pickled dataset ("model", "true_pos", "true_dir", "true_kappa",
+    "true_shear") plus "input_data" and "manifest". The arrays are
+    memory-mapped unless mmap_mode is None.
+    """
+    with open(os.path.join(folder, MANIFEST_FILENAME)) as f:
+        manifest = json.load(f)
+    model_arrays = np.load(os.path.join(folder, manifest["model"]["arrays"]))
+    model = {
+        "n_elem": manifest["model"]["n_elem"],
+        "L": manifest["model"]["L"],
+        **{name: model_arrays[name] for name in model_arrays.files},
+    }
+    data: dict = {"model": model, "manifest": manifest}
+    for name, array in manifest["arrays"].items():
+        data[name] = np.load(
+            os.path.join(folder, array["filename"]), mmap_mode=mmap_mode
+        )
+    return data
+
+
+def run_slices(manifest: dict, names: Optional[Iterable[str]] = None) -> dict:
+    # Sample slice of every run (or of the named runs) of a dataset
+    return {
+        run["filename"]: slice(run["start"], run["stop"])
+        for run in manifest["runs"]
+        if names is None or run["filename"] in names
+    }
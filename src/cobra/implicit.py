@@ -0,0 +1,234 @@
+from typing import Any, Sequence
+
+import elastica as ea
+import numpy as np
+from numba import njit
+
+from cobra.statics import StaticSolver
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def solve_banded(
+    matrix: np.ndarray, rhs: np.ndarray, bandwidth: int
+) -> np.ndarray:
+    # Solve matrix @ x = rhs by Gaussian elimination with partial pivoting,
+    # for a matrix whose nonzero entries are within bandwidth of the diagonal
+    # (the row swaps widen the upper band to twice the bandwidth; matrix and
+    # rhs are overwritten, rhs by the solution)
+    size = matrix.shape[0]
+    for k in range(size):
+        last = min(k + bandwidth + 1, size)
+        pivot = k
+        for i in range(k + 1, last):
+            if abs(matrix[i, k]) > abs(matrix[pivot, k]):
+                pivot = i
+        end = min(k + 2 * bandwidth + 1, size)
+        if pivot != k:
+            for j in range(k, end):
+                matrix[k, j], matrix[pivot, j] = matrix[pivot, j], matrix[k, j]
+            rhs[k], rhs[pivot] = rhs[pivot], rhs[k]
+        for i in range(k + 1, last):
+            factor = matrix[i, k] / matrix[k, k]
+            if factor == 0.0:
+                continue
+            for j in range(k, end):
+                matrix[i, j] -= factor * matrix[k, j]
+            rhs[i] -= factor * rhs[k]
+    for k in range(size - 1, -1, -1):
+        value = rhs[k]
+        for j in range(k + 1, min(k + 2 * bandwidth + 1, size)):
+            value -= matrix[k, j] * rhs[j]
+        rhs[k] = value / matrix[k, k]
+    return rhs
+
+
+class SemiImplicitEuler:
+    """
+    Linearly implicit (backward) Euler stepper for rods, with the do_step
+    interface of ea.PositionVerlet and a time step not limited by the stiff
+    modes of the rods. Each step solves
+
+        (M + dt C - dt^2 K) u_new = M u + dt F,    q_new = q + dt u_new
+
+    for the free nodes and elements, with the Jacobian K of the static
+    solvers. The rods must not be damped by the simulation, the damping is
+    applied in the step.
+
+    Parameters
+    ----------
+    solvers : Sequence[StaticSolver]
+        Static solver of each rod of the simulation, with the forcings of
+        the rod (e.g. the FREE actuation and gravity) whose stiffness is
+        treated implicitly.
+    damping_constant : float, optional
+        Damping constant of the rods [1/s], as for ea.AnalyticalLinearDamper,
+        by default 0.0.
+    rotation_tolerance : float, optional
+        Rotation of an element [rad] since the Jacobian of its rod was
+        computed above which it is computed again, by default 0.05.
+    jacobian_interval : int, optional
+        Maximum number of steps a Jacobian is reused for, by default 50.
+    """
+
+    def __init__(
+        self,
+        solvers: Sequence[StaticSolver],
+        damping_constant: float = 0.0,
+        rotation_tolerance: float = 0.05,
+        jacobian_interval: int = 50,
+    ):
+        self.solvers = list(solvers)
+        self.damping_constant = damping_constant
+        self.rotation_tolerance = rotation_tolerance
+        self.jacobian_interval = jacobian_interval
+
+        # Order of the unknowns along each rod, bandwidth of the system, and
+        # the ordered indices of the mass and inertia entries
+        self.orders = []
+        self.bandwidths = []
+        self.mass_indices = []
+        self.inertia_indices = []
+        for solver in self.solvers:
+            order = np.lexsort(
+                (solver.components, solver.kinds, solver.locations)
+            )
+            position = np.empty_like(order)
+            position[order] = np.arange(len(order))
+            self.orders.append(order)
+            self.bandwidths.append(
+                max(
+                    np.abs(position[rows] - position[columns]).max()
+                    for _, rows, columns in solver.groups
+                )
+            )
+            n_positions = 3 * solver.system.n_elems
+            self.mass_indices.append(position[:n_positions])
+            blocks = position[n_positions:].reshape(-1, 3)
+            self.inertia_indices.append(
+                (blocks[:, :, np.newaxis], blocks[:, np.newaxis, :])
+            )
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        # Compute the Jacobians again at the next step, e.g. after the state
+        # of the rods is restored
+        self.jacobians: list[np.ndarray | None] = [None] * len(self.solvers)
+        self.linearized_directors: list[np.ndarray | None] = [None] * len(
+            self.solvers
+        )
+        self.n_reuses = [0] * len(self.solvers)
+
+    def jacobian(self, index: int) -> np.ndarray:
+        # Jacobian of the loads of a rod (ordered along the rod), reused
+        # until an element has rotated by more than rotation_tolerance since
+        # it was computed, or for at most jacobian_interval steps
+        solver = self.solvers[index]
+        directors = solver.system.director_collection
+        jacobian = self.jacobians[index]
+        linearized_directors = self.linearized_directors[index]
+        if (
+            jacobian is not None
+            and linearized_directors is not None
+            and self.n_reuses[index] < self.jacobian_interval
+        ):
+            # Cosine of the rotation angle of each element, from the trace
+            # of directors @ linearized_directors.T
+            cosines = 0.5 * (
+                np.einsum("ijk,ijk->k", directors, linearized_directors) - 1.0
+            )
+            if cosines.min() >= np.cos(self.rotation_tolerance):
+                self.n_reuses[index] += 1
+                return jacobian
+        order = self.orders[index]
+        jacobian = np.ascontiguousarray(
+            solver.linearize(central=False)[np.ix_(order, order)]
+        )
+        self.jacobians[index] = jacobian
+        self.linearized_directors[index] = directors.copy()
+        self.n_reuses[index] = 0
+        return jacobian
+
+    def system_matrix(self, index: int, dt: float) -> np.ndarray:
+        # M + dt C - dt^2 K ordered along the rod, whose rows are the loads
+        # (forces in the lab frame on the nodes, couples in the material
+        # frame on the elements) and columns the velocities (in the lab
+        # frame)
+        system = self.solvers[index].system
+        matrix = -(dt**2) * self.jacobian(index)
+        matrix[self.mass_indices[index], self.mass_indices[index]] += np.repeat(
+            system.mass[1:], 3
+        ) * (1.0 + dt * self.damping_constant)
+        # Elements: inertia / dilatation @ Q (the angular momentum per unit
+        # angular velocity in the lab frame), and the damping couple of the
+        # element mass times the angular velocity in the material frame
+        element_masses = 0.5 * (system.mass[1:-1] + system.mass[2:])
+        element_masses[-1] += 0.5 * system.mass[-1]
+        blocks = (
+            system.mass_second_moment_of_inertia[:, :, 1:]
+            / system.dilatation[1:]
+        )
+        for axis in range(3):
+            blocks[axis, axis] += dt * self.damping_constant * element_masses
+        matrix[self.inertia_indices[index]] += np.einsum(
+            "ijk,jlk->kil", blocks, system.director_collection[:, :, 1:]
+        )
+        return matrix
+
+    def do_step(
+        self,
+        steps_and_prefactors: Any,
+        simulator: ea.BaseSystemCollection,
+        time: np.float64,
+        dt: np.float64,
+    ) -> np.float64:
+        # Loads at the current state, as in the explicit steppers
+        for system in simulator.block_systems():
+            system.compute_internal_forces_and_torques(time)
+        simulator.synchronize(time)
+
+        for index, (solver, order, bandwidth) in enumerate(
+            zip(self.solvers, self.orders, self.bandwidths)
+        ):
+            rod = solver.system
+            forces = rod.internal_forces + rod.external_forces
+            couples = rod.internal_torques + rod.external_torques
+            # Momenta, and angular momenta in the material frame
+            momenta = rod.mass[1:] * rod.velocity_collection[:, 1:]
+            angular_momenta = (
+                np.einsum(
+                    "ijk,jk->ik",
+                    rod.mass_second_moment_of_inertia[:, :, 1:],
+                    rod.omega_collection[:, 1:],
+                )
+                / rod.dilatation[1:]
+            )
+            rhs = np.concatenate(
+                [
+                    (momenta + dt * forces[:, 1:]).T.ravel(),
+                    (angular_momenta + dt * couples[:, 1:]).T.ravel(),
+                ]
+            )
+            velocities = np.empty_like(rhs)
+            velocities[order] = solve_banded(
+                self.system_matrix(index, dt), rhs[order], bandwidth
+            )
+            solver.update(dt * velocities)
+
+            n_positions = 3 * rod.n_elems
+            rod.velocity_collection[:, 1:] = (
+                velocities[:n_positions].reshape(-1, 3).T
+            )
+            rod.omega_collection[:, 1:] = np.einsum(
+                "ijk,jk->ik",
+                rod.director_collection[:, :, 1:],
+                velocities[n_positions:].reshape(-1, 3).T,
+            )
+
+        time += dt
+        simulator.constrain_values(time)
+        # Boundary conditions on the velocities
+        simulator.constrain_rates(time)
+        simulator.apply_callbacks(time, round(time / dt))
+        for system in simulator.block_systems():
+            system.zeroed_out_external_forces_and_torques(time)
+        return time
@@ -2,15 +2,61 @@ import numpy as np
 from numba import njit
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def average2D(vector: np.ndarray) -> np.ndarray:
     result: np.ndarray = 0.5 * (vector[:, :-1] + vector[:, 1:])
     return result
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def pointwise_multiplication(
     vector_a: np.ndarray, vector_b: np.ndarray
 ) -> np.ndarray:
     result: np.ndarray = vector_a * vector_b
     return result
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def polynomial_value(coefficients: np.ndarray, x: float) -> float:
+    # Horner's scheme, coefficients are ordered from the highest degree
+    # to the constant term (the same convention as np.polyval).
+    value = 0.0
+    for coefficient in coefficients:
+        value = value * x + coefficient
+    return value
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def max_column_norm(vectors: np.ndarray) -> float:
+    # Largest Euclidean norm of the columns of a (dim, n) array
+    result = 0.0
+    for index in range(vectors.shape[1]):
+        norm = 0.0
+        for dim in range(vectors.shape[0]):
+            norm += vectors[dim, index] ** 2
+        result = max(result, norm)
+    return float(np.sqrt(result))
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def max_column_change(current: np.ndarray, previous: np.ndarray) -> float:
+    # Largest Euclidean norm of the columns of current - previous, two
+    # (dim, n) arrays. previous is overwritten by current.
+    result = 0.0
+    for index in range(current.shape[1]):
+        norm = 0.0
+        for dim in range(current.shape[0]):
+            norm += (current[dim, index] - previous[dim, index]) ** 2
+            previous[dim, index] = current[dim, index]
+        result = max(result, norm)
+    return float(np.sqrt(result))
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def max_abs_difference(array_a: np.ndarray, array_b: np.ndarray) -> float:
+    # Largest absolute difference between the entries of two 2D arrays
+    result = 0.0
+    for i in range(array_a.shape[0]):
+        for j in range(array_a.shape[1]):
+            result = max(result, abs(array_a[i, j] - array_b[i, j]))
+    return result
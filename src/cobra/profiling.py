@@ -0,0 +1,85 @@
+from typing import Iterable, Optional
+
+import json
+from time import perf_counter_ns
+
+
+class StageProfiler:
+    """
+    Opt-in timing of the stages of a simulation step: number of calls and
+    cumulative wall time [ns] of each stage. The profiled code (see
+    ApplyActuations, BaseFREE and the callbacks of the examples) only takes
+    the timestamps when it is given a profiler, hence profiling costs
+    nothing when disabled. A stage is timed with
+
+        start = perf_counter_ns()
+        ...
+        profiler.add("stage", start)
+
+    Stages may be nested (e.g. the actuation stages within a step), the
+    time of a stage includes the time of the stages it contains, see
+    add_remainder.
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = {}
+        self.nanoseconds: dict[str, int] = {}
+
+    def add(self, stage: str, start: int) -> None:
+        # One call of stage, started at start (perf_counter_ns)
+        elapsed = perf_counter_ns() - start
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        self.nanoseconds[stage] = self.nanoseconds.get(stage, 0) + elapsed
+
+    def add_remainder(
+        self, name: str, stage: str, parts: Iterable[str]
+    ) -> None:
+        # Set name to the time of stage not spent in its nested parts, with
+        # the calls of stage, e.g. the time of the PyElastica internals as
+        # the time of the steps not spent in the actuations and callbacks
+        if stage not in self.counts:
+            return
+        self.counts[name] = self.counts[stage]
+        self.nanoseconds[name] = self.nanoseconds[stage] - sum(
+            self.nanoseconds.get(part, 0) for part in parts
+        )
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.nanoseconds.clear()
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        # Calls, total and mean time [ns] of every stage
+        return {
+            stage: {
+                "calls": count,
+                "total_ns": self.nanoseconds[stage],
+                "mean_ns": self.nanoseconds[stage] / count,
+            }
+            for stage, count in self.counts.items()
+        }
+
+    def table(self, reference: Optional[str] = None) -> str:
+        # Stages sorted by total time, with their share of the total time
+        # of the reference stage if given (e.g. "step")
+        total = self.nanoseconds.get(reference, 0) if reference else 0
+        lines = [
+            f"{'stage':<32}{'calls':>10}{'total [ms]':>12}{'mean [us]':>11}"
+            + (f"{'share':>8}" if total else "")
+        ]
+        for stage in sorted(
+            self.counts, key=self.nanoseconds.__getitem__, reverse=True
+        ):
+            nanoseconds = self.nanoseconds[stage]
+            lines.append(
+                f"{stage:<32}{self.counts[stage]:>10}"
+                f"{1e-6 * nanoseconds:>12.2f}"
+                f"{1e-3 * nanoseconds / self.counts[stage]:>11.2f}"
+                + (f"{nanoseconds / total:>8.1%}" if total else "")
+            )
+        return "\n".join(lines)
+
+    def save(self, filename: str) -> None:
+        # Stages as JSON, see as_dict
+        with open(filename, "w") as file:
+            json.dump(self.as_dict(), file, indent=2)
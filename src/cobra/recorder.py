@@ -0,0 +1,381 @@
+from typing import Any, Iterable, Optional
+
+import json
+import os
+import queue
+import threading
+import warnings
+
+import elastica as ea
+import numpy as np
+from numpy.typing import DTypeLike
+
+from cobra.trajectory_store import write_trajectory
+
+# Recorded field names and the corresponding rod attributes
+ROD_FIELDS = {
+    "radius": "radius",
+    "dilatation": "dilatation",
+    "voronoi_dilatation": "voronoi_dilatation",
+    "position": "position_collection",
+    "director": "director_collection",
+    "velocity": "velocity_collection",
+    "omega": "omega_collection",
+    "sigma": "sigma",
+    "kappa": "kappa",
+}
+
+# Fields consumed by the dataset of the arm model
+DATASET_FIELDS = ("radius", "position", "director", "sigma", "kappa")
+
+METADATA_FILENAME = "metadata.json"
+
+
+def n_recorded_frames(
+    total_steps: int, step_skip: int, decimation: int = 1
+) -> int:
+    # Number of frames recorded by a callback every step_skip steps over
+    # total_steps steps, including the initial frame, when one out of
+    # decimation frames is recorded.
+    return total_steps // (step_skip * decimation) + 1
+
+
+class TrajectoryRecorder:
+    """
+    Recorder of rod fields over time into preallocated arrays of
+    (n_frames, *field_shape). Each frame is copied in place, hence nothing
+    is allocated during the simulation.
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames to record, see n_recorded_frames. Further frames
+        are not recorded.
+    fields : Iterable[str], optional
+        Names of the recorded fields (keys of ROD_FIELDS), by default all.
+        See DATASET_FIELDS for the fields used by the arm dataset.
+    dtype : np.dtype | dict[str, np.dtype], optional
+        Data type of the recorded fields, or of each field (fields not in
+        the dict are float64), by default float64, e.g. float32 halves the
+        recorded bytes. The time is always recorded in float64.
+    decimation : int, optional
+        Only one out of decimation frames passed to record is recorded,
+        starting with the first one, by default 1.
+    compress : bool, optional
+        If True, save writes a compressed .npz file (or compressed chunks of
+        a trajectory store), by default False.
+    store : bool, optional
+        If True, save writes a trajectory store, i.e. time-chunked fields
+        with random access to frames, instead of a .npz file, by default
+        False. See cobra.trajectory_store.
+    path : str, optional
+        If given, the frames are streamed into memory-mapped .npy files
+        (one per field, plus "time") in this folder instead of being kept
+        in memory, see load_trajectory to read them, also while the
+        simulation runs.
+    background : bool, optional
+        If True (and path is given), frames are gathered in chunks of
+        chunk_size frames which are written to the files by a background
+        thread, by default True.
+    chunk_size : int, optional
+        Number of frames of a chunk, by default 64.
+    """
+
+    def __init__(
+        self,
+        n_frames: int,
+        fields: Iterable[str] = ROD_FIELDS.keys(),
+        dtype: DTypeLike | dict[str, DTypeLike] = np.float64,
+        decimation: int = 1,
+        compress: bool = False,
+        store: bool = False,
+        path: Optional[str] = None,
+        background: bool = True,
+        chunk_size: int = 64,
+    ):
+        self.n_frames = n_frames
+        self.fields = list(fields)
+        for name in self.fields:
+            if name not in ROD_FIELDS:
+                raise ValueError(
+                    f"Unknown field {name}, available fields are "
+                    f"{list(ROD_FIELDS.keys())}."
+                )
+        self.dtypes: dict[str, np.dtype] = {"time": np.dtype(np.float64)}
+        for name in self.fields:
+            field_dtype: Any = dtype
+            if isinstance(dtype, dict):
+                field_dtype = dtype.get(name, np.float64)
+            self.dtypes[name] = np.dtype(field_dtype)
+        if decimation < 1:
+            raise ValueError("Recording decimation should be at least 1.")
+        self.decimation = decimation
+        self.compress = compress
+        self.store = store
+        self.path = path
+        self.background = background and path is not None
+        self.chunk_size = chunk_size
+
+        self.n_calls = 0
+        self.n_recorded = 0
+        self.data: dict[str, np.ndarray] = {}
+        # Memory maps of the fields (the same arrays as data) if streamed
+        self.files: dict[str, np.memmap] = {}
+        self.chunks: Optional[queue.Queue] = None
+        self.chunk: Optional[dict[str, np.ndarray]] = None
+        self.n_chunk_frames = 0
+        self.writes: Optional[queue.Queue] = None
+        self.writer: Optional[threading.Thread] = None
+        # Exception raised by the writer, raised again by the recorder
+        self.write_error: Optional[Exception] = None
+        self.full = False
+        self.closed = False
+
+    def allocate(self, system: ea.CosseratRod) -> None:
+        # Allocate the arrays (or files) from the field shapes of the rod
+        shapes = {"time": ()}
+        for name in self.fields:
+            shapes[name] = getattr(system, ROD_FIELDS[name]).shape
+        for name, shape in shapes.items():
+            if self.path is None:
+                self.data[name] = np.zeros(
+                    (self.n_frames, *shape), dtype=self.dtypes[name]
+                )
+            else:
+                os.makedirs(self.path, exist_ok=True)
+                self.files[name] = np.lib.format.open_memmap(
+                    os.path.join(self.path, name + ".npy"),
+                    mode="w+",
+                    dtype=self.dtypes[name],
+                    shape=(self.n_frames, *shape),
+                )
+                self.data[name] = self.files[name]
+        if self.path is not None:
+            self.write_metadata()
+        if self.background:
+            self.start_writer()
+
+    def start_writer(self) -> None:
+        # Two chunks, one being filled while the other is written
+        self.chunks = queue.Queue()
+        for _ in range(2):
+            self.chunks.put(
+                {
+                    name: np.zeros(
+                        (self.chunk_size, *array.shape[1:]), dtype=array.dtype
+                    )
+                    for name, array in self.data.items()
+                }
+            )
+        self.chunk = self.chunks.get()
+        self.n_chunk_frames = 0
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.write, daemon=True)
+        self.writer.start()
+
+    def record(self, system: ea.CosseratRod, time: float) -> None:
+        if self.closed:
+            raise RuntimeError("The recorder has been closed.")
+        n_calls = self.n_calls
+        self.n_calls += 1
+        if n_calls % self.decimation != 0:
+            return
+        if not self.data:
+            self.allocate(system)
+        if self.n_recorded + self.n_chunk_frames == self.n_frames:
+            if not self.full:
+                warnings.warn(
+                    f"The recorder is full ({self.n_frames} frames), "
+                    "further frames are not recorded."
+                )
+                self.full = True
+            return
+
+        if self.chunk is None:
+            destination = self.data
+            index = self.n_recorded
+        else:
+            destination = self.chunk
+            index = self.n_chunk_frames
+        destination["time"][index] = time
+        for name in self.fields:
+            destination[name][index] = getattr(system, ROD_FIELDS[name])
+
+        if self.chunk is None:
+            self.n_recorded += 1
+            if self.path is not None and self.n_recorded % self.chunk_size == 0:
+                self.flush()
+            return
+        self.n_chunk_frames += 1
+        if self.n_chunk_frames == self.chunk_size:
+            self.submit_chunk()
+
+    def submit_chunk(self) -> None:
+        # Hand the filled chunk over to the writer and continue with the
+        # other chunk (waiting for the writer if it is still busy with it)
+        assert self.writes is not None and self.chunks is not None
+        self.writes.put((self.chunk, self.n_recorded, self.n_chunk_frames))
+        self.n_recorded += self.n_chunk_frames
+        self.n_chunk_frames = 0
+        self.chunk = self.chunks.get()
+        self.raise_write_error()
+
+    def write(self) -> None:
+        # Background thread writing the chunks into the files. The chunks
+        # are always given back, also when writing fails (e.g. on a full
+        # disk): the error is stored and raised again in the main thread,
+        # and the next chunks are not written.
+        assert self.writes is not None and self.chunks is not None
+        while True:
+            item = self.writes.get()
+            if item is None:
+                return
+            chunk, start, n_frames = item
+            try:
+                if self.write_error is None:
+                    self.write_chunk(chunk, start, n_frames)
+            except Exception as error:
+                self.write_error = error
+            finally:
+                self.chunks.put(chunk)
+
+    def write_chunk(
+        self, chunk: dict[str, np.ndarray], start: int, n_frames: int
+    ) -> None:
+        for name, array in chunk.items():
+            file = self.files[name]
+            file[start : start + n_frames] = array[:n_frames]
+            file.flush()
+        self.write_metadata(start + n_frames)
+
+    def raise_write_error(self) -> None:
+        # Raise the exception of the writer, if it failed
+        if self.write_error is not None:
+            raise self.write_error
+
+    def sync(self) -> None:
+        # Wait until the writer has written every submitted chunk, i.e. has
+        # given back the chunk which is not being filled
+        if self.writer is not None:
+            assert self.chunks is not None
+            self.chunks.put(self.chunks.get())
+        self.raise_write_error()
+
+    def write_metadata(self, n_recorded: int = 0) -> None:
+        # Recorded fields and number of frames written so far
+        assert self.path is not None
+        metadata = {
+            "n_frames": self.n_frames,
+            "n_recorded": n_recorded,
+            "fields": ["time", *self.fields],
+        }
+        filename = os.path.join(self.path, METADATA_FILENAME)
+        with open(filename + ".tmp", "w") as file:
+            json.dump(metadata, file)
+        os.replace(filename + ".tmp", filename)
+
+    def flush(self) -> None:
+        # Make the frames recorded so far visible to load_trajectory
+        for array in self.files.values():
+            array.flush()
+        self.write_metadata(self.n_recorded)
+
+    def close(self) -> None:
+        # Write the remaining frames and stop the writer. Only the streamed
+        # recording is closed, i.e. cannot record further frames.
+        if self.closed:
+            return
+        if self.writer is not None:
+            assert self.writes is not None
+            try:
+                if self.n_chunk_frames > 0:
+                    self.submit_chunk()
+            finally:
+                # The writer is stopped also when it has failed
+                self.writes.put(None)
+                self.writer.join()
+                self.writer = None
+                self.chunk = None
+                self.closed = True
+        elif self.path is not None and self.data:
+            self.flush()
+        self.closed = self.path is not None
+        self.raise_write_error()
+
+    def state(self) -> tuple[dict[str, np.ndarray], dict]:
+        # Recorded frames and counters, to resume the recording with
+        # set_state. The frames of a streamed recording are written to its
+        # files first.
+        if self.writer is not None and self.n_chunk_frames > 0:
+            self.submit_chunk()
+        self.sync()
+        if self.path is not None and self.data and self.writer is None:
+            self.flush()
+        arrays = {
+            name: array[: self.n_recorded] for name, array in self.data.items()
+        }
+        counters = {
+            "n_calls": self.n_calls,
+            "n_recorded": self.n_recorded,
+            "full": self.full,
+        }
+        return arrays, counters
+
+    def set_state(
+        self,
+        system: ea.CosseratRod,
+        arrays: dict[str, np.ndarray],
+        counters: dict,
+    ) -> None:
+        # Resume the recording from a state, discarding the frames recorded
+        # after it. The frames of the state are written again to the files
+        # of a streamed recording.
+        self.sync()
+        if not self.data:
+            self.allocate(system)
+        elif self.background and self.writer is None:
+            self.start_writer()
+        self.n_chunk_frames = 0
+        self.n_calls = counters["n_calls"]
+        self.n_recorded = counters["n_recorded"]
+        self.full = counters["full"]
+        self.closed = False
+        for name, array in arrays.items():
+            self.data[name][: len(array)] = array
+        if self.path is not None:
+            self.flush()
+
+    def as_dict(self) -> dict[str, np.ndarray]:
+        # Recorded frames of every field (views, not copies). A streamed
+        # recording is closed first.
+        self.close()
+        return {
+            name: array[: self.n_recorded] for name, array in self.data.items()
+        }
+
+    def save(self, filename: str) -> None:
+        # Save into a .npz file (the extension is added if missing), or
+        # into the folder filename if store
+        arrays: dict[str, Any] = self.as_dict()
+        if self.store:
+            write_trajectory(filename, arrays, compress=self.compress)
+        elif self.compress:
+            np.savez_compressed(filename, **arrays)
+        else:
+            np.savez(filename, **arrays)
+
+
+def load_trajectory(path: str) -> dict[str, np.ndarray]:
+    """
+    Read-only memory maps of the frames written so far by a streaming
+    TrajectoryRecorder into the folder path.
+    """
+    with open(os.path.join(path, METADATA_FILENAME)) as file:
+        metadata = json.load(file)
+    n_recorded = metadata["n_recorded"]
+    return {
+        name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")[
+            :n_recorded
+        ]
+        for name in metadata["fields"]
+    }
@@ -6,14 +6,14 @@ from numba import njit
 from cobra.math_tool import average2D as _average
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def sigma_to_shear(sigma: np.ndarray) -> np.ndarray:
     shear = sigma.copy()
     shear[2, :] += 1
     return shear
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def compute_local_shear(
     local_position: np.ndarray,
     shear: np.ndarray,
@@ -27,7 +27,7 @@ def compute_local_shear(
     return local_shear
 
 
-@njit(cache=True)  # type: ignore
+@njit(cache=True, nogil=True)  # type: ignore
 def compute_local_tangent(local_shear: np.ndarray) -> np.ndarray:
     blocksize = local_shear.shape[1]
     local_tangent = np.empty((3, blocksize))
@@ -38,3 +38,109 @@ def compute_local_tangent(local_shear: np.ndarray) -> np.ndarray:
             + (local_shear[2, i]) ** 2
         )
     return local_tangent
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def update_rod_geometry(
+    director_collection: np.ndarray,
+    sigma: np.ndarray,
+    tangents: np.ndarray,
+    dilatation: np.ndarray,
+    shear: np.ndarray,
+    material_tangent: np.ndarray,
+) -> None:
+    # In-place computation of the rod-level quantities shared by all
+    # actuations:
+    # shear = sigma_to_shear(sigma)
+    # material_tangent = lab_to_material(
+    #     director_collection, tangents * dilatation
+    # )
+    blocksize = sigma.shape[1]
+    for k in range(blocksize):
+        shear[0, k] = sigma[0, k]
+        shear[1, k] = sigma[1, k]
+        shear[2, k] = sigma[2, k] + 1.0
+        for i in range(3):
+            material_tangent[i, k] = dilatation[k] * (
+                director_collection[i, 0, k] * tangents[0, k]
+                + director_collection[i, 1, k] * tangents[1, k]
+                + director_collection[i, 2, k] * tangents[2, k]
+            )
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def compute_local_position_invariants(
+    local_position: np.ndarray,
+    rest_voronoi_lengths: np.ndarray,
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+) -> None:
+    # Terms of the local shear that do not depend on the rod state:
+    # average_position = _average(local_position)
+    # position_gradient = _difference(local_position) / rest_voronoi_lengths
+    for k in range(rest_voronoi_lengths.shape[0]):
+        for i in range(3):
+            average_position[i, k] = 0.5 * (
+                local_position[i, k] + local_position[i, k + 1]
+            )
+            position_gradient[i, k] = (
+                local_position[i, k + 1] - local_position[i, k]
+            ) / rest_voronoi_lengths[k]
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def update_local_tangent(
+    average_position: np.ndarray,
+    position_gradient: np.ndarray,
+    shear: np.ndarray,
+    kappa: np.ndarray,
+    voronoi_dilatation: np.ndarray,
+    local_tangent: np.ndarray,
+) -> None:
+    # Allocation-free equivalent of
+    # compute_local_tangent(
+    #     compute_local_shear(
+    #         local_position,
+    #         shear,
+    #         kappa,
+    #         rest_voronoi_lengths * voronoi_dilatation,
+    #     )
+    # )
+    # with the invariant terms of local_position precomputed by
+    # compute_local_position_invariants. The voronoi term of the previous
+    # element is carried over in scalars instead of being stored in a
+    # temporary array.
+    blocksize = local_tangent.shape[1]
+    previous_0 = 0.0
+    previous_1 = 0.0
+    previous_2 = 0.0
+    for i in range(blocksize):
+        current_0 = 0.0
+        current_1 = 0.0
+        current_2 = 0.0
+        if i < blocksize - 1:
+            current_0 = (
+                kappa[1, i] * average_position[2, i]
+                - kappa[2, i] * average_position[1, i]
+                + position_gradient[0, i] / voronoi_dilatation[i]
+            )
+            current_1 = (
+                kappa[2, i] * average_position[0, i]
+                - kappa[0, i] * average_position[2, i]
+                + position_gradient[1, i] / voronoi_dilatation[i]
+            )
+            current_2 = (
+                kappa[0, i] * average_position[1, i]
+                - kappa[1, i] * average_position[0, i]
+                + position_gradient[2, i] / voronoi_dilatation[i]
+            )
+        shear_0 = shear[0, i] + 0.5 * (previous_0 + current_0)
+        shear_1 = shear[1, i] + 0.5 * (previous_1 + current_1)
+        shear_2 = shear[2, i] + 0.5 * (previous_2 + current_2)
+        norm = np.sqrt(shear_0**2 + shear_1**2 + shear_2**2)
+        local_tangent[0, i] = shear_0 / norm
+        local_tangent[1, i] = shear_1 / norm
+        local_tangent[2, i] = shear_2 / norm
+        previous_0 = current_0
+        previous_1 = current_1
+        previous_2 = current_2
@@ -0,0 +1,77 @@
+import math
+
+import elastica as ea
+import numpy as np
+
+from cobra.statics import StaticSolver
+
+
+def max_frequency(solver: StaticSolver, window: int = 10) -> float:
+    """
+    Largest angular frequency [rad/s] of the small oscillations of the rod
+    of solver about its current shape, under the loads of the rod and of
+    the forcings of solver, from the eigenvalues of the linearized motion
+    on overlapping windows of window elements. The velocities and loads of
+    the rod are left unchanged.
+    """
+    system = solver.system
+    dynamics = accelerations(system, -solver.linearize())
+
+    largest = 0.0
+    for start in range(1, system.n_elems + 1, max(window // 2, 1)):
+        indices = np.flatnonzero(
+            (solver.locations >= start) & (solver.locations < start + window)
+        )
+        eigenvalues = np.linalg.eigvals(dynamics[np.ix_(indices, indices)])
+        largest = max(largest, np.abs(eigenvalues).max())
+    return float(np.sqrt(largest))
+
+
+def accelerations(system: ea.CosseratRod, loads: np.ndarray) -> np.ndarray:
+    """
+    Accelerations of the free nodes and angular accelerations (in the lab
+    frame) of the free elements of a rod due to loads, laid out as the
+    residual of StaticSolver (net forces on the free nodes, then net
+    material frame couples on the free elements) along the first axis.
+    """
+    # Nodes: acceleration = force / mass
+    n_positions = 3 * system.n_elems
+    result = np.empty_like(loads)
+    masses = np.repeat(system.mass[1:], 3)
+    result[:n_positions] = (loads[:n_positions].T / masses).T
+    # Elements: the angular acceleration, in the material frame, is
+    # dilatation * inverse inertia @ couple, and is rotated into the lab
+    # frame
+    blocks = (
+        np.einsum(
+            "jik,jlk->kil",
+            system.director_collection[:, :, 1:],
+            system.inv_mass_second_moment_of_inertia[:, :, 1:],
+        )
+        * system.dilatation[1:, None, None]
+    )
+    couples = loads[n_positions:].reshape(system.n_elems - 1, 3, -1)
+    result[n_positions:] = np.einsum(
+        "kil,kl...->ki...", blocks, couples
+    ).reshape(loads[n_positions:].shape)
+    return result
+
+
+def stable_time_step(solver: StaticSolver, safety: float = 0.8) -> float:
+    """
+    Largest stable time step [s] of the position Verlet integration of the
+    rod of solver about its current shape (2 / max_frequency), scaled by
+    safety. The dampers of the simulation (ea.AnalyticalLinearDamper) are
+    unconditionally stable and do not lower it.
+    """
+    return safety * 2.0 / max_frequency(solver)
+
+
+def aligned_time_step(
+    max_time_step: float, interval: float
+) -> tuple[float, int]:
+    # Largest time step below max_time_step which divides interval (e.g.
+    # the recording interval 1 / recording_fps), and the number of steps
+    # per interval
+    n_steps = math.ceil(interval / max_time_step)
+    return interval / n_steps, n_steps
@@ -0,0 +1,354 @@
+from typing import Callable, Iterable, Optional, Protocol, Sequence
+
+from dataclasses import dataclass
+
+import elastica as ea
+import numpy as np
+from numba import njit
+
+
+class Forcing(Protocol):
+    """
+    Protocol class for loads applied to a rod, e.g. ApplyFREEs or
+    ea.GravityForces.
+    """
+
+    def apply_forces(self, system: ea.CosseratRod, time: float) -> None: ...
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def rotate_directors(directors: np.ndarray, rotations: np.ndarray) -> None:
+    # Rotate the directors (3, 3, n) of the elements in place by the
+    # rotation vectors (3, n) given in the lab frame (Rodrigues' formula)
+    for index in range(directors.shape[2]):
+        angle = np.sqrt(
+            rotations[0, index] ** 2
+            + rotations[1, index] ** 2
+            + rotations[2, index] ** 2
+        )
+        if angle == 0.0:
+            continue
+        axis = rotations[:, index] / angle
+        cos = np.cos(angle)
+        sin = np.sin(angle)
+        rotation = np.empty((3, 3))
+        for i in range(3):
+            for j in range(3):
+                rotation[i, j] = (1 - cos) * axis[i] * axis[j]
+            rotation[i, i] += cos
+        rotation[0, 1] -= sin * axis[2]
+        rotation[0, 2] += sin * axis[1]
+        rotation[1, 0] += sin * axis[2]
+        rotation[1, 2] -= sin * axis[0]
+        rotation[2, 0] -= sin * axis[1]
+        rotation[2, 1] += sin * axis[0]
+        # Each director d (a row) is rotated into rotation @ d
+        director = directors[:, :, index].copy()
+        for row in range(3):
+            for i in range(3):
+                value = 0.0
+                for j in range(3):
+                    value += rotation[i, j] * director[row, j]
+                directors[row, i, index] = value
+
+
+@dataclass
+class StaticResult:
+    """
+    Dataclass containing the convergence, the number of Newton iterations
+    and the final largest net force [N] and couple [N m] of a static solve.
+    """
+
+    converged: bool
+    n_iterations: int
+    force_residual: float
+    couple_residual: float
+
+
+class StaticSolver:
+    """
+    Quasi-static equilibrium of a rod with a clamped base (as with
+    ea.OneEndFixedBC) under the loads of forcings, solved by Newton's
+    method from the current shape of the rod, which is left in the
+    equilibrium. The residuals are the net loads on the free nodes and
+    elements at rest, the Jacobian is computed by finite differences.
+
+    Parameters
+    ----------
+    system : ea.CosseratRod
+        Rod, in the initial guess of the equilibrium.
+    forcings : Iterable[Forcing]
+        External loads of the rod.
+    force_tolerance : float, optional
+        Tolerance of the net forces [N], by default 1e-6.
+    couple_tolerance : float, optional
+        Tolerance of the net couples [N m], by default 1e-8.
+    max_iterations : int, optional
+        Maximum number of Newton iterations, by default 50.
+    perturbation : float, optional
+        Finite difference perturbation of the positions [m] and rotations
+        [rad], by default 1e-6.
+    stride : int, optional
+        Element distance between the unknowns perturbed together, by
+        default 5 (the loads of the Cosserat rod and of the FREE actuation
+        reach two elements on each side).
+    """
+
+    def __init__(
+        self,
+        system: ea.CosseratRod,
+        forcings: Iterable[Forcing],
+        force_tolerance: float = 1e-6,
+        couple_tolerance: float = 1e-8,
+        max_iterations: int = 50,
+        perturbation: float = 1e-6,
+        stride: int = 5,
+    ):
+        self.system = system
+        self.forcings = list(forcings)
+        self.force_tolerance = force_tolerance
+        self.couple_tolerance = couple_tolerance
+        self.max_iterations = max_iterations
+        self.perturbation = perturbation
+        self.stride = stride
+
+        n_elements = system.n_elems
+        self.n_unknowns = 3 * n_elements + 3 * (n_elements - 1)
+        self.jacobian = np.zeros((self.n_unknowns, self.n_unknowns))
+        # Element location of each unknown (nodes 1..n then elements
+        # 1..n-1, three components each) and of each residual
+        self.locations = np.concatenate(
+            [
+                np.repeat(np.arange(1, n_elements + 1), 3),
+                np.repeat(np.arange(1, n_elements), 3),
+            ]
+        )
+        self.kinds = np.concatenate(
+            [np.zeros(3 * n_elements, int), np.ones(3 * (n_elements - 1), int)]
+        )
+        self.components = np.tile(np.arange(3), 2 * n_elements - 1)
+
+        # Groups of unknowns of the same kind and component which are stride
+        # elements apart, with the Jacobian entries (rows and columns) of
+        # each group: the residuals within stride // 2 elements
+        self.groups = []
+        reach = stride // 2
+        for kind in range(2):
+            for component in range(3):
+                for offset in range(stride):
+                    columns = np.flatnonzero(
+                        (self.kinds == kind)
+                        & (self.components == component)
+                        & (self.locations % stride == offset)
+                    )
+                    if len(columns) == 0:
+                        continue
+                    rows, entry_columns = np.nonzero(
+                        np.abs(
+                            self.locations[:, None]
+                            - self.locations[None, columns]
+                        )
+                        <= reach
+                    )
+                    self.groups.append((columns, rows, columns[entry_columns]))
+
+    def residual(self, time: float = 0.0) -> np.ndarray:
+        # Net forces on the free nodes and net couples on the free elements
+        system = self.system
+        system.velocity_collection[...] = 0.0
+        system.omega_collection[...] = 0.0
+        system.external_forces[...] = 0.0
+        system.external_torques[...] = 0.0
+        system.compute_internal_forces_and_torques(np.float64(time))
+        for forcing in self.forcings:
+            forcing.apply_forces(system, time)
+        forces = system.internal_forces + system.external_forces
+        couples = system.internal_torques + system.external_torques
+        return np.concatenate(
+            [forces[:, 1:].T.ravel(), couples[:, 1:].T.ravel()]
+        )
+
+    def update(self, step: np.ndarray) -> None:
+        # Move the free nodes and rotate the free elements by step
+        n_elements = self.system.n_elems
+        self.system.position_collection[:, 1:] += (
+            step[: 3 * n_elements].reshape(-1, 3).T
+        )
+        rotate_directors(
+            self.system.director_collection[:, :, 1:],
+            np.ascontiguousarray(step[3 * n_elements :].reshape(-1, 3).T),
+        )
+
+    def compute_jacobian(self, central: bool = True) -> np.ndarray:
+        # Finite differences, perturbing the unknowns of a group together.
+        # The rod is stiff in stretch and shear but soft in bending (the
+        # Jacobian is ill-conditioned), and forward differences are not
+        # accurate enough in the bending directions for the Newton
+        # iterations, but are for the implicit stepper.
+        position = self.system.position_collection.copy()
+        director = self.system.director_collection.copy()
+        base = None if central else self.residual()
+        signs = (1.0, -1.0) if central else (1.0,)
+        step = np.zeros(self.n_unknowns)
+        for columns, rows, entry_columns in self.groups:
+            differences = []
+            for sign in signs:
+                step[columns] = sign * self.perturbation
+                self.update(step)
+                differences.append(self.residual())
+                self.system.position_collection[...] = position
+                self.system.director_collection[...] = director
+            step[columns] = 0.0
+            if central:
+                difference = (differences[0] - differences[1]) / (
+                    2 * self.perturbation
+                )
+            else:
+                difference = (differences[0] - base) / self.perturbation
+            self.jacobian[rows, entry_columns] = difference[rows]
+        return self.jacobian
+
+    def linearize(self, central: bool = True) -> np.ndarray:
+        # Jacobian at the current shape of the rod, leaving its velocities
+        # and loads unchanged, e.g. during a simulation
+        saved = {
+            name: getattr(self.system, name).copy()
+            for name in (
+                "velocity_collection",
+                "omega_collection",
+                "external_forces",
+                "external_torques",
+                "internal_forces",
+                "internal_torques",
+            )
+        }
+        jacobian = self.compute_jacobian(central)
+        for name, value in saved.items():
+            getattr(self.system, name)[...] = value
+        return jacobian
+
+    def residual_norms(self, residual: np.ndarray) -> tuple[float, float]:
+        n_forces = 3 * self.system.n_elems
+        return (
+            float(np.abs(residual[:n_forces]).max()),
+            float(np.abs(residual[n_forces:]).max()),
+        )
+
+    def is_converged(self, residual: np.ndarray) -> bool:
+        force, couple = self.residual_norms(residual)
+        return force < self.force_tolerance and couple < self.couple_tolerance
+
+    def scaled_norm(self, residual: np.ndarray) -> float:
+        force, couple = self.residual_norms(residual)
+        return max(force / self.force_tolerance, couple / self.couple_tolerance)
+
+    def solve(self) -> StaticResult:
+        """
+        Newton iterations from the current shape of the rod, with a
+        backtracking line search on the residual (scaled by the tolerances).
+        """
+        residual = self.residual()
+        n_iterations = 0
+        while (
+            not self.is_converged(residual)
+            and n_iterations < self.max_iterations
+        ):
+            n_iterations += 1
+            step = -np.linalg.solve(self.compute_jacobian(), residual)
+            position = self.system.position_collection.copy()
+            director = self.system.director_collection.copy()
+            norm = self.scaled_norm(residual)
+            for _ in range(10):
+                self.update(step)
+                new_residual = self.residual()
+                if self.scaled_norm(new_residual) < norm:
+                    break
+                self.system.position_collection[...] = position
+                self.system.director_collection[...] = director
+                step *= 0.5
+            else:
+                # No decrease along the Newton direction
+                self.residual()
+                break
+            residual = new_residual
+        force, couple = self.residual_norms(residual)
+        return StaticResult(
+            converged=self.is_converged(residual),
+            n_iterations=n_iterations,
+            force_residual=force,
+            couple_residual=couple,
+        )
+
+    def solve_path(
+        self,
+        set_load: Callable[[np.ndarray], None],
+        loads: Sequence[np.ndarray],
+        start_load: Optional[np.ndarray] = None,
+        max_subdivisions: int = 8,
+    ) -> list[tuple[StaticResult, dict[str, np.ndarray]]]:
+        """
+        Equilibria along a path of loads (e.g. pressures), each solved from
+        the previous one (continuation). A load whose solve does not
+        converge is approached in halved increments from the previous load.
+        Returns the result and a copy of the positions and directors of
+        every load of the path.
+        """
+        previous = (
+            np.asarray(loads[0], dtype=np.float64)
+            if start_load is None
+            else np.asarray(start_load, dtype=np.float64)
+        )
+        solutions = []
+        for load in loads:
+            load = np.asarray(load, dtype=np.float64)
+            result = self.solve_increment(
+                set_load, previous, load, max_subdivisions
+            )
+            solutions.append((result, self.state()))
+            previous = load
+        return solutions
+
+    def solve_increment(
+        self,
+        set_load: Callable[[np.ndarray], None],
+        start: np.ndarray,
+        end: np.ndarray,
+        max_subdivisions: int,
+    ) -> StaticResult:
+        # Solve at end from the equilibrium at start, halving the increment
+        # while the solve fails
+        position = self.system.position_collection.copy()
+        director = self.system.director_collection.copy()
+        set_load(end)
+        result = self.solve()
+        if result.converged or max_subdivisions == 0:
+            return result
+        self.system.position_collection[...] = position
+        self.system.director_collection[...] = director
+        middle = 0.5 * (start + end)
+        result = self.solve_increment(
+            set_load, start, middle, max_subdivisions - 1
+        )
+        if not result.converged:
+            return result
+        return self.solve_increment(set_load, middle, end, max_subdivisions - 1)
+
+    def state(self) -> dict[str, np.ndarray]:
+        return {
+            "position": self.system.position_collection.copy(),
+            "director": self.system.director_collection.copy(),
+            "kappa": self.system.kappa.copy(),
+            "sigma": self.system.sigma.copy(),
+        }
+
+
+def snake_order(shape: tuple[int, int]) -> list[tuple[int, int]]:
+    """
+    Indices of a 2D grid in boustrophedon order, so that consecutive grid
+    points are neighbors, e.g. for a continuation over a pressure grid.
+    """
+    order: list[tuple[int, int]] = []
+    for row in range(shape[0]):
+        columns = range(shape[1]) if row % 2 == 0 else reversed(range(shape[1]))
+        order.extend((row, column) for column in columns)
+    return order
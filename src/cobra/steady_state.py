@@ -0,0 +1,116 @@
+from typing import Optional
+
+import elastica as ea
+import numpy as np
+
+from cobra.math_tool import max_column_change, max_column_norm
+
+
+class SteadyStateDetector:
+    """
+    Detector of the steady state (equilibrium) of a rod under constant
+    loads, e.g. a pressure hold. The rod is settled once the largest nodal
+    velocity, the largest angular velocity and the largest rates of change
+    of the curvature kappa and of the strain sigma have stayed below their
+    tolerances for dwell_time. The settling time is the time from which
+    they stayed below the tolerances. The default tolerances suit the BR2
+    arm (0.288 m long, damping constant 0.05), whose residual oscillations
+    decay slowly: a nodal velocity of 5e-3 m/s is a tip oscillation of
+    about 0.1 mm.
+
+    update is called after every step, but the state of the rod is only
+    checked every check_interval of simulation time, the rates of kappa
+    and sigma being their change over the interval.
+
+    Parameters
+    ----------
+    velocity_tolerance : float, optional
+        Tolerance of the nodal velocities [m/s], by default 5e-3.
+    omega_tolerance : float, optional
+        Tolerance of the angular velocities [rad/s], by default 5e-2.
+    kappa_rate_tolerance : float, optional
+        Tolerance of the rate of the curvatures [1/(m s)], by default 0.5.
+    sigma_rate_tolerance : float, optional
+        Tolerance of the rate of the strains [1/s], by default 1e-4.
+    dwell_time : float, optional
+        Time the rod should stay below the tolerances [s], by default 0.1.
+    check_interval : float, optional
+        Simulation time between two checks [s], by default 1e-3.
+    """
+
+    def __init__(
+        self,
+        velocity_tolerance: float = 5e-3,
+        omega_tolerance: float = 5e-2,
+        kappa_rate_tolerance: float = 0.5,
+        sigma_rate_tolerance: float = 1e-4,
+        dwell_time: float = 0.1,
+        check_interval: float = 1e-3,
+    ):
+        self.velocity_tolerance = velocity_tolerance
+        self.omega_tolerance = omega_tolerance
+        self.kappa_rate_tolerance = kappa_rate_tolerance
+        self.sigma_rate_tolerance = sigma_rate_tolerance
+        self.dwell_time = dwell_time
+        self.check_interval = check_interval
+        self.previous_kappa: Optional[np.ndarray] = None
+        self.previous_sigma: Optional[np.ndarray] = None
+        self.reset()
+
+    def reset(self) -> None:
+        # Start a new detection, e.g. when the loads change
+        self.last_check_time = np.nan
+        self.quiet_time: Optional[float] = None
+        self.settling_time: Optional[float] = None
+        self.rates = {
+            "velocity": np.inf,
+            "omega": np.inf,
+            "kappa_rate": np.inf,
+            "sigma_rate": np.inf,
+        }
+
+    @property
+    def settled(self) -> bool:
+        return self.settling_time is not None
+
+    def update(self, system: ea.CosseratRod, time: float) -> bool:
+        # Check the rod if check_interval has passed since the last check,
+        # and return whether it has settled
+        if self.settled:
+            return True
+        if self.previous_kappa is None or self.previous_sigma is None:
+            self.previous_kappa = system.kappa.copy()
+            self.previous_sigma = system.sigma.copy()
+        if np.isnan(self.last_check_time):
+            # First call, the reference of the rates
+            np.copyto(self.previous_kappa, system.kappa)
+            np.copyto(self.previous_sigma, system.sigma)
+            self.last_check_time = time
+            return False
+        interval = time - self.last_check_time
+        if interval < self.check_interval:
+            return False
+
+        self.rates["velocity"] = max_column_norm(system.velocity_collection)
+        self.rates["omega"] = max_column_norm(system.omega_collection)
+        self.rates["kappa_rate"] = (
+            max_column_change(system.kappa, self.previous_kappa) / interval
+        )
+        self.rates["sigma_rate"] = (
+            max_column_change(system.sigma, self.previous_sigma) / interval
+        )
+        self.last_check_time = time
+
+        if (
+            self.rates["velocity"] < self.velocity_tolerance
+            and self.rates["omega"] < self.omega_tolerance
+            and self.rates["kappa_rate"] < self.kappa_rate_tolerance
+            and self.rates["sigma_rate"] < self.sigma_rate_tolerance
+        ):
+            if self.quiet_time is None:
+                self.quiet_time = time
+            if time - self.quiet_time >= self.dwell_time:
+                self.settling_time = self.quiet_time
+        else:
+            self.quiet_time = None
+        return self.settled
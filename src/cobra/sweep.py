@@ -0,0 +1,537 @@
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+    Protocol,
+    Sequence,
+)
+
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import asdict, dataclass, field
+from functools import partial
+
+import numpy as np
+
+MakeEnvironment = Callable[[], Any]
+RunCase = Callable[[Any, dict, str], Optional[int | dict]]
+Warmup = Callable[[Any], None]
+RunEnvironment = Callable[[Any, int], Any]
+
+
+def parameter_grid(**values: Iterable) -> list[dict]:
+    """
+    Cartesian product of parameter values, e.g.
+    parameter_grid(bend=[0, 10], twist=[0, 5]) gives 4 cases.
+    """
+    names = list(values.keys())
+    return [
+        dict(zip(names, combination))
+        for combination in itertools.product(*values.values())
+    ]
+
+
+def parameter_samples(
+    n_samples: int,
+    sampler: Callable[[np.random.Generator], dict],
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Cases drawn from a sampler with a seeded random number generator, so that
+    the same cases (and case names) are drawn again when a sweep is resumed.
+    """
+    rng = np.random.default_rng(seed)
+    return [sampler(rng) for _ in range(n_samples)]
+
+
+@dataclass
+class CaseResult:
+    """
+    Dataclass containing the name, parameters, wall time [s], number of
+    simulated steps (if reported by the case) and further information
+    reported by the case (e.g. its settling time) of a finished case.
+    """
+
+    name: str
+    parameters: dict
+    wall_time: float
+    n_steps: Optional[int] = None
+    info: dict = field(default_factory=dict)
+
+    @property
+    def steps_per_second(self) -> float:
+        if self.n_steps is None or self.wall_time == 0.0:
+            return np.nan
+        return self.n_steps / self.wall_time
+
+
+def _to_json(value: Any) -> Any:
+    # numpy scalars and arrays in the case parameters
+    return np.asarray(value).tolist()
+
+
+# Environment of the worker process, built once by the worker initializer and
+# reused by every case run in the worker.
+_worker_environment: Any = None
+_worker_run_case: Optional[RunCase] = None
+
+
+def _initialize_worker(
+    make_environment: MakeEnvironment,
+    run_case: RunCase,
+) -> None:
+    global _worker_environment, _worker_run_case
+    _worker_environment = make_environment()
+    _worker_run_case = run_case
+
+
+# Environments of the worker threads (executor "thread"), built by each
+# thread for its first case and reused by the following ones
+_thread_state = threading.local()
+
+
+def _run_worker_case(name: str, parameters: dict, filename: str) -> CaseResult:
+    return _run_case(
+        _worker_environment, _worker_run_case, name, parameters, filename
+    )
+
+
+def _run_thread_case(
+    make_environment: MakeEnvironment,
+    run_case: RunCase,
+    name: str,
+    parameters: dict,
+    filename: str,
+) -> CaseResult:
+    if getattr(_thread_state, "environment", None) is None:
+        _thread_state.environment = make_environment()
+    return _run_case(
+        _thread_state.environment, run_case, name, parameters, filename
+    )
+
+
+def _run_case(
+    environment: Any,
+    run_case: Optional[RunCase],
+    name: str,
+    parameters: dict,
+    filename: str,
+) -> CaseResult:
+    assert run_case is not None
+    start = time.perf_counter()
+    output = run_case(environment, parameters, filename)
+    wall_time = time.perf_counter() - start
+    info = dict(output) if isinstance(output, dict) else {"n_steps": output}
+    return CaseResult(
+        name=name,
+        parameters=parameters,
+        wall_time=wall_time,
+        n_steps=info.pop("n_steps", None),
+        info=info,
+    )
+
+
+class SweepRunner:
+    """
+    Run the cases of a parameter sweep on a pool of worker processes.
+
+    Each worker builds its environment once and reuses it for all the cases
+    it runs. Before the pool is started, the environment is built and warmed
+    up once in the main process, so that the compiled kernels are in the
+    numba cache, and loaded by the workers instead of being compiled by
+    every worker. Finished cases are appended to a log in the output
+    folder, and skipped when the sweep is run again, so an interrupted sweep
+    is resumed by running it again.
+
+    Parameters
+    ----------
+    make_environment : Callable[[], Any]
+        Picklable function building the environment of a worker.
+    run_case : Callable[[Any, dict, str], Optional[int]]
+        Picklable function running a case, called with the environment of
+        the worker, the parameters of the case and the output filename
+        (without extension) of the case. It is responsible for resetting the
+        environment and saving the results, and may return the number of
+        simulated steps for the throughput report, or a dict of the number
+        of steps ("n_steps") and further information logged with the case.
+    output_folder : str
+        Folder of the case outputs and of the log.
+    n_workers : int, optional
+        Number of worker processes, by default os.cpu_count(). With 0, the
+        cases are run in the main process.
+    warmup : Callable[[Any], None], optional
+        Function called once with an environment before the pool is started,
+        e.g. running a few steps to compile the kernels (see also
+        cobra.warmup).
+    log_filename : str, optional
+        Name of the log (JSON lines) of finished cases, by default
+        "sweep_log.jsonl".
+    start_method : str, optional
+        Start method of the worker processes, by default "spawn". Forking
+        a process in which parallel kernels have run is not safe with the
+        tbb threading layer of numba.
+    executor : str, optional
+        "process" (by default) to run the cases on worker processes, or
+        "thread" to run them on worker threads of the main process, each
+        thread building its environment for its first case. The compiled
+        kernels of cobra release the GIL, but the time stepping of
+        PyElastica does not, so threads only overlap the actuation loads of
+        their steps, see ThreadedEnvironmentRunner.
+    """
+
+    def __init__(
+        self,
+        make_environment: MakeEnvironment,
+        run_case: RunCase,
+        output_folder: str,
+        n_workers: Optional[int] = None,
+        warmup: Optional[Warmup] = None,
+        log_filename: str = "sweep_log.jsonl",
+        start_method: str = "spawn",
+        executor: str = "process",
+    ):
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown executor {executor}.")
+        self.make_environment = make_environment
+        self.run_case = run_case
+        self.output_folder = output_folder
+        self.n_workers = (
+            (os.cpu_count() or 1) if n_workers is None else n_workers
+        )
+        self.warmup = warmup
+        self.log_path = os.path.join(output_folder, log_filename)
+        self.start_method = start_method
+        self.executor = executor
+
+    def finished_cases(self) -> dict[str, CaseResult]:
+        # Cases recorded in the log of the output folder
+        finished: dict[str, CaseResult] = {}
+        if not os.path.exists(self.log_path):
+            return finished
+        with open(self.log_path) as log:
+            for line in log:
+                try:
+                    result = CaseResult(**json.loads(line))
+                except (json.JSONDecodeError, TypeError):
+                    continue  # e.g. line cut short by an interruption
+                finished[result.name] = result
+        return finished
+
+    def run(
+        self,
+        cases: Sequence[dict],
+        names: Optional[Sequence[str]] = None,
+        resume: bool = True,
+        verbose: bool = True,
+    ) -> list[CaseResult]:
+        """
+        Run the cases, by default skipping the cases already in the log, and
+        return the results of the cases run by this call. On a pool, the
+        cases which raise are reported together by a RuntimeError once the
+        other cases have finished and been logged.
+        """
+        if names is None:
+            names = [f"case_{index:04d}" for index in range(len(cases))]
+        if len(names) != len(cases):
+            raise ValueError("Cases and names should have the same length.")
+        if len(set(names)) != len(names):
+            raise ValueError("Case names should be unique.")
+
+        os.makedirs(self.output_folder, exist_ok=True)
+        if not resume and os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        finished = self.finished_cases()
+        pending = [
+            (name, parameters)
+            for name, parameters in zip(names, cases)
+            if name not in finished
+        ]
+        if verbose and finished:
+            print(f"Resuming sweep: {len(finished)} cases already finished.")
+
+        results: list[CaseResult] = []
+        # Exceptions of the failed cases of the pool, by case name
+        failures: dict[str, Exception] = {}
+        start = time.perf_counter()
+        if self.n_workers == 0:
+            _initialize_worker(self.make_environment, self.run_case)
+            if self.warmup is not None:
+                self.warmup(_worker_environment)
+            for name, parameters in pending:
+                result = _run_worker_case(
+                    name, parameters, self.case_filename(name)
+                )
+                self.record(result, results, verbose)
+        elif pending:
+            if self.warmup is not None:
+                self.warmup(self.make_environment())
+            with self.make_executor(len(pending)) as executor:
+                futures = {
+                    executor.submit(
+                        self.worker_case(),
+                        name,
+                        parameters,
+                        self.case_filename(name),
+                    ): name
+                    for name, parameters in pending
+                }
+                for future in as_completed(futures):
+                    # A failed case is not logged (hence run again when the
+                    # sweep is resumed), the other cases are still recorded
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        failures[futures[future]] = error
+                        if verbose:
+                            print(f"{futures[future]}: failed ({error!r})")
+                        continue
+                    self.record(result, results, verbose)
+        elapsed = time.perf_counter() - start
+
+        if verbose:
+            print(self.summary(results, elapsed))
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} of {len(pending)} cases failed: "
+                + ", ".join(sorted(failures))
+            ) from next(iter(failures.values()))
+        return results
+
+    def make_executor(self, n_cases: int) -> Executor:
+        n_workers = min(self.n_workers, n_cases)
+        if self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=n_workers)
+        return ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_initialize_worker,
+            initargs=(self.make_environment, self.run_case),
+        )
+
+    def worker_case(self) -> Callable[[str, dict, str], CaseResult]:
+        # Function running a case (name, parameters, filename) in a worker
+        if self.executor == "thread":
+            return partial(
+                _run_thread_case, self.make_environment, self.run_case
+            )
+        return _run_worker_case
+
+    def case_filename(self, name: str) -> str:
+        return os.path.join(self.output_folder, name)
+
+    def record(
+        self, result: CaseResult, results: list[CaseResult], verbose: bool
+    ) -> None:
+        # Append the finished case to the log, flushed so that the case is
+        # not run again if the sweep is interrupted afterwards.
+        results.append(result)
+        with open(self.log_path, "a") as log:
+            log.write(json.dumps(asdict(result), default=_to_json) + "\n")
+            log.flush()
+        if verbose:
+            print(
+                f"{result.name}: {result.wall_time:.2f} s, "
+                f"{result.steps_per_second:.0f} steps/s"
+            )
+
+    @staticmethod
+    def summary(results: list[CaseResult], elapsed: float) -> str:
+        n_cases = len(results)
+        if n_cases == 0:
+            return "No case to run."
+        wall_times = np.array([result.wall_time for result in results])
+        n_steps = sum(result.n_steps or 0 for result in results)
+        lines = [
+            f"{n_cases} cases in {elapsed:.2f} s "
+            f"({n_cases / elapsed:.3f} cases/s"
+            + (f", {n_steps / elapsed:.0f} steps/s)" if n_steps else ")"),
+            f"case wall time: mean {wall_times.mean():.2f} s, "
+            f"min {wall_times.min():.2f} s, max {wall_times.max():.2f} s",
+        ]
+        return "\n".join(lines)
+
+
+class ThreadedEnvironmentRunner:
+    """
+    Advance several environments concurrently on a pool of threads of one
+    process, sharing the compiled kernels and the memory of the process
+    instead of duplicating them in worker processes.
+
+    The compiled kernels of cobra release the GIL, so the threads run them
+    in parallel, while the rest of a step (the time stepping of PyElastica
+    and the Python code) runs one thread at a time. The speedup over running
+    the environments one after the other is hence bounded by the fraction of
+    a step spent in the kernels of cobra. The environments should be warmed
+    up (their kernels compiled) before they are run concurrently.
+
+    Parameters
+    ----------
+    environments : Sequence[Any]
+        Environments, each advanced by one thread at a time.
+    n_threads : int, optional
+        Number of threads, by default the number of environments (bounded
+        by os.cpu_count()).
+    """
+
+    def __init__(
+        self, environments: Sequence[Any], n_threads: Optional[int] = None
+    ):
+        self.environments = list(environments)
+        if n_threads is None:
+            n_threads = min(len(self.environments), os.cpu_count() or 1)
+        if n_threads < 1:
+            raise ValueError("The number of threads should be positive.")
+        self.n_threads = n_threads
+        self.executor = ThreadPoolExecutor(max_workers=n_threads)
+
+    def run(self, run_environment: RunEnvironment) -> list:
+        """
+        Call run_environment with every environment and its index, e.g. to
+        simulate a number of steps, concurrently, and return the outputs in
+        the order of the environments. An exception raised by a call is raised
+        again once all calls have finished.
+        """
+        futures = [
+            self.executor.submit(run_environment, environment, index)
+            for index, environment in enumerate(self.environments)
+        ]
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self) -> "ThreadedEnvironmentRunner":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class ForkableEnvironment(Protocol):
+    """
+    Protocol class for environments whose state can be copied in memory at
+    a time and restored afterwards (e.g. BaseEnvironment of the examples).
+    """
+
+    def snapshot(self, time: float) -> Any: ...
+
+    def restore(self, snapshot: Any) -> float: ...
+
+
+RunPhase = Callable[[Any, Hashable, float], float]
+FinishCase = Callable[[Any, int, float], None]
+
+
+@dataclass
+class PhaseNode:
+    """
+    Node of a tree of phases: the phase leading to the node, the following
+    phases (children) and the indices of the cases ending at the node.
+    """
+
+    phase: Optional[Hashable] = None
+    children: dict = field(default_factory=dict)
+    cases: list[int] = field(default_factory=list)
+
+
+def phase_tree(case_phases: Sequence[Sequence[Hashable]]) -> PhaseNode:
+    """
+    Tree of the phases of the cases, where the cases sharing their first k
+    phases share the first k nodes of their path from the root.
+    """
+    root = PhaseNode()
+    for index, phases in enumerate(case_phases):
+        node = root
+        for phase in phases:
+            node = node.children.setdefault(phase, PhaseNode(phase))
+        node.cases.append(index)
+    return root
+
+
+class PrefixSharingScheduler:
+    """
+    Run cases whose histories (e.g. of pressures) are sequences of phases,
+    simulating the phases shared by several cases, i.e. common prefixes of
+    their histories, only once.
+
+    The phases form a tree (see phase_tree) which is traversed depth first.
+    At a branch point, the state of the environment is copied in memory
+    (environment.snapshot) and restored (environment.restore) before each of
+    the following branches, so that the snapshots of at most one path of
+    the tree are kept at once.
+
+    Parameters
+    ----------
+    environment : ForkableEnvironment
+        Environment, in its initial state when run is called.
+    run_phase : Callable[[Any, Hashable, float], float]
+        Function simulating a phase, called with the environment, the phase
+        and the current time, returning the time at the end of the phase.
+        A phase is any hashable description of a part of a history,
+        including its duration, e.g. ("bend", 10.0, 0.0, 2.0) for a bending
+        pressure ramp to 10 psi from 0 s to 2 s.
+    finish_case : Callable[[Any, int, float], None]
+        Function called with the environment, the index of a case and the
+        time at the end of the case, e.g. to save the recorded trajectory.
+        The environment is restored afterwards if needed, so finish_case
+        may close the recording.
+    """
+
+    def __init__(
+        self,
+        environment: ForkableEnvironment,
+        run_phase: RunPhase,
+        finish_case: FinishCase,
+    ):
+        self.environment = environment
+        self.run_phase = run_phase
+        self.finish_case = finish_case
+        self.simulated_time = 0.0
+        self.case_time = 0.0
+
+    def run(
+        self, case_phases: Sequence[Sequence[Hashable]], time: float = 0.0
+    ) -> dict[str, float]:
+        """
+        Run the cases from the current state at time, and return the time
+        simulated ("simulated_time") and the time that running each case
+        from the beginning would have simulated ("case_time").
+        """
+        self.simulated_time = 0.0
+        self.case_time = 0.0
+        self.run_node(phase_tree(case_phases), time, time)
+        return {
+            "simulated_time": self.simulated_time,
+            "case_time": self.case_time,
+        }
+
+    def run_node(self, node: PhaseNode, time: float, start_time: float) -> None:
+        # Fork the state, before the cases ending here are finished, if
+        # several branches (or a finished case) start here
+        snapshot = None
+        if node.children and (len(node.children) > 1 or node.cases):
+            snapshot = self.environment.snapshot(time)
+        for index in node.cases:
+            self.finish_case(self.environment, index, time)
+            self.case_time += time - start_time
+        for child in node.children.values():
+            child_time = time
+            if snapshot is not None:
+                child_time = self.environment.restore(snapshot)
+            end_time = self.run_phase(self.environment, child.phase, child_time)
+            self.simulated_time += end_time - child_time
+            self.run_node(child, end_time, start_time)
@@ -0,0 +1,237 @@
+from typing import Any, Iterable, Iterator, Mapping
+
+import json
+import os
+import zlib
+
+import numpy as np
+
+INDEX_FILENAME = "index.json"
+
+
+class TrajectoryStoreWriter:
+    """
+    Writer of a trajectory store: a folder with one binary file per field,
+    made of chunks of chunk_frames consecutive frames, and an index of the
+    chunks. Frames are appended in any number at a time and written chunk
+    by chunk, the index is updated after every chunk so that the store can
+    be read while it is written.
+
+    Uncompressed chunks are stored back to back, hence the file of a field
+    is a raw (n_frames, *frame_shape) array which is memory-mapped by the
+    reader. Compressed (zlib) chunks are decompressed by the reader only
+    when one of their frames is read.
+
+    Parameters
+    ----------
+    path : str
+        Folder of the store.
+    chunk_frames : int, optional
+        Number of frames of a chunk, by default 256.
+    compress : bool, optional
+        If True, each chunk is compressed, by default False.
+    """
+
+    def __init__(
+        self, path: str, chunk_frames: int = 256, compress: bool = False
+    ):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        self.index: dict[str, dict] = {}
+        self.buffers: dict[str, list[np.ndarray]] = {}
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, frames: Mapping[str, np.ndarray]) -> None:
+        # Append frames, (n_frames, *frame_shape) arrays, of some fields
+        for name, array in frames.items():
+            array = np.asarray(array)
+            if name not in self.index:
+                self.index[name] = {
+                    "dtype": array.dtype.str,
+                    "frame_shape": list(array.shape[1:]),
+                    "compression": "zlib" if self.compress else None,
+                    "n_frames": 0,
+                    "chunks": [],  # [offset, n_bytes, n_frames]
+                }
+                self.buffers[name] = []
+                open(self.field_filename(name), "wb").close()
+            self.buffers[name].append(array)
+            n_buffered = sum(len(buffer) for buffer in self.buffers[name])
+            if n_buffered >= self.chunk_frames:
+                self.write_chunks(name, final=False)
+        self.write_index()
+
+    def write_chunks(self, name: str, final: bool) -> None:
+        # Write the buffered frames of a field in chunks of chunk_frames, and
+        # also the remaining frames if final
+        field = self.index[name]
+        frames = np.concatenate(self.buffers[name]).astype(
+            field["dtype"], copy=False
+        )
+        n_written = 0
+        with open(self.field_filename(name), "ab") as file:
+            while frames.shape[0] - n_written >= self.chunk_frames or (
+                final and frames.shape[0] > n_written
+            ):
+                chunk = frames[n_written : n_written + self.chunk_frames]
+                data = np.ascontiguousarray(chunk).tobytes()
+                if self.compress:
+                    data = zlib.compress(data)
+                field["chunks"].append([file.tell(), len(data), len(chunk)])
+                file.write(data)
+                field["n_frames"] += len(chunk)
+                n_written += len(chunk)
+        self.buffers[name] = (
+            [frames[n_written:]] if n_written < len(frames) else []
+        )
+
+    def write_index(self) -> None:
+        index = {"chunk_frames": self.chunk_frames, "fields": self.index}
+        filename = os.path.join(self.path, INDEX_FILENAME)
+        with open(filename + ".tmp", "w") as file:
+            json.dump(index, file)
+        os.replace(filename + ".tmp", filename)
+
+    def field_filename(self, name: str) -> str:
+        return os.path.join(self.path, name + ".bin")
+
+    def close(self) -> None:
+        for name in self.index:
+            if self.buffers[name]:
+                self.write_chunks(name, final=True)
+        self.write_index()
+
+
+def write_trajectory(
+    path: str,
+    trajectory: Mapping[str, np.ndarray],
+    chunk_frames: int = 256,
+    compress: bool = False,
+) -> None:
+    """
+    Write a recorded trajectory (e.g. TrajectoryRecorder.as_dict() or a
+    saved .npz file) into a trajectory store.
+    """
+    writer = TrajectoryStoreWriter(path, chunk_frames, compress)
+    for name in trajectory:
+        writer.append({name: trajectory[name]})
+    writer.close()
+
+
+class StoredField:
+    """
+    Field of a trajectory store, indexed as a (n_frames, *frame_shape) array
+    but only the requested frames are read: field[1000:1200] reads (and
+    decompresses) only the chunks of these frames, and field[:, :, -1]
+    reads only the last node of every frame from the memory-mapped file
+    of an uncompressed field.
+    """
+
+    def __init__(self, filename: str, field: dict):
+        self.filename = filename
+        self.dtype = np.dtype(field["dtype"])
+        self.frame_shape = tuple(field["frame_shape"])
+        self.compression = field["compression"]
+        self.chunks = field["chunks"]
+        self.n_frames = int(sum(chunk[2] for chunk in self.chunks))
+        self.chunk_starts = np.cumsum([0] + [chunk[2] for chunk in self.chunks])
+
+    @property
+    def shape(self) -> tuple:
+        return (self.n_frames, *self.frame_shape)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+    def memmap(self) -> np.ndarray:
+        # Memory map of the frames of an uncompressed field
+        if self.compression is not None:
+            raise ValueError("Compressed fields cannot be memory-mapped.")
+        if self.n_frames == 0:
+            return np.zeros(self.shape, dtype=self.dtype)
+        return np.memmap(
+            self.filename, dtype=self.dtype, mode="r", shape=self.shape
+        )
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        frames, rest = key[0], key[1:]
+        if self.compression is None:
+            return np.array(self.memmap()[key])
+
+        # Read the chunks of the requested frames only
+        frame_indices = np.arange(self.n_frames)[frames]
+        single_frame = np.ndim(frame_indices) == 0
+        frame_indices = np.atleast_1d(frame_indices)
+        result = np.empty(
+            (len(frame_indices), *self.frame_shape), dtype=self.dtype
+        )
+        chunk_indices = (
+            np.searchsorted(self.chunk_starts, frame_indices, side="right") - 1
+        )
+        with open(self.filename, "rb") as file:
+            for chunk_index in np.unique(chunk_indices):
+                chunk = self.read_chunk(file, chunk_index)
+                selected = chunk_indices == chunk_index
+                result[selected] = chunk[
+                    frame_indices[selected] - self.chunk_starts[chunk_index]
+                ]
+        if single_frame:
+            return np.asarray(result[0][rest])
+        return result[(slice(None), *rest)]
+
+    def read_chunk(self, file: Any, chunk_index: int) -> np.ndarray:
+        offset, n_bytes, n_frames = self.chunks[chunk_index]
+        file.seek(offset)
+        data = zlib.decompress(file.read(n_bytes))
+        return np.frombuffer(data, dtype=self.dtype).reshape(
+            n_frames, *self.frame_shape
+        )
+
+
+class TrajectoryReader(Mapping):
+    """
+    Reader of a trajectory store, a mapping from field names to
+    StoredField, e.g. TrajectoryReader(path)["kappa"][1000:1200].
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILENAME)) as file:
+            self.index = json.load(file)
+
+    def __getitem__(self, name: str) -> StoredField:
+        return StoredField(
+            os.path.join(self.path, name + ".bin"),
+            self.index["fields"][name],
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        fields: dict[str, dict] = self.index["fields"]
+        return iter(fields)
+
+    def __len__(self) -> int:
+        return len(self.index["fields"])
+
+
+def is_trajectory_store(path: str) -> bool:
+    return os.path.exists(os.path.join(path, INDEX_FILENAME))
+
+
+def read_runs(
+    paths: Iterable[str], name: str, key: Any = slice(None)
+) -> list[np.ndarray]:
+    """
+    The same selection of a field from several stored runs, e.g. the tip
+    position over time of every run with key (slice(None), slice(None), -1).
+    """
+    return [TrajectoryReader(path)[name][key] for path in paths]
@@ -0,0 +1,76 @@
+from typing import Callable
+
+import numpy as np
+import pytest
+from elastica import CosseratRod
+
+from cobra.actuations.FREE import BaseFREE, PressureCoefficients
+
+
+@pytest.fixture
+def make_rod() -> Callable[..., CosseratRod]:
+    # Factory of vertical rods (along -z, fixed at the origin), perturbed so
+    # that strains and curvatures are non-trivial
+    def make_rod(n_elements: int, perturbation: float = 0.01) -> CosseratRod:
+        poisson_ratio = 0.5
+        rod = CosseratRod.straight_rod(
+            n_elements=n_elements,
+            start=np.zeros((3,)),
+            direction=np.array([0.0, 0.0, -1.0]),
+            normal=np.array([1.0, 0.0, 0.0]),
+            base_length=1,
+            base_radius=0.01 * np.ones(n_elements),
+            density=1000,
+            youngs_modulus=1e7,
+            shear_modulus=1e7 / (poisson_ratio + 1.0),
+        )
+        rod.position_collection[:2, 1:] += perturbation * np.random.rand(
+            2, n_elements
+        )
+        rod.compute_internal_forces_and_torques(0.0)
+        return rod
+
+    return make_rod
+
+
+@pytest.fixture
+def make_cantilever() -> Callable[..., CosseratRod]:
+    # Factory of horizontal cantilevers (along x, fixed at the origin)
+    def make_cantilever(
+        n_elements: int,
+        base_length: float = 0.5,
+        base_radius: float = 0.01,
+        youngs_modulus: float = 1e6,
+    ) -> CosseratRod:
+        return CosseratRod.straight_rod(
+            n_elements=n_elements,
+            start=np.zeros(3),
+            direction=np.array([1.0, 0.0, 0.0]),
+            normal=np.array([0.0, 0.0, 1.0]),
+            base_length=base_length,
+            base_radius=base_radius,
+            density=1000,
+            youngs_modulus=youngs_modulus,
+            shear_modulus=youngs_modulus / 1.5,
+        )
+
+    return make_cantilever
+
+
+@pytest.fixture
+def make_FREE() -> Callable[[int], BaseFREE]:
+    # Factory of FREE actuators off the axis of the rod, at 12 psi
+    def make_FREE(n_elements: int) -> BaseFREE:
+        actuation = BaseFREE(
+            position=np.tile(
+                np.array([0.005, 0.002, 0.0]), (n_elements, 1)
+            ).T.copy(),
+            pressure_coefficients=PressureCoefficients(
+                force=np.array([-0.08, 0.01]),
+                couple=np.array([0.0006, 0.0]),
+            ),
+        )
+        actuation.pressure = 12.0
+        return actuation
+
+    return make_FREE
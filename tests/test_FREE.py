@@ -0,0 +1,393 @@
+import dataclasses
+import threading
+import time
+
+import numpy as np
+import pytest
+from elastica import CosseratRod
+from elastica._calculus import difference_kernel, quadrature_kernel
+from elastica._linalg import _batch_cross
+from numba import njit
+from numba.core.runtime import _nrt_python, rtsys
+
+from cobra.actuations.actuation import RodGeometry
+from cobra.actuations.actuation_tool import lab_to_material, material_to_lab
+from cobra.actuations.FREE import (
+    ApplyFREEs,
+    BaseFREE,
+    PressureCoefficients,
+    apply_FREE_load,
+    compute_internal_load,
+)
+from cobra.actuations.pressure_map import ElementwisePolynomialMap, TabulatedMap
+from cobra.math_tool import average2D
+from cobra.rod_geometry_tool import (
+    compute_local_shear,
+    compute_local_tangent,
+    sigma_to_shear,
+)
+
+
+@njit(nogil=True)
+def apply_repeatedly(n_repeats: int, arguments: tuple) -> None:
+    for _ in range(n_repeats):
+        apply_FREE_load(*arguments)
+
+
+def reference_FREE_load(
+    actuation: BaseFREE, rod: CosseratRod
+) -> tuple[np.ndarray, np.ndarray]:
+    # Composition of the original (allocating) kernels
+    tangent = compute_local_tangent(
+        compute_local_shear(
+            actuation.position,
+            sigma_to_shear(rod.sigma),
+            rod.kappa,
+            rod.rest_voronoi_lengths * rod.voronoi_dilatation,
+        )
+    )
+    force_value = np.polyval(
+        actuation.pressure_coefficients.force, actuation.pressure
+    )
+    couple_value = np.polyval(
+        actuation.pressure_coefficients.couple, actuation.pressure
+    )
+    internal_force = force_value * tangent
+    temp_internal_couple = np.zeros_like(tangent)
+    temp_internal_couple[2, :] = couple_value * tangent[2, :]
+    temp_internal_couple += _batch_cross(actuation.position, internal_force)
+    internal_couple = average2D(temp_internal_couple)
+    external_force = difference_kernel(
+        material_to_lab(rod.director_collection, internal_force)
+    )
+    external_couple = (
+        difference_kernel(internal_couple)
+        + quadrature_kernel(
+            _batch_cross(rod.kappa, internal_couple) * rod.rest_voronoi_lengths
+        )
+        + _batch_cross(
+            lab_to_material(
+                rod.director_collection, rod.tangents * rod.dilatation
+            ),
+            internal_force,
+        )
+        * rod.rest_lengths
+    )
+    return external_force, external_couple
+
+
+class TestFREE:
+    n_dim = 3
+    n_elements = 10
+
+    def test_compute_internal_load(self) -> None:
+        position = np.random.rand(self.n_dim, self.n_elements)
+        tangent = np.random.rand(self.n_dim, self.n_elements)
+        internal_force_value = np.random.rand(self.n_elements)
+        internal_couple_value = np.random.rand(self.n_elements)
+        internal_force = np.zeros((self.n_dim, self.n_elements))
+        internal_couple = np.zeros((self.n_dim, self.n_elements - 1))
+
+        compute_internal_load(
+            position,
+            tangent,
+            internal_force_value,
+            internal_couple_value,
+            internal_force,
+            internal_couple,
+        )
+
+        np.testing.assert_allclose(
+            internal_force, internal_force_value * tangent
+        )
+        temp_internal_couple = _batch_cross(position, internal_force)
+        temp_internal_couple[2, :] += internal_couple_value * tangent[2, :]
+        np.testing.assert_allclose(
+            internal_couple, average2D(temp_internal_couple)
+        )
+
+    def test_FREE_call(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuation = make_FREE(self.n_elements)
+
+        actuation(rod)
+
+        external_force, external_couple = reference_FREE_load(actuation, rod)
+        np.testing.assert_allclose(
+            actuation.equivalent_external_force, external_force
+        )
+        np.testing.assert_allclose(
+            actuation.equivalent_external_couple, external_couple
+        )
+
+    def test_apply_FREEs(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuations = [make_FREE(self.n_elements) for _ in range(2)]
+        actuations[1].pressure = 3.0
+        rod.external_forces[:, :] = 0.0
+        rod.external_torques[:, :] = 0.0
+
+        ApplyFREEs(actuations).apply_forces(rod)
+
+        external_force = np.zeros_like(rod.external_forces)
+        external_couple = np.zeros_like(rod.external_torques)
+        for actuation in actuations:
+            force, couple = reference_FREE_load(actuation, rod)
+            external_force += force
+            external_couple += couple
+        np.testing.assert_allclose(rod.external_forces, external_force)
+        np.testing.assert_allclose(rod.external_torques, external_couple)
+
+    def test_apply_superposed_FREEs(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuations = [make_FREE(self.n_elements) for _ in range(3)]
+        actuations[1].pressure = 3.0
+        actuations[2].pressure = 0.0
+        actuations[2].pressure_coefficients = PressureCoefficients(
+            force=np.array([-0.08, 0.0]),
+            couple=np.array([0.0006, 0.0]),
+        )
+        assert actuations[2].is_inactive()
+
+        rod.external_forces[:, :] = 0.0
+        rod.external_torques[:, :] = 0.0
+        ApplyFREEs(actuations).apply_forces(rod)
+        external_force = rod.external_forces.copy()
+        external_couple = rod.external_torques.copy()
+
+        rod.external_forces[:, :] = 0.0
+        rod.external_torques[:, :] = 0.0
+        ApplyFREEs(actuations, superpose=True).apply_forces(rod)
+
+        np.testing.assert_allclose(rod.external_forces, external_force)
+        np.testing.assert_allclose(rod.external_torques, external_couple)
+
+    @pytest.mark.parametrize("superpose", [False, True])
+    def test_apply_decimated_FREEs(
+        self, superpose: bool, make_rod, make_FREE
+    ) -> None:
+        rod = make_rod(self.n_elements)
+        actuations = [make_FREE(self.n_elements) for _ in range(2)]
+        forcing = ApplyFREEs(actuations, superpose=superpose, update_interval=3)
+
+        def apply(time: float) -> tuple[np.ndarray, np.ndarray]:
+            rod.external_forces[:, :] = 0.0
+            rod.external_torques[:, :] = 0.0
+            forcing.apply_forces(rod, time)
+            return rod.external_forces.copy(), rod.external_torques.copy()
+
+        evaluated = apply(0.0)
+        # The loads of the first evaluation are applied again, although the
+        # rod and the pressures have changed, until the third call
+        rod.position_collection[:2, 1:] += 0.01
+        rod.compute_internal_forces_and_torques(0.0)
+        actuations[0].pressure = 20.0
+        for time in (1.0, 2.0):
+            for load, cached in zip(apply(time), evaluated):
+                np.testing.assert_array_equal(load, cached)
+        assert forcing.n_evaluations == 1
+        reevaluated = apply(3.0)
+        assert forcing.n_evaluations == 2
+        assert not np.allclose(reevaluated[0], evaluated[0])
+        # An earlier time (a restored state) is evaluated again
+        apply(1.0)
+        assert forcing.n_evaluations == 3
+
+    def test_apply_FREEs_tolerances(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuations = [make_FREE(self.n_elements) for _ in range(2)]
+        forcing = ApplyFREEs(
+            actuations,
+            update_interval=100,
+            pressure_tolerance=0.5,
+            strain_tolerance=1e-3,
+        )
+        forcing.apply_forces(rod, 0.0)
+        actuations[1].pressure += 0.4
+        forcing.apply_forces(rod, 1.0)
+        assert forcing.n_evaluations == 1
+        actuations[1].pressure += 0.4
+        forcing.apply_forces(rod, 2.0)
+        assert forcing.n_evaluations == 2
+        rod.position_collection[0, -1] += 1e-2
+        rod.compute_internal_forces_and_torques(0.0)
+        forcing.apply_forces(rod, 3.0)
+        assert forcing.n_evaluations == 3
+
+    def test_apply_FREEs_update_interval(self, make_FREE) -> None:
+        with pytest.raises(ValueError):
+            ApplyFREEs([make_FREE(self.n_elements)], update_interval=0)
+
+    def test_FREE_is_inactive(self, make_FREE) -> None:
+        actuation = make_FREE(self.n_elements)
+        assert not actuation.is_inactive()
+        actuation.pressure = 0.0
+        # The force polynomial has a non-zero constant term
+        assert not actuation.is_inactive()
+        actuation.pressure_coefficients = PressureCoefficients(
+            force=np.array([-0.08, 0.0]),
+            couple=np.array([0.0006, 0.0]),
+        )
+        assert actuation.is_inactive()
+        actuation.pressure = 1.0
+        assert not actuation.is_inactive()
+
+    def test_apply_FREE_load_does_not_allocate(
+        self, make_rod, make_FREE
+    ) -> None:
+        rod = make_rod(self.n_elements)
+        actuation = make_FREE(self.n_elements)
+        geometry = RodGeometry(self.n_elements)
+        geometry.update(rod)
+        arguments = (
+            actuation._internal_load_arguments(rod, geometry)
+            + actuation._equivalent_load_arguments(rod, geometry)
+            + (rod.external_forces, rod.external_torques)
+        )
+        # Trigger compilation before counting allocations
+        apply_repeatedly(1, arguments)
+
+        stats_enabled = _nrt_python.memsys_stats_enabled()
+        _nrt_python.memsys_enable_stats()
+        try:
+            allocations = []
+            for n_repeats in [1, 11]:
+                before = rtsys.get_allocation_stats()
+                apply_repeatedly(n_repeats, arguments)
+                after = rtsys.get_allocation_stats()
+                allocations.append(after.alloc - before.alloc)
+        finally:
+            if not stats_enabled:
+                _nrt_python.memsys_disable_stats()
+
+        # Only the boxing of the arguments into the compiled function may
+        # allocate, which does not depend on the number of kernel calls.
+        assert allocations[0] == allocations[1]
+
+    def test_apply_FREE_load_releases_gil(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuation = make_FREE(self.n_elements)
+        geometry = RodGeometry(self.n_elements)
+        geometry.update(rod)
+        arguments = (
+            actuation._internal_load_arguments(rod, geometry)
+            + actuation._equivalent_load_arguments(rod, geometry)
+            + (rod.external_forces, rod.external_torques)
+        )
+        # Repeats of the kernel lasting about 0.2 s
+        start = time.perf_counter()
+        apply_repeatedly(1000, arguments)
+        n_repeats = int(1000 * 0.2 / (time.perf_counter() - start)) + 1
+        start = time.perf_counter()
+        apply_repeatedly(n_repeats, arguments)
+        duration = time.perf_counter() - start
+
+        # The main thread keeps running Python code while the kernel runs in
+        # another thread, otherwise it waits for the whole kernel call
+        thread = threading.Thread(
+            target=apply_repeatedly, args=(n_repeats, arguments)
+        )
+        times = [time.perf_counter()]
+        thread.start()
+        while thread.is_alive():
+            times.append(time.perf_counter())
+        assert np.diff(times).max() < 0.5 * duration
+
+    def test_FREE_load_value_update(self, make_FREE) -> None:
+        actuation = make_FREE(self.n_elements)
+        actuation.update_load_value()
+        np.testing.assert_allclose(
+            actuation.internal_force_value, np.polyval([-0.08, 0.01], 12.0)
+        )
+
+        actuation.pressure = 20.0
+        actuation.update_load_value()
+        np.testing.assert_allclose(
+            actuation.internal_force_value, np.polyval([-0.08, 0.01], 20.0)
+        )
+        np.testing.assert_allclose(
+            actuation.internal_couple_value, np.polyval([0.0006, 0.0], 20.0)
+        )
+
+    def test_pressure_coefficients_are_frozen(self, make_FREE) -> None:
+        actuation = make_FREE(self.n_elements)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            actuation.pressure_coefficients.force = np.array([-1.0, 0.0])
+
+        # Reassigning the coefficients evaluates the new maps
+        actuation.pressure_coefficients = PressureCoefficients(
+            force=np.array([-1.0, 0.0]),
+            couple=np.zeros(1),
+        )
+        np.testing.assert_allclose(
+            actuation.internal_force_value, -actuation.pressure
+        )
+
+    def test_FREE_with_pressure_maps(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuation = BaseFREE(
+            position=make_FREE(self.n_elements).position,
+            pressure_coefficients=PressureCoefficients(
+                force=TabulatedMap(
+                    pressures=np.array([0.0, 10.0, 30.0]),
+                    values=np.array([0.0, -1.0, -2.0]),
+                ),
+                couple=ElementwisePolynomialMap(
+                    np.tile(np.linspace(0.0, 0.001, self.n_elements), (2, 1))
+                ),
+            ),
+        )
+        actuation.pressure = 20.0
+
+        actuation(rod)
+
+        np.testing.assert_allclose(actuation.internal_force_value, -1.5)
+        np.testing.assert_allclose(
+            actuation.internal_couple_value,
+            21.0 * np.linspace(0.0, 0.001, self.n_elements),
+        )
+
+    def test_FREE_invariants(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuation = make_FREE(self.n_elements)
+        actuation(rod)
+        rest_voronoi_lengths = rod.rest_voronoi_lengths
+        np.testing.assert_allclose(
+            actuation.position_gradient,
+            np.diff(actuation.position, axis=1) / rest_voronoi_lengths,
+        )
+
+        # Reassigning the position updates the invariants
+        actuation.position = 2.0 * actuation.position
+        actuation(rod)
+        np.testing.assert_allclose(
+            actuation.position_gradient,
+            np.diff(actuation.position, axis=1) / rest_voronoi_lengths,
+        )
+        external_force, external_couple = reference_FREE_load(actuation, rod)
+        np.testing.assert_allclose(
+            actuation.equivalent_external_couple, external_couple
+        )
+
+        # Reassigning the rod rest properties updates the invariants
+        rod.rest_voronoi_lengths = 2.0 * rest_voronoi_lengths
+        actuation(rod)
+        np.testing.assert_allclose(
+            actuation.position_gradient,
+            np.diff(actuation.position, axis=1) / rod.rest_voronoi_lengths,
+        )
+
+    def test_FREE_position_shape(self, make_FREE) -> None:
+        actuation = make_FREE(self.n_elements)
+        with pytest.raises(ValueError):
+            actuation.position = np.zeros((3, self.n_elements + 1))
+
+    def test_FREE_position_is_read_only(self, make_FREE) -> None:
+        # A read-only copy, changed by reassigning it only
+        actuation = make_FREE(self.n_elements)
+        position = np.ones((3, self.n_elements))
+        actuation.position = position
+        position[0, 0] = 2.0
+        assert actuation.position[0, 0] == 1.0
+        with pytest.raises(ValueError):
+            actuation.position[0, 0] = 2.0
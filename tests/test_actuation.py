@@ -1,7 +1,11 @@
 import numpy as np
 from elastica import CosseratRod
 
-from cobra.actuations.actuation import ContinuousActuation
+from cobra.actuations.actuation import (
+    ApplyActuations,
+    ContinuousActuation,
+    RodGeometry,
+)
 
 
 class TestActuation:
@@ -55,3 +59,42 @@ class TestActuation:
     def test_actuation_call(self):
         self.actuation(self.rod)
         assert True
+
+    def test_rod_geometry_shape(self):
+        geometry = RodGeometry(n_elements=self.n_elements)
+        geometry.update(self.rod)
+        assert geometry.shear.shape == (self.n_dim, self.n_elements)
+        assert geometry.material_tangent.shape == (
+            self.n_dim,
+            self.n_elements,
+        )
+
+    def test_actuation_call_with_shared_geometry(self):
+        actuation = ContinuousActuation(n_elements=self.n_elements)
+        actuation.internal_force[:, :] = np.random.rand(
+            self.n_dim, self.n_elements
+        )
+        actuation.internal_couple[:, :] = np.random.rand(
+            self.n_dim, self.n_elements - 1
+        )
+        actuation(self.rod)
+        equivalent_external_force = actuation.equivalent_external_force.copy()
+        equivalent_external_couple = actuation.equivalent_external_couple.copy()
+
+        geometry = RodGeometry(n_elements=self.n_elements)
+        geometry.update(self.rod)
+        actuation(self.rod, geometry)
+
+        np.testing.assert_allclose(
+            actuation.equivalent_external_force, equivalent_external_force
+        )
+        np.testing.assert_allclose(
+            actuation.equivalent_external_couple, equivalent_external_couple
+        )
+
+    def test_apply_actuations(self):
+        apply_actuations = ApplyActuations(
+            [ContinuousActuation(n_elements=self.n_elements) for _ in range(2)]
+        )
+        apply_actuations.apply_forces(self.rod)
+        assert apply_actuations.geometry.n_elements == self.n_elements
@@ -1,5 +1,7 @@
 import numpy as np
 from elastica import CosseratRod
+from elastica._calculus import difference_kernel, quadrature_kernel
+from elastica._linalg import _batch_cross
 
 from cobra.actuations.actuation_tool import (
     apply_load,
@@ -74,6 +76,54 @@ class TestActuationTool:
         )
         assert equivalent_external_couple.shape == (self.n_dim, self.n_elements)
 
+    def test_internal_load_to_equivalent_external_load_value(self) -> None:
+        director_collection = np.random.rand(
+            self.n_dim, self.n_dim, self.n_elements
+        )
+        kappa = np.random.rand(self.n_dim, self.n_elements - 1)
+        tangents = np.random.rand(self.n_dim, self.n_elements)
+        rest_lengths = np.random.rand(self.n_elements)
+        rest_voronoi_lengths = np.random.rand(self.n_elements - 1)
+        dilatation = np.random.rand(self.n_elements)
+        voronoi_dilatation = np.random.rand(self.n_elements - 1)
+        internal_force = np.random.rand(self.n_dim, self.n_elements)
+        internal_couple = np.random.rand(self.n_dim, self.n_elements - 1)
+        equivalent_external_force = np.zeros((self.n_dim, self.n_elements + 1))
+        equivalent_external_couple = np.zeros((self.n_dim, self.n_elements))
+
+        internal_load_to_equivalent_external_load(
+            director_collection,
+            kappa,
+            tangents,
+            rest_lengths,
+            rest_voronoi_lengths,
+            dilatation,
+            voronoi_dilatation,
+            internal_force,
+            internal_couple,
+            equivalent_external_force,
+            equivalent_external_couple,
+        )
+
+        np.testing.assert_allclose(
+            equivalent_external_force,
+            difference_kernel(
+                material_to_lab(director_collection, internal_force)
+            ),
+        )
+        np.testing.assert_allclose(
+            equivalent_external_couple,
+            difference_kernel(internal_couple)
+            + quadrature_kernel(
+                _batch_cross(kappa, internal_couple) * rest_voronoi_lengths
+            )
+            + _batch_cross(
+                lab_to_material(director_collection, tangents * dilatation),
+                internal_force,
+            )
+            * rest_lengths,
+        )
+
     def test_force_induced_couple(self) -> None:
         distance = np.random.rand(self.n_dim, self.n_elements)
         force = np.random.rand(self.n_dim, self.n_elements)
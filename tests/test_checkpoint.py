@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from cobra.checkpoint import (
+    read_checkpoint,
+    restore_rod_state,
+    rod_state,
+    with_prefix,
+    write_checkpoint,
+)
+
+
+class TestCheckpoint:
+    def test_rod_state(self, tmp_path, make_rod) -> None:
+        rod = make_rod(5)
+        rod.position_collection[:] = np.random.rand(3, 6)
+        rod.omega_collection[:] = np.random.rand(3, 5)
+        arrays = rod_state(rod, prefix="rod0/")
+        assert "rod0/velocity_collection" in arrays
+        write_checkpoint(
+            str(tmp_path / "checkpoint"), arrays, {"time": 0.5, "n": [1, 2]}
+        )
+        position = rod.position_collection.copy()
+        omega = rod.omega_collection.copy()
+        rod.position_collection[:] = 0.0
+        rod.omega_collection[:] = 0.0
+
+        arrays, metadata = read_checkpoint(str(tmp_path / "checkpoint.npz"))
+        assert metadata == {"time": 0.5, "n": [1, 2]}
+        position_view = rod.position_collection
+        restore_rod_state(rod, arrays, prefix="rod0/")
+        # The arrays are restored in place
+        assert rod.position_collection is position_view
+        np.testing.assert_array_equal(rod.position_collection, position)
+        np.testing.assert_array_equal(rod.omega_collection, omega)
+        assert not list(tmp_path.glob("*.tmp.npz"))
+
+    def test_mismatch(self, make_rod) -> None:
+        arrays = rod_state(make_rod(5))
+        with pytest.raises(ValueError):
+            restore_rod_state(make_rod(6), arrays)
+
+    def test_with_prefix(self) -> None:
+        arrays = {"a/x": np.zeros(1), "a/y": np.ones(1), "b/x": np.zeros(2)}
+        assert set(with_prefix(arrays, "a/")) == {"x", "y"}
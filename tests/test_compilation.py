@@ -0,0 +1,18 @@
+import pytest
+
+import cobra
+from cobra.compilation import warmup
+
+
+class TestWarmup:
+    def test_warmup(self) -> None:
+        assert cobra.warmup is warmup
+        times = warmup(stages=["pressure maps", "statics"])
+        assert list(times.keys()) == ["pressure maps", "statics"]
+        assert all(time >= 0.0 for time in times.values())
+
+    def test_unknown_stage(self) -> None:
+        with pytest.raises(ValueError):
+            warmup(stages=["solver"])
+        with pytest.raises(AttributeError):
+            cobra.cooldown
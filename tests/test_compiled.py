@@ -0,0 +1,104 @@
+from typing import Callable
+
+import numpy as np
+from elastica import CosseratRod
+
+from cobra.actuations.actuation import ContinuousActuation
+from cobra.actuations.compiled import (
+    FREE_KIND,
+    PYTHON_KIND,
+    STATIC_KIND,
+    CompiledActuations,
+)
+from cobra.actuations.FREE import ApplyFREEs, BaseFREE, PressureCoefficients
+
+
+class SubclassedFREE(BaseFREE):
+    # Not registered, evaluated in Python
+    pass
+
+
+class TestCompiledActuations:
+    n_elements = 10
+
+    def make_actuations(self, make_FREE: Callable) -> list:
+        actuations = [make_FREE(self.n_elements) for _ in range(3)]
+        actuations[1].pressure = 3.0
+        actuations[2].pressure = 0.0
+        actuations[2].pressure_coefficients = PressureCoefficients(
+            force=np.array([-0.08, 0.0]),
+            couple=np.array([0.0006, 0.0]),
+        )
+        static = ContinuousActuation(self.n_elements)
+        static.internal_force[:, :] = np.random.rand(3, self.n_elements)
+        static.internal_couple[:, :] = np.random.rand(3, self.n_elements - 1)
+        return actuations + [static]
+
+    def assert_same_loads(self, rod: CosseratRod, actuations: list) -> None:
+        loads = []
+        for compiled in (False, True):
+            rod.external_forces[:, :] = 0.0
+            rod.external_torques[:, :] = 0.0
+            ApplyFREEs(
+                actuations, superpose=True, compiled=compiled
+            ).apply_forces(rod)
+            loads.append(
+                (rod.external_forces.copy(), rod.external_torques.copy())
+            )
+        np.testing.assert_allclose(loads[1][0], loads[0][0], atol=1e-12)
+        np.testing.assert_allclose(loads[1][1], loads[0][1], atol=1e-12)
+
+    def test_compiled_loads(self, make_rod, make_FREE) -> None:
+        actuations = self.make_actuations(make_FREE)
+        assert actuations[2].is_inactive()
+        self.assert_same_loads(make_rod(self.n_elements), actuations)
+        compiled = CompiledActuations(actuations, self.n_elements)
+        np.testing.assert_array_equal(
+            compiled.kinds, [FREE_KIND] * 3 + [STATIC_KIND]
+        )
+
+    def test_python_fallback(self, make_rod, make_FREE) -> None:
+        actuations = self.make_actuations(make_FREE)
+        subclassed = SubclassedFREE(
+            position=actuations[0].position.copy(),
+            pressure_coefficients=actuations[0].pressure_coefficients,
+        )
+        subclassed.pressure = 7.0
+        actuations.append(subclassed)
+        compiled = CompiledActuations(actuations, self.n_elements)
+        assert compiled.kinds[-1] == PYTHON_KIND
+        assert compiled.python_actuations == [subclassed]
+        self.assert_same_loads(make_rod(self.n_elements), actuations)
+
+    def test_reassigned_position(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        actuations = self.make_actuations(make_FREE)[:2]
+        forcing = ApplyFREEs(actuations, compiled=True)
+        forcing.apply_forces(rod)
+        # Gathered again after a new position, also when its invalidation
+        # was consumed by another forcing
+        actuations[0].position = 2.0 * actuations[0].position
+        ApplyFREEs(actuations).apply_forces(rod)
+        rod.external_forces[:, :] = 0.0
+        rod.external_torques[:, :] = 0.0
+        forcing.apply_forces(rod)
+        loads = rod.external_forces.copy(), rod.external_torques.copy()
+        self.assert_same_loads(make_rod(self.n_elements), actuations)
+        rod.external_forces[:, :] = 0.0
+        rod.external_torques[:, :] = 0.0
+        ApplyFREEs(actuations, superpose=True).apply_forces(rod)
+        np.testing.assert_allclose(loads[0], rod.external_forces, atol=1e-12)
+        np.testing.assert_allclose(loads[1], rod.external_torques, atol=1e-12)
+
+    def test_compiled_cache(self, make_rod, make_FREE) -> None:
+        rod = make_rod(self.n_elements)
+        forcing = ApplyFREEs(
+            self.make_actuations(make_FREE), compiled=True, update_interval=3
+        )
+        rod.external_forces[:, :] = 0.0
+        forcing.apply_forces(rod, 0.0)
+        evaluated = rod.external_forces.copy()
+        rod.external_forces[:, :] = 0.0
+        forcing.apply_forces(rod, 1.0)
+        assert forcing.n_evaluations == 1
+        np.testing.assert_array_equal(rod.external_forces, evaluated)
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+
+from cobra.dataset import (
+    ArmDatasetBuilder,
+    data_point_indices,
+    load_arm_dataset,
+    pos_dir_to_input,
+    run_slices,
+    sigma_to_shear,
+)
+from cobra.recorder import TrajectoryRecorder
+from cobra.trajectory_store import write_trajectory
+
+
+def make_trajectory(n_frames: int, n_elements: int) -> dict[str, np.ndarray]:
+    return {
+        "time": np.arange(n_frames) * 0.1,
+        "radius": np.random.rand(n_frames, n_elements),
+        "position": np.random.rand(n_frames, 3, n_elements + 1),
+        "director": np.random.rand(n_frames, 3, 3, n_elements),
+        "sigma": np.random.rand(n_frames, 3, n_elements),
+        "kappa": np.random.rand(n_frames, 3, n_elements - 1),
+    }
+
+
+class FakeRod:
+    def __init__(self, trajectory: dict, frame: int):
+        self.radius = trajectory["radius"][frame]
+        self.position_collection = trajectory["position"][frame]
+        self.director_collection = trajectory["director"][frame]
+        self.sigma = trajectory["sigma"][frame]
+        self.kappa = trajectory["kappa"][frame]
+
+
+def reference_dataset(trajectories: list[dict], step_skip: int, idx) -> dict:
+    # Same computation as the former create_arm_data_set.py, in memory
+    names = ["input_data", "true_pos", "true_dir", "true_kappa", "true_shear"]
+    data: dict = {name: [] for name in names}
+    for trajectory in trajectories:
+        position = trajectory["position"][::step_skip]
+        director = trajectory["director"][::step_skip]
+        data["input_data"].append(
+            np.hstack(
+                [
+                    position[..., idx],
+                    director[..., idx].reshape(len(director), -1, len(idx)),
+                ]
+            )
+        )
+        data["true_pos"].append(position)
+        data["true_dir"].append(director)
+        data["true_kappa"].append(trajectory["kappa"][::step_skip])
+        shear = trajectory["sigma"][::step_skip].copy()
+        shear[:, 2, :] += 1
+        data["true_shear"].append(shear)
+    return {name: np.vstack(value) for name, value in data.items()}
+
+
+class TestArmDataset:
+    def test_pos_dir_to_input(self) -> None:
+        pos = np.random.rand(4, 3, 2)
+        dir = np.random.rand(4, 3, 3, 2)
+        inputs = pos_dir_to_input(pos, dir)
+        assert inputs.shape == (4, 12, 2)
+        np.testing.assert_allclose(inputs[:, 3:6], dir[:, 0])
+
+    def test_sigma_to_shear(self) -> None:
+        sigma = np.random.rand(4, 3, 5)
+        shear = sigma_to_shear(sigma)
+        np.testing.assert_allclose(shear[:, 2], sigma[:, 2] + 1)
+        np.testing.assert_allclose(shear[:, :2], sigma[:, :2])
+
+    def test_data_point_indices(self) -> None:
+        np.testing.assert_array_equal(
+            data_point_indices(100, 3), np.array([33, 66, -1])
+        )
+
+    @pytest.mark.parametrize("chunk_size", [2, 1024])
+    def test_build(self, tmp_path, chunk_size) -> None:
+        n_elements = 6
+        trajectories = [
+            make_trajectory(n_frames, n_elements) for n_frames in [7, 10, 5]
+        ]
+        filenames = [str(tmp_path / "run0.npz"), str(tmp_path / "run1")]
+        np.savez(filenames[0], **trajectories[0])
+        # The second run is a compressed trajectory store
+        write_trajectory(
+            filenames[1], trajectories[1], chunk_frames=4, compress=True
+        )
+        # The last run is streamed by a recorder into a folder
+        recorder = TrajectoryRecorder(
+            n_frames=5,
+            fields=["radius", "position", "director", "sigma", "kappa"],
+            path=str(tmp_path / "run2"),
+        )
+        for frame, time in enumerate(trajectories[2]["time"]):
+            recorder.record(FakeRod(trajectories[2], frame), time)
+        recorder.close()
+        filenames.append(str(tmp_path / "run2"))
+
+        builder = ArmDatasetBuilder(
+            filenames,
+            str(tmp_path / "dataset"),
+            step_skip=2,
+            n_data_pts=3,
+            reference_index=1,
+            chunk_size=chunk_size,
+        )
+        manifest = builder.build()
+        data = load_arm_dataset(str(tmp_path / "dataset"))
+
+        expected = reference_dataset(
+            trajectories, 2, data_point_indices(n_elements, 3)
+        )
+        assert manifest["n_samples"] == 4 + 5 + 3
+        for name, value in expected.items():
+            np.testing.assert_allclose(data[name], value)
+
+        model = data["model"]
+        assert model["n_elem"] == n_elements
+        position = trajectories[1]["position"][0]
+        np.testing.assert_allclose(model["L"], np.linalg.norm(position[:, -1]))
+        np.testing.assert_allclose(
+            model["dl"], np.linalg.norm(np.diff(position, axis=1), axis=0)
+        )
+        np.testing.assert_allclose(
+            model["nominal_shear"][2], trajectories[1]["sigma"][0, 2] + 1
+        )
+        np.testing.assert_allclose(model["radius"], trajectories[1]["radius"])
+
+        slices = run_slices(manifest)
+        assert slices["run1"] == slice(4, 9)
+        np.testing.assert_allclose(
+            data["true_kappa"][slices["run2"]],
+            trajectories[2]["kappa"][::2],
+        )
+
+    def test_dtype(self, tmp_path) -> None:
+        filename = str(tmp_path / "run.npz")
+        np.savez(filename, **make_trajectory(4, 6))
+        ArmDatasetBuilder(
+            [filename], str(tmp_path / "dataset"), dtype=np.float32
+        ).build()
+        data = load_arm_dataset(str(tmp_path / "dataset"))
+        assert data["true_pos"].dtype == np.float32
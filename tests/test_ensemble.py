@@ -0,0 +1,163 @@
+import elastica as ea
+import numpy as np
+import pytest
+
+from cobra.actuations.ensemble import ApplyFREEEnsemble, FREEEnsemble
+from cobra.actuations.FREE import ApplyFREEs, BaseFREE, PressureCoefficients
+from cobra.actuations.pressure_map import TabulatedMap
+
+
+def make_FREEs(n_elements: int) -> list[BaseFREE]:
+    return [
+        BaseFREE(
+            position=np.tile(
+                np.array([0.005, 0.002, 0.0]), (n_elements, 1)
+            ).T.copy(),
+            pressure_coefficients=PressureCoefficients(
+                force=np.array([-0.08, 0.01]),
+                couple=np.array([0.0006, 0.0]),
+            ),
+        ),
+        BaseFREE(
+            position=np.tile(
+                np.array([-0.004, 0.003, 0.0]), (n_elements, 1)
+            ).T.copy(),
+            pressure_coefficients=PressureCoefficients(
+                force=TabulatedMap(
+                    np.array([0.0, 10.0, 30.0]), np.array([0.0, -0.5, -2.0])
+                ),
+                couple=np.array([0.0]),
+            ),
+            pressure_maximum=20.0,
+        ),
+    ]
+
+
+class RodSimulator(ea.BaseSystemCollection, ea.Constraints, ea.Forcing):
+    pass
+
+
+def simulate(
+    rods: list[ea.CosseratRod],
+    pressures: np.ndarray,
+    ensemble: bool,
+    n_steps: int = 50,
+    time_step: float = 1e-5,
+) -> None:
+    # Clamped rods actuated by an ensemble or by ApplyFREEs per rod, the
+    # forcings being registered in reverse order of the rods
+    simulator = RodSimulator()
+    n_elements = rods[0].n_elems
+    free_ensemble = FREEEnsemble(rods, make_FREEs(n_elements))
+    free_ensemble.pressures = pressures
+    for rod in rods:
+        simulator.append(rod)
+        simulator.constrain(rod).using(
+            ea.OneEndFixedBC,
+            constrained_position_idx=(0,),
+            constrained_director_idx=(0,),
+        )
+    for rod_index in reversed(range(len(rods))):
+        if ensemble:
+            simulator.add_forcing_to(rods[rod_index]).using(
+                ApplyFREEEnsemble, ensemble=free_ensemble, rod_index=rod_index
+            )
+        else:
+            actuations = make_FREEs(n_elements)
+            for actuation, pressure in zip(actuations, pressures[rod_index]):
+                actuation.pressure = pressure
+            simulator.add_forcing_to(rods[rod_index]).using(
+                ApplyFREEs, actuator_FREEs=actuations
+            )
+    simulator.finalize()
+    stepper = ea.PositionVerlet()
+    do_step, stages_and_updates = ea.extend_stepper_interface(
+        stepper, simulator
+    )
+    time = np.float64(0.0)
+    for _ in range(n_steps):
+        time = do_step(stepper, stages_and_updates, simulator, time, time_step)
+
+
+class TestFREEEnsemble:
+    @pytest.mark.parametrize("n_elements", [4, 10])
+    @pytest.mark.parametrize("n_rods", [1, 3])
+    def test_apply(self, n_elements, n_rods, make_rod):
+        rods = [make_rod(n_elements) for _ in range(n_rods)]
+        pressures = np.array([[12.0, 5.0], [0.0, 0.0], [3.0, 25.0]])[:n_rods]
+
+        ensemble = FREEEnsemble(rods, make_FREEs(n_elements))
+        ensemble.pressures = pressures
+        for rod_index in range(n_rods):
+            ApplyFREEEnsemble(ensemble, rod_index).apply_forces(rods[rod_index])
+
+        for rod, rod_pressures in zip(rods, pressures):
+            actuations = make_FREEs(n_elements)
+            for actuation, pressure in zip(actuations, rod_pressures):
+                actuation.pressure = pressure
+            expected_rod = make_rod(n_elements)
+            expected_rod.position_collection[:] = rod.position_collection
+            expected_rod.compute_internal_forces_and_torques(0.0)
+            ApplyFREEs(actuations).apply_forces(expected_rod)
+
+            np.testing.assert_allclose(
+                rod.external_forces,
+                expected_rod.external_forces,
+                atol=1e-12,
+            )
+            np.testing.assert_allclose(
+                rod.external_torques,
+                expected_rod.external_torques,
+                atol=1e-12,
+            )
+
+    def test_simulation(self, make_rod):
+        n_elements, n_rods = 10, 3
+        rods = [make_rod(n_elements) for _ in range(n_rods)]
+        expected_rods = [make_rod(n_elements) for _ in range(n_rods)]
+        for rod, expected_rod in zip(rods, expected_rods):
+            expected_rod.position_collection[:] = rod.position_collection
+        pressures = np.array([[12.0, 5.0], [0.0, 0.0], [3.0, 25.0]])
+
+        simulate(rods, pressures, ensemble=True)
+        simulate(expected_rods, pressures, ensemble=False)
+
+        for rod, expected_rod in zip(rods, expected_rods):
+            assert not np.allclose(
+                rod.position_collection,
+                make_rod(n_elements, 0.0).position_collection,
+            )
+            np.testing.assert_allclose(
+                rod.position_collection,
+                expected_rod.position_collection,
+                rtol=1e-10,
+                atol=1e-12,
+            )
+
+    def test_rod_index(self, make_rod):
+        ensemble = FREEEnsemble([make_rod(4)], make_FREEs(4))
+        with pytest.raises(ValueError):
+            ApplyFREEEnsemble(ensemble, 1)
+
+    def test_pressures(self, make_rod):
+        n_elements = 4
+        rods = [make_rod(n_elements) for _ in range(2)]
+        ensemble = FREEEnsemble(rods, make_FREEs(n_elements))
+
+        ensemble.pressures = np.array([[-1.0, 25.0], [40.0, 10.0]])
+        np.testing.assert_allclose(
+            ensemble.pressures, np.array([[0.0, 20.0], [30.0, 10.0]])
+        )
+        ensemble.set_pressures(1, np.array([5.0, -5.0]))
+        np.testing.assert_allclose(ensemble.pressures[1], np.array([5.0, 0.0]))
+
+        ensemble.update_load_value()
+        np.testing.assert_array_equal(
+            ensemble.active, np.array([[True, True], [True, False]])
+        )
+
+    def test_element_check(self, make_rod):
+        with pytest.raises(ValueError):
+            FREEEnsemble([make_rod(4), make_rod(5)], make_FREEs(4))
+        with pytest.raises(ValueError):
+            FREEEnsemble([make_rod(5)], make_FREEs(4))
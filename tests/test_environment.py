@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+
+from cobra.checkpoint import rod_state
+from cobra.recorder import load_trajectory
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "examples"))
+from set_br2_environment import BR2Environment  # noqa: E402
+
+PRESSURES = np.array([10.0, 5.0, 0.0])
+
+
+def run_episode(env: BR2Environment, n_steps: int, nan_step: int = -1) -> None:
+    # Steps from the initial time, the rod being corrupted with a NaN at
+    # nan_step (stopping the recording)
+    time = np.float64(0.0)
+    for step in range(n_steps):
+        if step == nan_step:
+            env.rod.position_collection[0, -1] = np.nan
+        time = env.step(time, PRESSURES)
+
+
+class TestBR2Environment:
+    n_steps = 250
+
+    def make_environment(self, **kwargs) -> BR2Environment:
+        # 100 steps between recorded frames
+        return BR2Environment(final_time=0.003, recording_fps=1000, **kwargs)
+
+    def assert_same_episode(
+        self, env: BR2Environment, reference: BR2Environment
+    ) -> None:
+        arrays, reference_arrays = rod_state(env.rod), rod_state(reference.rod)
+        assert arrays.keys() == reference_arrays.keys()
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(array, reference_arrays[name])
+        frames = env.rod_recorder.as_dict()
+        reference_frames = reference.rod_recorder.as_dict()
+        assert frames.keys() == reference_frames.keys()
+        for name, array in frames.items():
+            np.testing.assert_array_equal(array, reference_frames[name])
+
+    def test_fast_reset(self) -> None:
+        # Episodes after fast_reset, also after an episode stopped by a NaN
+        # state, are the same as an episode after a full reset
+        reference = self.make_environment()
+        run_episode(reference, self.n_steps)
+
+        env = self.make_environment()
+        run_episode(env, self.n_steps)
+        assert env.fast_reset() == 0.0
+        run_episode(env, self.n_steps, nan_step=150)
+        assert np.isnan(env.rod.position_collection).any()
+        assert env.rod_recorder.n_recorded == 2
+        assert env.fast_reset() == 0.0
+        run_episode(env, self.n_steps)
+        self.assert_same_episode(env, reference)
+        assert env.rod_recorder.n_recorded == 3
+
+        env.reset()
+        run_episode(env, self.n_steps)
+        self.assert_same_episode(env, reference)
+
+    def test_adapt_time_step(self, tmp_path) -> None:
+        # A rebuild of the simulation by adapt_time_step carries the
+        # streamed recorder over as it is, the recording being the same as
+        # without the rebuild
+        reference = self.make_environment(time_step=None)
+        run_episode(reference, reference.total_steps)
+
+        path = str(tmp_path / "run")
+        env = self.make_environment(time_step=None, recording_path=path)
+        recorder = env.rod_recorder
+        time = np.float64(0.0)
+        for step in range(env.total_steps):
+            time = env.step(time, PRESSURES)
+            if step == env.step_skip + 10:
+                # Selects the current time step again, with a rebuild
+                time_step = env.time_step
+                n_frames = recorder.n_recorded + recorder.n_chunk_frames
+                env.time_step = time_step / 2
+                env.adapt_time_step(time)
+                assert env.time_step == time_step
+                assert env.rod_recorder is recorder
+                assert env.recorders == [recorder]
+                assert recorder.n_recorded + recorder.n_chunk_frames == (
+                    n_frames
+                )
+        self.assert_same_episode(env, reference)
+        assert recorder.n_recorded == 4
+        frames = load_trajectory(path)
+        for name, array in reference.rod_recorder.as_dict().items():
+            np.testing.assert_array_equal(frames[name], array)
@@ -0,0 +1,125 @@
+import elastica as ea
+import numpy as np
+
+from cobra.implicit import SemiImplicitEuler, solve_banded
+from cobra.stability import stable_time_step
+from cobra.statics import StaticSolver
+
+
+class RodSimulator(ea.BaseSystemCollection, ea.Constraints, ea.Forcing):
+    pass
+
+
+class TipForce(ea.NoForces):
+    # Force on the tip node of the rod
+    def __init__(self, force: np.ndarray):
+        super().__init__()
+        self.force = force
+
+    def apply_forces(self, system: ea.CosseratRod, time: float) -> None:
+        system.external_forces[:, -1] += self.force
+
+
+class TestSolveBanded:
+    def test_solve(self) -> None:
+        size, bandwidth = 20, 3
+        offsets = np.subtract.outer(np.arange(size), np.arange(size))
+        matrix = np.where(
+            np.abs(offsets) <= bandwidth, np.random.randn(size, size), 0.0
+        ) + 10 * np.eye(size)
+        rhs = np.random.randn(size)
+        np.testing.assert_allclose(
+            solve_banded(matrix.copy(), rhs.copy(), bandwidth),
+            np.linalg.solve(matrix, rhs),
+        )
+
+
+class TestSemiImplicitEuler:
+    def test_jacobian_reuse(self, make_cantilever) -> None:
+        # Reusing the Jacobians follows closely a Jacobian computed at every
+        # step, with a fraction of the linearizations
+        force = np.array([0.0, 0.0, -0.05])
+        rods = []
+        n_linearizations = []
+        for jacobian_interval in (0, 50):
+            simulator = RodSimulator()
+            rod = make_cantilever(n_elements=20)
+            simulator.append(rod)
+            simulator.constrain(rod).using(
+                ea.OneEndFixedBC,
+                constrained_position_idx=(0,),
+                constrained_director_idx=(0,),
+            )
+            simulator.add_forcing_to(rod).using(TipForce, force=force)
+            simulator.finalize()
+
+            solver = StaticSolver(rod, [TipForce(force)])
+            linearize = solver.linearize
+            calls = []
+
+            def counted_linearize(central: bool = True) -> np.ndarray:
+                calls.append(central)
+                return linearize(central)
+
+            solver.linearize = counted_linearize  # type: ignore[method-assign]
+            stepper = SemiImplicitEuler(
+                [solver],
+                damping_constant=1.0,
+                jacobian_interval=jacobian_interval,
+            )
+            time_step = 10 * stable_time_step(StaticSolver(rod, []))
+            time = np.float64(0.0)
+            for _ in range(200):
+                time = stepper.do_step(None, simulator, time, time_step)
+            rods.append(rod)
+            n_linearizations.append(len(calls))
+
+        assert n_linearizations[0] == 200
+        assert n_linearizations[1] < 50
+        np.testing.assert_allclose(
+            rods[1].position_collection,
+            rods[0].position_collection,
+            atol=1e-4,
+        )
+
+        stepper.invalidate()
+        stepper.do_step(None, simulator, time, time_step)
+        assert len(calls) == n_linearizations[1] + 1
+
+    def test_equilibrium(self, make_cantilever) -> None:
+        # A clamped rod under a tip force, stepped far beyond the stable time
+        # step of position Verlet, settles at the static equilibrium
+        force = np.array([0.0, 0.0, -0.05])
+        simulator = RodSimulator()
+        rod = make_cantilever(n_elements=20)
+        simulator.append(rod)
+        simulator.constrain(rod).using(
+            ea.OneEndFixedBC,
+            constrained_position_idx=(0,),
+            constrained_director_idx=(0,),
+        )
+        simulator.add_forcing_to(rod).using(TipForce, force=force)
+        simulator.finalize()
+
+        time_step = 100 * stable_time_step(StaticSolver(rod, []))
+        stepper = SemiImplicitEuler(
+            [StaticSolver(rod, [TipForce(force)])], damping_constant=1.0
+        )
+        time = np.float64(0.0)
+        for _ in range(1000):
+            time = stepper.do_step(None, simulator, time, time_step)
+        assert np.abs(rod.velocity_collection).max() < 1e-3
+
+        equilibrium = make_cantilever(n_elements=20)
+        tip_force = TipForce(np.zeros(3))
+        solver = StaticSolver(equilibrium, [tip_force])
+
+        def set_load(load: np.ndarray) -> None:
+            tip_force.force = load
+
+        solver.solve_path(set_load, [0.5 * force, force], np.zeros(3))
+        np.testing.assert_allclose(
+            rod.position_collection,
+            equilibrium.position_collection,
+            atol=1e-4,
+        )
@@ -1,6 +1,12 @@
 import numpy as np
 
-from cobra.math_tool import average2D, pointwise_multiplication
+from cobra.math_tool import (
+    average2D,
+    max_column_change,
+    max_column_norm,
+    pointwise_multiplication,
+    polynomial_value,
+)
 
 
 class TestMathTool:
@@ -19,3 +25,25 @@ class TestMathTool:
         vector_b = np.random.rand(self.n_dim, self.n_elements)
         result = pointwise_multiplication(vector_a, vector_b)
         np.testing.assert_allclose(result, vector_a * vector_b)
+
+    def test_polynomial_value(self) -> None:
+        coefficients = np.random.rand(4)
+        x = np.random.rand()
+        np.testing.assert_allclose(
+            polynomial_value(coefficients, x), np.polyval(coefficients, x)
+        )
+
+    def test_max_column_norm(self) -> None:
+        vector = np.random.rand(self.n_dim, self.n_elements)
+        np.testing.assert_allclose(
+            max_column_norm(vector), np.linalg.norm(vector, axis=0).max()
+        )
+
+    def test_max_column_change(self) -> None:
+        current = np.random.rand(self.n_dim, self.n_elements)
+        previous = np.random.rand(self.n_dim, self.n_elements)
+        expected = np.linalg.norm(current - previous, axis=0).max()
+        np.testing.assert_allclose(
+            max_column_change(current, previous), expected
+        )
+        np.testing.assert_array_equal(previous, current)
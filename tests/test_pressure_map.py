@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from cobra.actuations.pressure_map import (
+    ElementwisePolynomialMap,
+    PolynomialMap,
+    TabulatedMap,
+    as_pressure_map,
+)
+
+
+class TestPressureMap:
+    n_elements = 10
+
+    def test_polynomial_map(self) -> None:
+        coefficients = np.random.rand(3)
+        pressure_map = PolynomialMap(coefficients)
+        pressure_map.set_n_elements(self.n_elements)
+        value = np.zeros(self.n_elements)
+
+        pressure_map.evaluate(12.0, value)
+
+        np.testing.assert_allclose(value, np.polyval(coefficients, 12.0))
+
+    def test_elementwise_polynomial_map(self) -> None:
+        coefficients = np.random.rand(3, self.n_elements)
+        pressure_map = ElementwisePolynomialMap(coefficients)
+        pressure_map.set_n_elements(self.n_elements)
+        value = np.zeros(self.n_elements)
+
+        pressure_map.evaluate(12.0, value)
+
+        for i in range(self.n_elements):
+            np.testing.assert_allclose(
+                value[i], np.polyval(coefficients[:, i], 12.0)
+            )
+
+    def test_elementwise_polynomial_map_shape(self) -> None:
+        pressure_map = ElementwisePolynomialMap(np.zeros((2, 5)))
+        with pytest.raises(ValueError):
+            pressure_map.set_n_elements(self.n_elements)
+
+    def test_tabulated_map(self) -> None:
+        pressures = np.array([0.0, 5.0, 15.0, 30.0])
+        values = np.array([0.0, 1.0, 1.5, 3.0])
+        pressure_map = TabulatedMap(pressures, values)
+        pressure_map.set_n_elements(self.n_elements)
+        value = np.zeros(self.n_elements)
+
+        for pressure in [-1.0, 0.0, 2.5, 5.0, 20.0, 30.0, 40.0]:
+            pressure_map.evaluate(pressure, value)
+            np.testing.assert_allclose(
+                value, np.interp(pressure, pressures, values)
+            )
+
+    def test_elementwise_tabulated_map(self) -> None:
+        pressures = np.array([0.0, 10.0, 30.0])
+        values = np.random.rand(3, self.n_elements)
+        pressure_map = TabulatedMap(pressures, values)
+        pressure_map.set_n_elements(self.n_elements)
+        value = np.zeros(self.n_elements)
+
+        pressure_map.evaluate(17.0, value)
+
+        for i in range(self.n_elements):
+            np.testing.assert_allclose(
+                value[i], np.interp(17.0, pressures, values[:, i])
+            )
+
+    def test_tabulated_map_requires_increasing_pressures(self) -> None:
+        with pytest.raises(ValueError):
+            TabulatedMap(np.array([0.0, 10.0, 5.0]), np.zeros(3))
+
+    @pytest.mark.parametrize(
+        "pressure_map",
+        [
+            PolynomialMap(np.array([0.1, -0.5, 2.0])),
+            ElementwisePolynomialMap(np.random.rand(2, 10)),
+            TabulatedMap(np.array([0.0, 10.0, 30.0]), np.random.rand(3)),
+            TabulatedMap(np.array([0.0, 10.0, 30.0]), np.random.rand(3, 10)),
+        ],
+    )
+    def test_evaluate_batch(self, pressure_map) -> None:
+        pressure_map.set_n_elements(self.n_elements)
+        pressures = np.array([-1.0, 0.0, 4.0, 12.5, 40.0])
+        values = np.zeros((pressures.shape[0], self.n_elements))
+        pressure_map.evaluate_batch(pressures, values)
+        for pressure, value in zip(pressures, values):
+            expected_value = np.zeros(self.n_elements)
+            pressure_map.evaluate(pressure, expected_value)
+            np.testing.assert_allclose(value, expected_value)
+
+    def test_as_pressure_map(self) -> None:
+        coefficients = np.array([1.0, 0.0])
+        pressure_map = as_pressure_map(coefficients)
+        assert isinstance(pressure_map, PolynomialMap)
+        assert as_pressure_map(pressure_map) is pressure_map
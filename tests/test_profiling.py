@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pytest
+
+from cobra.actuations.FREE import ApplyFREEs
+from cobra.profiling import StageProfiler
+from cobra.statics import StaticSolver
+
+
+class TestStageProfiler:
+    def test_add(self, tmp_path) -> None:
+        profiler = StageProfiler()
+        for _ in range(3):
+            profiler.add("step", 0)
+        profiler.add("actuations", 0)
+        profiler.nanoseconds.update(step=300, actuations=100)
+        profiler.add_remainder("other", "step", ["actuations", "callbacks"])
+        stages = profiler.as_dict()
+        assert stages["step"] == {"calls": 3, "total_ns": 300, "mean_ns": 100}
+        assert stages["other"]["calls"] == 3
+        assert stages["other"]["total_ns"] == 200
+
+        table = profiler.table(reference="step").splitlines()
+        assert [line.split()[0] for line in table[1:]] == [
+            "step",
+            "other",
+            "actuations",
+        ]
+        assert table[2].endswith("66.7%")
+
+        profiler.save(str(tmp_path / "profile.json"))
+        with open(tmp_path / "profile.json") as file:
+            assert json.load(file) == stages
+
+        profiler.reset()
+        assert profiler.as_dict() == {}
+
+
+class TestProfiledActuations:
+    n_elements = 10
+
+    @pytest.mark.parametrize(
+        "options", [{}, {"superpose": True}, {"compiled": True}]
+    )
+    def test_profiled_loads(self, options: dict, make_rod, make_FREE) -> None:
+        # Same loads with the stages timed one by one
+        rod = make_rod(self.n_elements)
+        actuations = [make_FREE(self.n_elements) for _ in range(2)]
+        actuations[1].pressure = 3.0
+        loads = []
+        profiler = StageProfiler()
+        for forcing_profiler in (None, profiler):
+            rod.external_forces[:, :] = 0.0
+            rod.external_torques[:, :] = 0.0
+            forcing = ApplyFREEs(
+                actuations, profiler=forcing_profiler, **options
+            )
+            for _ in range(2):
+                forcing.apply_forces(rod)
+            loads.append(
+                (rod.external_forces.copy(), rod.external_torques.copy())
+            )
+        np.testing.assert_allclose(loads[1][0], loads[0][0], atol=1e-12)
+        np.testing.assert_allclose(loads[1][1], loads[0][1], atol=1e-12)
+
+        assert profiler.counts["actuations"] == 2
+        if options.get("compiled"):
+            assert profiler.counts["compiled actuations"] == 2
+            return
+        assert profiler.counts["rod geometry"] == 2
+        assert profiler.counts["invariants"] == 4
+        assert profiler.counts["pressure maps"] == 4
+        assert profiler.counts["tangents and internal loads"] == 4
+        assert profiler.counts["equivalent external loads"] == (
+            2 if options.get("superpose") else 4
+        )
+
+    def test_unprofiled_forcings(self, make_rod, make_FREE) -> None:
+        # Other forcings of the same actuations (e.g. the static solver of
+        # the environment) are not timed
+        rod = make_rod(self.n_elements)
+        actuations = [make_FREE(self.n_elements) for _ in range(2)]
+        profiler = StageProfiler()
+        ApplyFREEs(actuations, profiler=profiler).apply_forces(rod)
+        counts = dict(profiler.counts)
+        for options in ({}, {"superpose": True}):
+            ApplyFREEs(actuations, **options).apply_forces(rod)
+        StaticSolver(rod, [ApplyFREEs(actuations)]).residual()
+        assert profiler.counts == counts
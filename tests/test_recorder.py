@@ -0,0 +1,218 @@
+import time
+
+import numpy as np
+import pytest
+from elastica import CosseratRod
+
+from cobra.recorder import (
+    DATASET_FIELDS,
+    ROD_FIELDS,
+    TrajectoryRecorder,
+    load_trajectory,
+    n_recorded_frames,
+)
+from cobra.trajectory_store import TrajectoryReader
+
+
+def record_frames(
+    recorder: TrajectoryRecorder, rod: CosseratRod, n_frames: int
+) -> list[dict]:
+    # Record frames of a changing rod and return copies of the frames
+    frames = []
+    for frame in range(n_frames):
+        rod.position_collection[:] = np.random.rand(
+            *rod.position_collection.shape
+        )
+        rod.kappa[:] = np.random.rand(*rod.kappa.shape)
+        recorder.record(rod, 0.1 * frame)
+        frames.append(
+            {
+                "time": 0.1 * frame,
+                "position": rod.position_collection.copy(),
+                "kappa": rod.kappa.copy(),
+            }
+        )
+    return frames
+
+
+class TestTrajectoryRecorder:
+    def test_n_recorded_frames(self) -> None:
+        assert n_recorded_frames(total_steps=100, step_skip=10) == 11
+        assert n_recorded_frames(total_steps=105, step_skip=10) == 11
+        assert n_recorded_frames(100, step_skip=10, decimation=2) == 6
+
+    @pytest.mark.parametrize(
+        "path, background", [(False, False), (True, False), (True, True)]
+    )
+    def test_record(self, tmp_path, path, background, make_rod) -> None:
+        rod = make_rod(5)
+        recorder = TrajectoryRecorder(
+            n_frames=10,
+            path=str(tmp_path / "trajectory") if path else None,
+            background=background,
+            chunk_size=3,
+        )
+        frames = record_frames(recorder, rod, 7)
+        data = recorder.as_dict()
+
+        assert set(data.keys()) == {"time", *ROD_FIELDS.keys()}
+        assert data["position"].shape == (7, 3, 6)
+        for index, frame in enumerate(frames):
+            for name, value in frame.items():
+                np.testing.assert_allclose(data[name][index], value)
+
+        if path:
+            loaded = load_trajectory(str(tmp_path / "trajectory"))
+            for name, value in data.items():
+                np.testing.assert_allclose(loaded[name], value)
+            with pytest.raises(RuntimeError):
+                recorder.record(rod, 1.0)
+
+    @pytest.mark.parametrize("background", [False, True])
+    def test_read_while_recording(self, tmp_path, background, make_rod) -> None:
+        rod = make_rod(5)
+        path = str(tmp_path / "trajectory")
+        recorder = TrajectoryRecorder(
+            n_frames=10,
+            fields=["position", "kappa"],
+            path=path,
+            background=background,
+            chunk_size=3,
+        )
+        frames = record_frames(recorder, rod, 7)
+        if background:
+            # Wait for the writer to write the submitted chunks
+            for _ in range(1000):
+                if load_trajectory(path)["time"].shape[0] == 6:
+                    break
+                time.sleep(0.01)
+        loaded = load_trajectory(path)
+        assert set(loaded.keys()) == {"time", "position", "kappa"}
+        assert loaded["time"].shape == (6,)
+        np.testing.assert_allclose(loaded["kappa"][5], frames[5]["kappa"])
+        recorder.close()
+        assert load_trajectory(path)["time"].shape == (7,)
+
+    def test_writer_error(self, tmp_path, make_rod) -> None:
+        # A failing writer gives its chunks back, and its error is raised
+        # in the recording thread instead of blocking it
+        rod = make_rod(5)
+        recorder = TrajectoryRecorder(
+            n_frames=20,
+            fields=["position", "kappa"],
+            path=str(tmp_path / "trajectory"),
+            chunk_size=2,
+        )
+        recorder.record(rod, 0.0)
+        recorder.files["position"] = np.zeros((20, 2))
+        with pytest.raises(ValueError):
+            record_frames(recorder, rod, 10)
+        with pytest.raises(ValueError):
+            recorder.sync()
+        with pytest.raises(ValueError):
+            recorder.close()
+        assert recorder.writer is None
+        assert recorder.closed
+
+    @pytest.mark.parametrize("path", [False, True])
+    def test_fields_dtype_decimation(self, tmp_path, path, make_rod) -> None:
+        rod = make_rod(5)
+        recorder = TrajectoryRecorder(
+            n_frames=n_recorded_frames(
+                total_steps=6, step_skip=1, decimation=3
+            ),
+            fields=DATASET_FIELDS,
+            dtype={"position": np.float32},
+            decimation=3,
+            path=str(tmp_path / "trajectory") if path else None,
+            chunk_size=2,
+        )
+        frames = record_frames(recorder, rod, 7)
+        data = recorder.as_dict()
+
+        assert set(data.keys()) == {"time", *DATASET_FIELDS}
+        assert data["time"].dtype == np.float64
+        assert data["position"].dtype == np.float32
+        assert data["kappa"].dtype == np.float64
+        np.testing.assert_allclose(data["time"], [0.0, 0.3, 0.6])
+        for index, frame in enumerate(frames[::3]):
+            np.testing.assert_allclose(
+                data["position"][index], frame["position"], rtol=1e-6
+            )
+            np.testing.assert_allclose(data["kappa"][index], frame["kappa"])
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_save(self, tmp_path, compress, make_rod) -> None:
+        rod = make_rod(5)
+        recorder = TrajectoryRecorder(
+            n_frames=3, fields=["kappa"], dtype=np.float32, compress=compress
+        )
+        frames = record_frames(recorder, rod, 3)
+        recorder.save(str(tmp_path / "trajectory.npz"))
+        data = np.load(tmp_path / "trajectory.npz")
+        assert data["kappa"].dtype == np.float32
+        np.testing.assert_allclose(
+            data["kappa"][2], frames[2]["kappa"], rtol=1e-6
+        )
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_save_store(self, tmp_path, compress, make_rod) -> None:
+        rod = make_rod(5)
+        recorder = TrajectoryRecorder(
+            n_frames=3, fields=["kappa"], compress=compress, store=True
+        )
+        frames = record_frames(recorder, rod, 3)
+        recorder.save(str(tmp_path / "trajectory"))
+        data = TrajectoryReader(str(tmp_path / "trajectory"))
+        assert set(data) == {"time", "kappa"}
+        np.testing.assert_allclose(data["kappa"][2], frames[2]["kappa"])
+
+    @pytest.mark.parametrize(
+        "path, background", [(False, False), (True, False), (True, True)]
+    )
+    def test_state(self, tmp_path, path, background, make_rod) -> None:
+        # A recording resumed from a state records the same frames as if it
+        # had not been interrupted
+        rod = make_rod(5)
+        options = dict(
+            n_frames=8,
+            fields=["position", "kappa"],
+            decimation=2,
+            path=str(tmp_path / "trajectory") if path else None,
+            background=background,
+            chunk_size=2,
+        )
+        recorder = TrajectoryRecorder(**options)
+        frames = record_frames(recorder, rod, 5)
+        arrays, counters = recorder.state()
+        assert counters == {"n_calls": 5, "n_recorded": 3, "full": False}
+        record_frames(recorder, rod, 4)
+
+        recorder.set_state(rod, arrays, counters)
+        frames += record_frames(recorder, rod, 6)
+        data = recorder.as_dict()
+        assert data["time"].shape == (6,)
+        for index, frame in enumerate(frames[::2]):
+            np.testing.assert_allclose(
+                data["position"][index], frame["position"]
+            )
+
+        # The state is restored into a new recorder
+        restored = TrajectoryRecorder(**options)
+        restored.set_state(rod, *recorder.state())
+        np.testing.assert_array_equal(
+            restored.as_dict()["kappa"], data["kappa"]
+        )
+
+    def test_full(self, make_rod) -> None:
+        rod = make_rod(5)
+        recorder = TrajectoryRecorder(n_frames=2)
+        with pytest.warns(UserWarning):
+            record_frames(recorder, rod, 4)
+        assert recorder.as_dict()["time"].shape == (2,)
+
+    def test_invalid_parameters(self) -> None:
+        with pytest.raises(ValueError):
+            TrajectoryRecorder(n_frames=2, fields=["position", "strain"])
+        with pytest.raises(ValueError):
+            TrajectoryRecorder(n_frames=2, decimation=0)
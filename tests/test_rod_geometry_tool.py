@@ -1,6 +1,14 @@
 import numpy as np
 
-from cobra.rod_geometry_tool import sigma_to_shear
+from cobra.actuations.actuation_tool import lab_to_material
+from cobra.rod_geometry_tool import (
+    compute_local_position_invariants,
+    compute_local_shear,
+    compute_local_tangent,
+    sigma_to_shear,
+    update_local_tangent,
+    update_rod_geometry,
+)
 
 
 class TestRodGeometryTool:
@@ -17,3 +25,87 @@ class TestRodGeometryTool:
                     assert shear[n, i] == sigma[n, i] + 1
                 else:
                     assert shear[n, i] == sigma[n, i]
+
+    def test_compute_local_position_invariants(self) -> None:
+        local_position = np.random.rand(self.n_dim, self.n_elements)
+        rest_voronoi_lengths = 0.1 + np.random.rand(self.n_elements - 1)
+        average_position = np.zeros((self.n_dim, self.n_elements - 1))
+        position_gradient = np.zeros((self.n_dim, self.n_elements - 1))
+
+        compute_local_position_invariants(
+            local_position,
+            rest_voronoi_lengths,
+            average_position,
+            position_gradient,
+        )
+
+        np.testing.assert_allclose(
+            average_position,
+            0.5 * (local_position[:, :-1] + local_position[:, 1:]),
+        )
+        np.testing.assert_allclose(
+            position_gradient,
+            np.diff(local_position, axis=1) / rest_voronoi_lengths,
+        )
+
+    def test_update_local_tangent(self) -> None:
+        local_position = 0.01 * np.random.rand(self.n_dim, self.n_elements)
+        sigma = 0.1 * np.random.rand(self.n_dim, self.n_elements)
+        kappa = np.random.rand(self.n_dim, self.n_elements - 1)
+        rest_voronoi_lengths = 0.1 + np.random.rand(self.n_elements - 1)
+        voronoi_dilatation = 1.0 + 0.1 * np.random.rand(self.n_elements - 1)
+        average_position = np.zeros((self.n_dim, self.n_elements - 1))
+        position_gradient = np.zeros((self.n_dim, self.n_elements - 1))
+        local_tangent = np.zeros((self.n_dim, self.n_elements))
+
+        compute_local_position_invariants(
+            local_position,
+            rest_voronoi_lengths,
+            average_position,
+            position_gradient,
+        )
+        update_local_tangent(
+            average_position,
+            position_gradient,
+            sigma_to_shear(sigma),
+            kappa,
+            voronoi_dilatation,
+            local_tangent,
+        )
+
+        np.testing.assert_allclose(
+            local_tangent,
+            compute_local_tangent(
+                compute_local_shear(
+                    local_position,
+                    sigma_to_shear(sigma),
+                    kappa,
+                    rest_voronoi_lengths * voronoi_dilatation,
+                )
+            ),
+        )
+
+    def test_update_rod_geometry(self) -> None:
+        director_collection = np.random.rand(
+            self.n_dim, self.n_dim, self.n_elements
+        )
+        sigma = np.random.rand(self.n_dim, self.n_elements)
+        tangents = np.random.rand(self.n_dim, self.n_elements)
+        dilatation = np.random.rand(self.n_elements)
+        shear = np.zeros((self.n_dim, self.n_elements))
+        material_tangent = np.zeros((self.n_dim, self.n_elements))
+
+        update_rod_geometry(
+            director_collection,
+            sigma,
+            tangents,
+            dilatation,
+            shear,
+            material_tangent,
+        )
+
+        np.testing.assert_allclose(shear, sigma_to_shear(sigma))
+        np.testing.assert_allclose(
+            material_tangent,
+            lab_to_material(director_collection, tangents * dilatation),
+        )
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from cobra.actuations.schedule import PressureSchedule
+
+
+class TestPressureSchedule:
+    times = np.array([0.0, 1.0, 2.5, 4.0])
+    pressures = np.array([[0.0, 5.0], [10.0, 5.0], [30.0, 0.0], [15.0, 20.0]])
+
+    def test_linear(self) -> None:
+        schedule = PressureSchedule(self.times, self.pressures)
+        sample_times = np.linspace(-1.0, 5.0, 61)
+        values = schedule.sample(sample_times)
+        for channel in range(2):
+            np.testing.assert_allclose(
+                values[:, channel],
+                np.interp(sample_times, self.times, self.pressures[:, channel]),
+            )
+        value = np.zeros(2)
+        schedule.evaluate(1.75, value)
+        np.testing.assert_allclose(value, [20.0, 2.5])
+
+    def test_spline(self) -> None:
+        schedule = PressureSchedule(self.times, self.pressures, kind="spline")
+        # Through the points, held at the end values
+        np.testing.assert_allclose(
+            schedule.sample(self.times), self.pressures, atol=1e-12
+        )
+        np.testing.assert_allclose(schedule(-1.0), self.pressures[0])
+        np.testing.assert_allclose(schedule(5.0), self.pressures[-1])
+        # Continuous slopes at the inner points
+        epsilon = 1e-6
+        for time in self.times[1:-1]:
+            before = (schedule(time) - schedule(time - epsilon)) / epsilon
+            after = (schedule(time + epsilon) - schedule(time)) / epsilon
+            np.testing.assert_allclose(before, after, atol=1e-3)
+
+    def test_spline_linear_data(self) -> None:
+        # A natural spline reproduces linear data
+        pressures = 3.0 * self.times[:, None] + np.array([[1.0, 2.0]])
+        schedule = PressureSchedule(self.times, pressures, kind="spline")
+        np.testing.assert_allclose(
+            schedule(1.7), 3.0 * 1.7 + np.array([1.0, 2.0])
+        )
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            PressureSchedule(np.array([0.0, 1.0, 1.0]), np.zeros((3, 3)))
+        with pytest.raises(ValueError):
+            PressureSchedule(self.times, np.zeros((3, 3)))
+        with pytest.raises(ValueError):
+            PressureSchedule(self.times, self.pressures, kind="quadratic")
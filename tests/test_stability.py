@@ -0,0 +1,84 @@
+import elastica as ea
+import numpy as np
+import pytest
+
+from cobra.stability import aligned_time_step, max_frequency, stable_time_step
+from cobra.statics import StaticSolver
+
+
+class ClampedRodSimulator(ea.BaseSystemCollection, ea.Constraints):
+    pass
+
+
+def max_velocity(
+    rod: ea.CosseratRod, factor: float, n_steps: int = 2000
+) -> float:
+    # Largest velocity of the rod, clamped and slightly perturbed,
+    # integrated with factor times the stable time step of position Verlet
+    simulator = ClampedRodSimulator()
+    simulator.append(rod)
+    simulator.constrain(rod).using(
+        ea.OneEndFixedBC,
+        constrained_position_idx=(0,),
+        constrained_director_idx=(0,),
+    )
+    simulator.finalize()
+    time_step = stable_time_step(StaticSolver(rod, []), safety=factor)
+    rod.velocity_collection[:, 1:] = 1e-6 * np.random.randn(3, rod.n_elems)
+    stepper = ea.PositionVerlet()
+    do_step, stages_and_updates = ea.extend_stepper_interface(
+        stepper, simulator
+    )
+    time = np.float64(0.0)
+    for _ in range(n_steps):
+        time = do_step(stepper, stages_and_updates, simulator, time, time_step)
+    return np.abs(rod.velocity_collection).max()
+
+
+class TestMaxFrequency:
+    def test_stability_limit(self, make_cantilever) -> None:
+        assert max_velocity(make_cantilever(20), 0.9) < 1e-5
+        assert not max_velocity(make_cantilever(20), 1.1) < 1e-5
+
+    def test_window(self, make_cantilever) -> None:
+        # The windows underestimate the frequency of the whole rod slightly
+        solver = StaticSolver(make_cantilever(n_elements=30), [])
+        whole = max_frequency(solver, window=30)
+        windowed = max_frequency(solver)
+        assert windowed <= whole
+        np.testing.assert_allclose(windowed, whole, rtol=2e-2)
+
+    def test_stiffness(self, make_cantilever) -> None:
+        # The frequencies scale with the square root of the stiffness
+        soft = max_frequency(StaticSolver(make_cantilever(10), []))
+        stiff = max_frequency(
+            StaticSolver(make_cantilever(10, youngs_modulus=4e6), [])
+        )
+        np.testing.assert_allclose(stiff, 2 * soft, rtol=1e-6)
+
+    def test_state_unchanged(self, make_cantilever) -> None:
+        rod = make_cantilever(n_elements=10)
+        rod.velocity_collection[:] = np.random.randn(3, 11)
+        rod.external_forces[:] = np.random.randn(3, 11)
+        state = {
+            name: getattr(rod, name).copy()
+            for name in (
+                "position_collection",
+                "director_collection",
+                "velocity_collection",
+                "external_forces",
+            )
+        }
+        max_frequency(StaticSolver(rod, []))
+        for name, value in state.items():
+            np.testing.assert_array_equal(getattr(rod, name), value)
+
+
+class TestAlignedTimeStep:
+    @pytest.mark.parametrize("max_time_step", [1e-5, 3e-5, 1 / 300])
+    def test_aligned(self, max_time_step: float) -> None:
+        time_step, n_steps = aligned_time_step(max_time_step, 1 / 30)
+        assert time_step <= max_time_step
+        np.testing.assert_allclose(n_steps * time_step, 1 / 30)
+        # The largest such step
+        assert (1 / 30) / (n_steps - 1) > max_time_step or n_steps == 1
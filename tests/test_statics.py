@@ -0,0 +1,115 @@
+import elastica as ea
+import numpy as np
+
+from cobra.statics import StaticSolver, rotate_directors, snake_order
+
+LENGTH = 0.5
+RADIUS = 0.01
+YOUNGS_MODULUS = 1e6
+
+
+class TipForce:
+    # Force on the tip node of the rod
+    def __init__(self, force: np.ndarray):
+        self.force = force
+
+    def apply_forces(self, system: ea.CosseratRod, time: float) -> None:
+        system.external_forces[:, -1] += self.force
+
+
+class TestRotateDirectors:
+    def test_rotation(self) -> None:
+        directors = np.repeat(np.eye(3)[:, :, None], 2, axis=2)
+        rotations = np.array([[0.0, 0.0], [0.0, 0.0], [np.pi / 2, 0.0]])
+        rotate_directors(directors, rotations)
+        # The rows (directors) are rotated about z, the second element is not
+        np.testing.assert_allclose(
+            directors[:, :, 0],
+            np.array([[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]),
+            atol=1e-15,
+        )
+        np.testing.assert_array_equal(directors[:, :, 1], np.eye(3))
+
+    def test_orthonormal(self) -> None:
+        directors = np.repeat(np.eye(3)[:, :, None], 5, axis=2)
+        rotate_directors(directors, np.random.randn(3, 5))
+        for index in range(5):
+            np.testing.assert_allclose(
+                directors[:, :, index] @ directors[:, :, index].T,
+                np.eye(3),
+                atol=1e-14,
+            )
+
+
+class TestStaticSolver:
+    def test_jacobian(self, make_cantilever) -> None:
+        # The grouped Jacobian matches the Jacobian perturbing each unknown
+        # on its own
+        rod = make_cantilever(n_elements=12)
+        solver = StaticSolver(rod, [TipForce(np.array([0.0, 0.0, -0.01]))])
+        solver.update(1e-3 * np.random.randn(solver.n_unknowns))
+        jacobian = solver.compute_jacobian().copy()
+        dense = StaticSolver(
+            rod, solver.forcings, stride=solver.n_unknowns
+        ).compute_jacobian()
+        np.testing.assert_allclose(
+            jacobian, dense, atol=1e-6 * np.abs(dense).max()
+        )
+
+    def test_cantilever(self, make_cantilever) -> None:
+        # Small tip load: Euler-Bernoulli deflection F L^3 / (3 E I) of the
+        # length beyond the middle of the clamped first element
+        n_elements = 20
+        rod = make_cantilever(
+            n_elements, LENGTH, RADIUS, youngs_modulus=YOUNGS_MODULUS
+        )
+        force = 1e-4
+        solver = StaticSolver(rod, [TipForce(np.array([0.0, 0.0, -force]))])
+        result = solver.solve()
+        assert result.converged
+        assert result.force_residual < solver.force_tolerance
+        assert result.couple_residual < solver.couple_tolerance
+        second_moment = np.pi * RADIUS**4 / 4
+        free_length = LENGTH * (1 - 0.5 / n_elements)
+        deflection = (
+            force * free_length**3 / (3 * YOUNGS_MODULUS * second_moment)
+        )
+        np.testing.assert_allclose(
+            rod.position_collection[2, -1], -deflection, rtol=1e-2
+        )
+        # The base stays clamped
+        np.testing.assert_array_equal(rod.position_collection[:, 0], 0.0)
+
+    def test_solve_path(self, make_cantilever) -> None:
+        # Large deflections by continuation over the tip load
+        rod = make_cantilever(20, LENGTH, RADIUS, youngs_modulus=YOUNGS_MODULUS)
+        tip_force = TipForce(np.zeros(3))
+        solver = StaticSolver(rod, [tip_force])
+
+        def set_load(load: np.ndarray) -> None:
+            tip_force.force = load
+
+        loads = [np.array([0.0, 0.0, -force]) for force in (0.05, 0.1)]
+        solutions = solver.solve_path(set_load, loads, start_load=np.zeros(3))
+        assert len(solutions) == 2
+        assert all(result.converged for result, _ in solutions)
+        tips = [state["position"][:, -1] for _, state in solutions]
+        # The tip bends down and is pulled towards the base
+        assert tips[1][2] < tips[0][2] < -0.1 * LENGTH
+        assert tips[1][0] < tips[0][0] < LENGTH
+        # The rod is left in the last equilibrium
+        np.testing.assert_array_equal(
+            rod.position_collection, solutions[-1][1]["position"]
+        )
+
+
+class TestSnakeOrder:
+    def test_order(self) -> None:
+        assert snake_order((2, 3)) == [
+            (0, 0),
+            (0, 1),
+            (0, 2),
+            (1, 2),
+            (1, 1),
+            (1, 0),
+        ]
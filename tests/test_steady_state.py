@@ -0,0 +1,65 @@
+import numpy as np
+
+from cobra.steady_state import SteadyStateDetector
+
+
+class OscillatingRod:
+    # Rod whose deformation oscillates with a decaying amplitude
+    def __init__(self, n_elements: int, decay: float):
+        self.decay = decay
+        self.shape = np.random.rand(3, n_elements)
+        self.velocity_collection = np.zeros((3, n_elements + 1))
+        self.omega_collection = np.zeros((3, n_elements))
+        self.sigma = np.zeros((3, n_elements))
+        self.kappa = np.zeros((3, n_elements - 1))
+
+    def update(self, time: float) -> None:
+        amplitude = np.exp(-self.decay * time)
+        self.kappa[:] = self.shape[:, 1:] * (1 + amplitude * np.sin(20 * time))
+        self.sigma[:] = 1e-3 * self.shape * amplitude * np.sin(20 * time)
+        self.velocity_collection[:, 1:] = (
+            self.shape * amplitude * np.cos(20 * time)
+        )
+        self.omega_collection[:] = 10 * self.shape * amplitude
+
+
+class TestSteadyStateDetector:
+    def run(
+        self, detector: SteadyStateDetector, rod: OscillatingRod, steps: int
+    ) -> float:
+        time = 0.0
+        for step in range(steps):
+            time = step * 1e-3
+            rod.update(time)
+            if detector.update(rod, time):
+                break
+        return time
+
+    def test_settling(self) -> None:
+        rod = OscillatingRod(n_elements=10, decay=5.0)
+        detector = SteadyStateDetector(dwell_time=0.1)
+        stop_time = self.run(detector, rod, steps=5000)
+        assert detector.settled
+        assert detector.settling_time is not None
+        np.testing.assert_allclose(
+            stop_time - detector.settling_time, 0.1, atol=2e-3
+        )
+        # Below the tolerances from the settling time on, not before
+        rod.update(detector.settling_time - 0.05)
+        assert np.linalg.norm(rod.omega_collection, axis=0).max() > 5e-2
+
+    def test_not_settled(self) -> None:
+        rod = OscillatingRod(n_elements=10, decay=0.1)
+        detector = SteadyStateDetector()
+        self.run(detector, rod, steps=1000)
+        assert not detector.settled
+        assert detector.settling_time is None
+
+    def test_reset(self) -> None:
+        rod = OscillatingRod(n_elements=10, decay=5.0)
+        detector = SteadyStateDetector()
+        self.run(detector, rod, steps=5000)
+        assert detector.settled
+        detector.reset()
+        assert not detector.settled
+        assert detector.rates["velocity"] == np.inf
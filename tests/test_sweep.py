@@ -0,0 +1,273 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from cobra.sweep import (
+    PrefixSharingScheduler,
+    SweepRunner,
+    ThreadedEnvironmentRunner,
+    parameter_grid,
+    parameter_samples,
+    phase_tree,
+)
+
+
+class CountingEnvironment:
+    n_built = 0
+
+    def __init__(self) -> None:
+        CountingEnvironment.n_built += 1
+        self.n_cases = 0
+
+
+def run_case(environment: CountingEnvironment, parameters: dict, filename: str):
+    environment.n_cases += 1
+    np.savez(
+        filename + ".npz",
+        value=parameters["a"] * parameters["b"],
+        pid=os.getpid(),
+        n_cases=environment.n_cases,
+    )
+    return 10
+
+
+def informing_run_case(environment, parameters, filename):
+    return {"n_steps": 5, "settling_time": 0.5 * parameters["a"]}
+
+
+def failing_run_case(environment, parameters, filename):
+    if parameters["a"] == 2:
+        raise RuntimeError("interrupted")
+    return run_case(environment, parameters, filename)
+
+
+class HistoryEnvironment:
+    # Environment whose state is the history of the phases it has run
+    def __init__(self) -> None:
+        self.history: list = []
+        self.n_snapshots = 0
+
+    def snapshot(self, time: float) -> tuple:
+        self.n_snapshots += 1
+        return list(self.history), time
+
+    def restore(self, snapshot: tuple) -> float:
+        self.history = list(snapshot[0])
+        return snapshot[1]
+
+
+def run_phase(environment: HistoryEnvironment, phase: tuple, time: float):
+    environment.history.append(phase)
+    return time + phase[1]
+
+
+class TestParameters:
+    def test_parameter_grid(self) -> None:
+        cases = parameter_grid(a=[1, 2], b=[3, 4, 5])
+        assert len(cases) == 6
+        assert cases[0] == {"a": 1, "b": 3}
+        assert cases[-1] == {"a": 2, "b": 5}
+
+    def test_parameter_samples(self) -> None:
+        def sampler(rng: np.random.Generator) -> dict:
+            return {"a": rng.uniform()}
+
+        assert parameter_samples(3, sampler, seed=1) == parameter_samples(
+            3, sampler, seed=1
+        )
+
+
+class TestSweepRunner:
+    @pytest.mark.parametrize(
+        "n_workers, executor", [(0, "process"), (2, "process"), (2, "thread")]
+    )
+    def test_run(self, tmp_path, n_workers, executor) -> None:
+        cases = parameter_grid(a=[1, 2, 3], b=[1, 2])
+        runner = SweepRunner(
+            CountingEnvironment,
+            run_case,
+            str(tmp_path),
+            n_workers=n_workers,
+            executor=executor,
+        )
+        results = runner.run(cases, verbose=False)
+
+        assert len(results) == len(cases)
+        assert all(result.n_steps == 10 for result in results)
+        for index, parameters in enumerate(cases):
+            data = np.load(tmp_path / f"case_{index:04d}.npz")
+            assert data["value"] == parameters["a"] * parameters["b"]
+        if n_workers == 0:
+            # The environment is built once and reused by every case
+            data = np.load(tmp_path / f"case_{len(cases) - 1:04d}.npz")
+            assert data["n_cases"] == len(cases)
+
+        if executor == "thread":
+            # Each thread builds its environment once
+            n_cases = [
+                int(np.load(tmp_path / f"case_{index:04d}.npz")["n_cases"])
+                for index in range(len(cases))
+            ]
+            assert sum(n_cases) >= len(cases)
+            assert n_cases.count(1) <= 2
+
+        with open(runner.log_path) as log:
+            assert len(log.readlines()) == len(cases)
+
+    def test_info(self, tmp_path) -> None:
+        runner = SweepRunner(
+            CountingEnvironment,
+            informing_run_case,
+            str(tmp_path),
+            n_workers=0,
+        )
+        runner.run(parameter_grid(a=[1, 2]), verbose=False)
+        finished = runner.finished_cases()
+        assert finished["case_0001"].n_steps == 5
+        assert finished["case_0001"].info == {"settling_time": 1.0}
+
+    def test_resume(self, tmp_path) -> None:
+        cases = parameter_grid(a=[1, 2, 3], b=[1])
+        runner = SweepRunner(
+            CountingEnvironment, failing_run_case, str(tmp_path), n_workers=0
+        )
+        with pytest.raises(RuntimeError):
+            runner.run(cases, verbose=False)
+        assert list(runner.finished_cases().keys()) == ["case_0000"]
+
+        runner.run_case = run_case
+        results = runner.run(cases, verbose=False)
+        assert [result.name for result in results] == [
+            "case_0001",
+            "case_0002",
+        ]
+        assert runner.run(cases, verbose=False) == []
+
+        results = runner.run(cases, resume=False, verbose=False)
+        assert len(results) == len(cases)
+
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_pool_failure(self, tmp_path, executor) -> None:
+        # The other cases of the pool are still logged
+        cases = parameter_grid(a=[1, 2, 3], b=[1, 2])
+        runner = SweepRunner(
+            CountingEnvironment,
+            failing_run_case,
+            str(tmp_path),
+            n_workers=2,
+            executor=executor,
+        )
+        with pytest.raises(RuntimeError, match="2 of 6 cases failed"):
+            runner.run(cases, verbose=False)
+        assert sorted(runner.finished_cases().keys()) == [
+            "case_0000",
+            "case_0001",
+            "case_0004",
+            "case_0005",
+        ]
+
+        runner.run_case = run_case
+        results = runner.run(cases, verbose=False)
+        assert sorted(result.name for result in results) == [
+            "case_0002",
+            "case_0003",
+        ]
+
+    def test_ignore_broken_log_line(self, tmp_path) -> None:
+        runner = SweepRunner(
+            CountingEnvironment, run_case, str(tmp_path), n_workers=0
+        )
+        runner.run([{"a": 1, "b": 1}], verbose=False)
+        with open(runner.log_path, "a") as log:
+            log.write('{"name": "case_0001", "param')
+        assert list(runner.finished_cases().keys()) == ["case_0000"]
+
+    def test_names(self, tmp_path) -> None:
+        runner = SweepRunner(
+            CountingEnvironment, run_case, str(tmp_path), n_workers=0
+        )
+        with pytest.raises(ValueError):
+            runner.run([{"a": 1, "b": 1}], names=["x", "y"], verbose=False)
+        with pytest.raises(ValueError):
+            runner.run([{"a": 1, "b": 1}] * 2, names=["x", "x"], verbose=False)
+        results = runner.run([{"a": 1, "b": 1}], names=["x"], verbose=False)
+        assert results[0].name == "x"
+        with open(runner.log_path) as log:
+            assert json.loads(log.readline())["parameters"] == {"a": 1, "b": 1}
+
+
+class TestThreadedEnvironmentRunner:
+    def test_run(self) -> None:
+        environments = [CountingEnvironment() for _ in range(3)]
+
+        def run_environment(environment: CountingEnvironment, index: int):
+            environment.n_cases += index
+            return index * 10
+
+        with ThreadedEnvironmentRunner(environments, n_threads=2) as runner:
+            assert runner.run(run_environment) == [0, 10, 20]
+            runner.run(run_environment)
+        assert [environment.n_cases for environment in environments] == [
+            0,
+            2,
+            4,
+        ]
+
+    def test_exception(self) -> None:
+        environments = [CountingEnvironment() for _ in range(3)]
+
+        def run_environment(environment: CountingEnvironment, index: int):
+            if index == 0:
+                raise RuntimeError("diverged")
+            environment.n_cases += 1
+
+        with ThreadedEnvironmentRunner(environments) as runner:
+            with pytest.raises(RuntimeError):
+                runner.run(run_environment)
+        # The other environments have been run
+        assert [environment.n_cases for environment in environments] == [
+            0,
+            1,
+            1,
+        ]
+        with pytest.raises(ValueError):
+            ThreadedEnvironmentRunner(environments, n_threads=0)
+
+
+class TestPrefixSharingScheduler:
+    def test_phase_tree(self) -> None:
+        root = phase_tree([["a", "b"], ["a", "c"], ["a"], ["d"]])
+        assert list(root.children) == ["a", "d"]
+        assert root.children["a"].cases == [2]
+        assert list(root.children["a"].children) == ["b", "c"]
+        assert root.children["d"].cases == [3]
+
+    def test_run(self) -> None:
+        case_phases = [
+            [("twist", 2.0), ("bend", 2.0)],
+            [("twist", 2.0), ("bend", 1.0), ("hold", 1.0)],
+            [("twist", 2.0)],
+            [("bend", 3.0)],
+            [("twist", 2.0), ("bend", 1.0), ("release", 1.0)],
+        ]
+        environment = HistoryEnvironment()
+        finished: dict = {}
+
+        def finish_case(environment, index, time):
+            finished[index] = (list(environment.history), time)
+            environment.history.append("closed")
+
+        scheduler = PrefixSharingScheduler(environment, run_phase, finish_case)
+        times = scheduler.run(case_phases)
+        for index, phases in enumerate(case_phases):
+            assert finished[index] == (
+                phases,
+                sum(phase[1] for phase in phases),
+            )
+        assert times["case_time"] == 4.0 + 4.0 + 2.0 + 3.0 + 4.0
+        # twist, bend 2, bend 1, hold, release and bend 3 are run once
+        assert times["simulated_time"] == 2.0 + 2.0 + 1.0 + 1.0 + 1.0 + 3.0
+        # Forks at the root, after twist and after bend 1
+        assert environment.n_snapshots == 3
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from cobra.trajectory_store import (
+    TrajectoryReader,
+    TrajectoryStoreWriter,
+    is_trajectory_store,
+    read_runs,
+    write_trajectory,
+)
+
+
+def make_trajectory(n_frames: int, n_elements: int) -> dict[str, np.ndarray]:
+    return {
+        "time": np.arange(n_frames) * 0.1,
+        "position": np.random.rand(n_frames, 3, n_elements + 1),
+        "kappa": np.random.rand(n_frames, 3, n_elements - 1).astype(np.float32),
+    }
+
+
+class TestTrajectoryStore:
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_write_read(self, tmp_path, compress) -> None:
+        trajectory = make_trajectory(n_frames=23, n_elements=6)
+        path = str(tmp_path / "run")
+        write_trajectory(path, trajectory, chunk_frames=5, compress=compress)
+        assert is_trajectory_store(path)
+        assert not is_trajectory_store(str(tmp_path))
+
+        data = TrajectoryReader(path)
+        assert set(data) == set(trajectory)
+        kappa = data["kappa"]
+        assert kappa.shape == (23, 3, 5)
+        assert kappa.dtype == np.float32
+        assert len(kappa.chunks) == 5
+        for key in [
+            slice(None),
+            slice(7, 13),
+            slice(2, 20, 3),
+            4,
+            -1,
+            np.array([21, 0, 9]),
+            (slice(3, 17), 1),
+            (slice(None), slice(None), -1),
+            (12, Ellipsis, 0),
+        ]:
+            np.testing.assert_array_equal(kappa[key], trajectory["kappa"][key])
+        np.testing.assert_array_equal(
+            np.asarray(data["position"]), trajectory["position"]
+        )
+
+    def test_partial_chunks(self, tmp_path, monkeypatch) -> None:
+        # Only the chunks of the requested frames are decompressed
+        trajectory = make_trajectory(n_frames=40, n_elements=4)
+        path = str(tmp_path / "run")
+        write_trajectory(path, trajectory, chunk_frames=8, compress=True)
+        field = TrajectoryReader(path)["position"]
+        read_chunks = []
+        read_chunk = field.read_chunk
+        monkeypatch.setattr(
+            field,
+            "read_chunk",
+            lambda file, index: read_chunks.append(index)
+            or read_chunk(file, index),
+        )
+        np.testing.assert_array_equal(
+            field[10:20], trajectory["position"][10:20]
+        )
+        assert read_chunks == [1, 2]
+
+    def test_memmap(self, tmp_path) -> None:
+        trajectory = make_trajectory(n_frames=10, n_elements=4)
+        path = str(tmp_path / "run")
+        write_trajectory(path, trajectory, chunk_frames=3)
+        position = TrajectoryReader(path)["position"].memmap()
+        assert isinstance(position, np.memmap)
+        np.testing.assert_array_equal(position, trajectory["position"])
+
+        write_trajectory(path, trajectory, chunk_frames=3, compress=True)
+        with pytest.raises(ValueError):
+            TrajectoryReader(path)["position"].memmap()
+
+    def test_append(self, tmp_path) -> None:
+        # Frames appended a few at a time are readable once their chunk is
+        # written, and all of them once the writer is closed
+        trajectory = make_trajectory(n_frames=11, n_elements=4)
+        path = str(tmp_path / "run")
+        writer = TrajectoryStoreWriter(path, chunk_frames=4, compress=True)
+        for start in range(0, 9, 3):
+            writer.append(
+                {
+                    name: array[start : start + 3]
+                    for name, array in trajectory.items()
+                }
+            )
+        assert TrajectoryReader(path)["time"].shape == (8,)
+        writer.append({name: array[9:] for name, array in trajectory.items()})
+        writer.close()
+        data = TrajectoryReader(path)
+        assert [chunk[2] for chunk in data["time"].chunks] == [4, 4, 3]
+        np.testing.assert_array_equal(data["kappa"][:], trajectory["kappa"])
+
+    def test_read_runs(self, tmp_path) -> None:
+        trajectories = [
+            make_trajectory(n_frames, n_elements=4) for n_frames in [6, 9]
+        ]
+        paths = [str(tmp_path / f"run{index}") for index in range(2)]
+        for path, trajectory in zip(paths, trajectories):
+            write_trajectory(path, trajectory, chunk_frames=4)
+        tips = read_runs(paths, "position", (slice(None), slice(None), -1))
+        for tip, trajectory in zip(tips, trajectories):
+            np.testing.assert_array_equal(tip, trajectory["position"][:, :, -1])